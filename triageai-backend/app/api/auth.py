@@ -5,12 +5,22 @@ from sqlalchemy.future import select
 from app.database import get_db
 from app.models.user import User
 from app.schemas.user import UserCreate, UserResponse, Token
-from app.services.auth import verify_password, get_password_hash, create_access_token
+from app.services.auth import password_hasher, PasswordHashBusy, create_access_token, invalidate_user
+from app.api.deps import get_current_user
 from fastapi.security import OAuth2PasswordRequestForm
 from datetime import timedelta
 
 router = APIRouter()
 
+
+def _busy_error(e: PasswordHashBusy) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail=str(e),
+        headers={"Retry-After": "1"},
+    )
+
+
 @router.post("/signup", response_model=UserResponse)
 async def signup(user: UserCreate, db: AsyncSession = Depends(get_db)):
     """Register a new user (Patient or Medical Staff)."""
@@ -23,8 +33,11 @@ async def signup(user: UserCreate, db: AsyncSession = Depends(get_db)):
             detail="Username already registered"
         )
     
-    # Create new user
-    hashed_pw = get_password_hash(user.password)
+    # Create new user (hashed off the event loop)
+    try:
+        hashed_pw = await password_hasher.hash(user.password)
+    except PasswordHashBusy as e:
+        raise _busy_error(e)
     db_user = User(
         username=user.username,
         hashed_password=hashed_pw,
@@ -43,13 +56,29 @@ async def login(form_data: OAuth2PasswordRequestForm = Depends(), db: AsyncSessi
     result = await db.execute(select(User).filter(User.username == form_data.username))
     user = result.scalars().first()
     
-    if not user or not verify_password(form_data.password, user.hashed_password):
+    # Verify off the event loop; unknown users cost the same time as wrong passwords
+    try:
+        if user:
+            valid, new_hash = await password_hasher.verify_and_update(form_data.password, user.hashed_password)
+        else:
+            await password_hasher.dummy_verify()
+            valid, new_hash = False, None
+    except PasswordHashBusy as e:
+        raise _busy_error(e)
+    
+    if not valid:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
     
+    # Upgrade hashes made with a different BCRYPT_ROUNDS
+    if new_hash:
+        user.hashed_password = new_hash
+        await db.commit()
+        invalidate_user(user.username)
+    
     # Create token
     access_token_expires = timedelta(minutes=30)
     access_token = create_access_token(
@@ -57,3 +86,9 @@ async def login(form_data: OAuth2PasswordRequestForm = Depends(), db: AsyncSessi
         expires_delta=access_token_expires
     )
     return {"access_token": access_token, "token_type": "bearer", "user": user}
+
+
+@router.get("/me", response_model=UserResponse)
+async def read_current_user(user: UserResponse = Depends(get_current_user)):
+    """Return the user the bearer token belongs to."""
+    return user
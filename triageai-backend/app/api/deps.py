@@ -0,0 +1,67 @@
+"""Shared API dependencies: the authenticated user and role checks."""
+from fastapi import Depends, HTTPException, status
+from fastapi.security import OAuth2PasswordBearer
+from jose import JWTError
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database import get_db
+from app.models.user import User
+from app.schemas.user import UserResponse
+from app.services.auth import decode_access_token, user_cache
+
+oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
+
+
+def _credentials_error() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Could not validate credentials",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+
+
+async def get_current_user(
+    token: str = Depends(oauth2_scheme),
+    db: AsyncSession = Depends(get_db)
+) -> UserResponse:
+    """
+    Resolve the bearer token to its user.
+    
+    Token claims and users are cached, so a repeat request with the same
+    token needs neither a signature check nor a database query.
+    """
+    try:
+        claims = decode_access_token(token)
+    except JWTError:
+        raise _credentials_error()
+    
+    username = claims.get("sub")
+    if not username:
+        raise _credentials_error()
+    
+    user = user_cache.get(username)
+    if user is None:
+        result = await db.execute(select(User).where(User.username == username))
+        row = result.scalars().first()
+        if not row:
+            raise _credentials_error()
+        user = UserResponse.model_validate(row)
+        user_cache.set(username, user)
+    return user
+
+
+def require_role(*roles: str):
+    """
+    Dependency factory restricting a route to the given roles.
+    
+    Usage:
+        @router.post("/...", dependencies=[Depends(require_role(ROLE_MEDICAL_STAFF))])
+    """
+    async def check_role(user: UserResponse = Depends(get_current_user)) -> UserResponse:
+        if user.role not in roles:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail=f"Requires role: {', '.join(roles)}"
+            )
+        return user
+    return check_role
@@ -0,0 +1,80 @@
+"""Prometheus metrics endpoint."""
+from typing import Iterable
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+from app.database import engine
+from app.services.auth import password_hasher, token_cache, user_cache
+from app.services.gemini_service import gemini_service
+from app.services.health import health_prober
+from app.services.persistence import patient_writer
+from app.services.queue_service import patient_queue
+from app.services.realtime import manager, broadcaster
+from app.utils.metrics import Family, registry
+
+router = APIRouter(tags=["Monitoring"])
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def collect_runtime() -> Iterable[Family]:
+    """Queue depths, cache counters, WebSocket and DB pool state, read at scrape time."""
+    yield ("triageai_writer_queue_depth", "gauge",
+           "Triage records waiting for the group-commit writer.",
+           [({}, patient_writer.queue_depth())])
+
+    hasher = password_hasher.stats()
+    yield ("triageai_password_hash_pending", "gauge",
+           "Password hashes queued or running on the hash executor.",
+           [({}, hasher["pending"])])
+    yield ("triageai_password_hash_rejected_total", "counter",
+           "Password hashes refused because the executor queue was full.",
+           [({}, hasher["rejected"])])
+
+    caches = {"token": token_cache.stats(), "user": user_cache.stats()}
+    yield ("triageai_cache_hits_total", "counter", "Cache lookups served from the cache.",
+           [({"cache": name}, stats["hits"]) for name, stats in caches.items()])
+    yield ("triageai_cache_misses_total", "counter", "Cache lookups that missed.",
+           [({"cache": name}, stats["misses"]) for name, stats in caches.items()])
+    yield ("triageai_cache_entries", "gauge", "Entries currently cached.",
+           [({"cache": name}, stats["size"]) for name, stats in caches.items()])
+
+    ws = manager.stats()
+    yield ("triageai_websocket_connections", "gauge", "Open WebSocket connections by wire format.",
+           [({"format": name}, count) for name, count in ws["formats"].items()] or [({"format": "json"}, 0)])
+    yield ("triageai_websocket_queue_depth", "gauge", "Messages queued across all WebSocket clients.",
+           [({}, ws["queue_depth_total"])])
+    yield ("triageai_websocket_messages_total", "counter", "WebSocket messages by outcome.",
+           [({"outcome": outcome}, ws[outcome]) for outcome in ("messages_sent", "dropped", "coalesced")])
+    yield ("triageai_websocket_evictions_total", "counter", "Slow WebSocket clients disconnected.",
+           [({}, ws["evictions"])])
+    yield ("triageai_broadcast_published_total", "counter", "Events published to the broadcast backend.",
+           [({"backend": broadcaster.name}, broadcaster.stats()["published"])])
+
+    yield ("triageai_queue_waiting", "gauge", "Patients in the live waiting queue.",
+           [({}, len(patient_queue))])
+
+    breaker = gemini_service.breaker.stats()
+    yield ("triageai_gemini_circuit_open", "gauge", "1 while Gemini calls are skipped after repeated failures.",
+           [({}, int(breaker["state"] == "open"))])
+    yield ("triageai_gemini_circuit_rejected_total", "counter", "Gemini calls skipped by the open circuit.",
+           [({}, breaker["rejected"])])
+    yield ("triageai_ready", "gauge", "1 when this worker reports ready.",
+           [({}, int(health_prober.readiness()["ready"]))])
+
+    pool = engine.pool
+    if hasattr(pool, "checkedout"):
+        yield ("triageai_db_pool_checked_out", "gauge", "Database connections in use.",
+               [({}, pool.checkedout())])
+        yield ("triageai_db_pool_size", "gauge", "Configured database pool size.",
+               [({}, pool.size())])
+        yield ("triageai_db_pool_overflow", "gauge", "Connections open beyond the pool size.",
+               [({}, max(pool.overflow(), 0))])
+
+
+registry.add_collector(collect_runtime)
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Stage latency histograms and runtime gauges in Prometheus text format."""
+    return PlainTextResponse(registry.render(), media_type=CONTENT_TYPE)
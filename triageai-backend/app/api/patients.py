@@ -1,33 +1,42 @@
 """Patient data API endpoints."""
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.ext.asyncio import AsyncSession
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 from sqlalchemy import select
+from datetime import datetime
 from typing import List, Optional
-from app.database import get_db
-from app.models.patient import Patient
-from app.schemas.patient import PatientResponse
+from app.database import get_db, get_session_factory
+from app.models.patient import Patient, PATIENT_SUMMARY_COLUMNS
+from app.schemas.patient import PatientResponse, PatientSummary
+from app.utils.pagination import apply_keyset, encode_cursor
+from app.services.export_service import EXPORT_FORMATS, export_patients, parquet_available
 
 router = APIRouter(prefix="/api/patients", tags=["Patients"])
 
 
-@router.get("", response_model=List[PatientResponse])
+@router.get("", response_model=List[PatientSummary])
 async def list_patients(
+    response: Response,
     risk_level: Optional[str] = Query(None, description="Filter by risk level: HIGH, MEDIUM, LOW"),
     limit: int = Query(50, ge=1, le=500, description="Maximum number of records"),
+    cursor: Optional[str] = Query(None, description="Cursor from the previous page's X-Next-Cursor header"),
     db: AsyncSession = Depends(get_db)
 ):
     """
-    List all triaged patients with optional filtering.
+    List triaged patients with optional filtering and keyset pagination.
     
     Query Parameters:
     - risk_level: Filter by HIGH, MEDIUM, or LOW
     - limit: Max records to return (default 50, max 500)
+    - cursor: Opaque position returned by the previous page
     
-    Returns list of patients ordered by triage time (newest first).
+    Returns lightweight patient summaries ordered by triage time (newest first).
+    When more records exist, the `X-Next-Cursor` response header holds the
+    cursor for the next page. Use `GET /api/patients/{id}` for full detail.
     """
     try:
         # Build query
-        query = select(Patient).order_by(Patient.created_at.desc()).limit(limit)
+        query = select(*PATIENT_SUMMARY_COLUMNS)
         
         # Apply risk level filter
         if risk_level:
@@ -36,11 +45,22 @@ async def list_patients(
                 raise HTTPException(status_code=400, detail="Invalid risk_level. Must be HIGH, MEDIUM, or LOW")
             query = query.where(Patient.risk_level == risk_upper)
         
+        # Seek past the previous page; fetch one extra row to detect a next page
+        try:
+            query = apply_keyset(query, cursor).limit(limit + 1)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        
         # Execute query
         result = await db.execute(query)
-        patients = result.scalars().all()
+        rows = result.all()
+        
+        if len(rows) > limit:
+            rows = rows[:limit]
+            last = rows[-1]
+            response.headers["X-Next-Cursor"] = encode_cursor(last.created_at, last.id)
         
-        return patients
+        return rows
         
     except HTTPException:
         raise
@@ -48,6 +68,41 @@ async def list_patients(
         raise HTTPException(status_code=500, detail=f"Query failed: {str(e)}")
 
 
+@router.get("/export")
+async def export_patient_records(
+    format: str = Query("ndjson", description="Output format: ndjson, csv, or parquet"),
+    start: Optional[datetime] = Query(None, description="Triaged at or after (UTC)"),
+    end: Optional[datetime] = Query(None, description="Triaged before (UTC)"),
+    risk_level: Optional[str] = Query(None, description="Filter by risk level: HIGH, MEDIUM, LOW"),
+    session_factory: async_sessionmaker = Depends(get_session_factory)
+):
+    """
+    Stream a bulk export of triage records.
+    
+    Rows are streamed oldest-first in constant memory, reading the table in
+    short keyset batches so long exports never hold a database lock.
+    Parquet output requires pyarrow on the server.
+    """
+    export_format = format.lower()
+    if export_format not in EXPORT_FORMATS:
+        raise HTTPException(status_code=400, detail="Invalid format. Must be ndjson, csv, or parquet")
+    if export_format == "parquet" and not parquet_available():
+        raise HTTPException(status_code=501, detail="Parquet export is not available (pyarrow not installed)")
+    
+    risk_upper = None
+    if risk_level:
+        risk_upper = risk_level.upper()
+        if risk_upper not in ["HIGH", "MEDIUM", "LOW"]:
+            raise HTTPException(status_code=400, detail="Invalid risk_level. Must be HIGH, MEDIUM, or LOW")
+    
+    media_type, extension = EXPORT_FORMATS[export_format]
+    return StreamingResponse(
+        export_patients(export_format, session_factory, start, end, risk_upper),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="patients.{extension}"'}
+    )
+
+
 @router.get("/{patient_id}", response_model=PatientResponse)
 async def get_patient(
     patient_id: str,
@@ -0,0 +1,52 @@
+"""Admin endpoints for the request profiler."""
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import FileResponse
+from app.api.deps import require_role
+from app.middleware.profiling import ADMIN_PREFIX
+from app.schemas.profiling import ProfileListResponse, ProfilingStatus, ProfilingUpdate
+from app.services.auth import ROLE_MEDICAL_STAFF
+from app.services.profiler import request_profiler
+
+router = APIRouter(
+    prefix=ADMIN_PREFIX,
+    tags=["Profiling"],
+    dependencies=[Depends(require_role(ROLE_MEDICAL_STAFF))]
+)
+
+
+@router.get("", response_model=ProfilingStatus)
+async def get_profiling():
+    """Current sample rate and profiler activity for this worker."""
+    return request_profiler.status()
+
+
+@router.put("", response_model=ProfilingStatus)
+async def update_profiling(update: ProfilingUpdate):
+    """
+    Change the fraction of requests profiled at random.
+
+    Applies to the worker that serves this request only; the X-Profile
+    header works regardless of the sample rate.
+    """
+    request_profiler.sample_rate = update.sample_rate
+    return request_profiler.status()
+
+
+@router.get("/profiles", response_model=ProfileListResponse)
+async def list_profiles():
+    """Stored profiles, newest first."""
+    return {"profiles": request_profiler.store.list()}
+
+
+@router.get("/profiles/{profile_id}")
+async def get_profile(profile_id: str):
+    """
+    Download a profile as folded stacks.
+
+    Render with `flamegraph.pl profile.folded > profile.svg`, or open the
+    file in speedscope.
+    """
+    path = request_profiler.store.path(profile_id)
+    if path is None:
+        raise HTTPException(status_code=404, detail=f"Profile {profile_id} not found")
+    return FileResponse(path, media_type="text/plain", filename=f"{profile_id}.folded")
@@ -0,0 +1,87 @@
+"""Live waiting-queue API endpoints."""
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
+from typing import Optional
+from app.database import get_db
+from app.models.patient import Patient
+from app.schemas.queue import QueueEntry, QueueResponse, ReprioritizeRequest
+from app.services.queue_service import patient_queue, queue_entry, WAITING, DISCHARGED
+from app.services.realtime import publish_queue_change
+
+router = APIRouter(prefix="/api/queue", tags=["Queue"])
+
+
+async def _load_waiting_patient(db: AsyncSession, patient_id: str) -> Patient:
+    """Fetch a patient who is still waiting, or raise 404/409."""
+    result = await db.execute(select(Patient).where(Patient.id == patient_id))
+    patient = result.scalar_one_or_none()
+    if not patient:
+        raise HTTPException(status_code=404, detail=f"Patient {patient_id} not found")
+    if patient.status != WAITING:
+        raise HTTPException(status_code=409, detail=f"Patient {patient_id} is not waiting (status {patient.status})")
+    return patient
+
+
+@router.get("", response_model=QueueResponse)
+async def get_queue(
+    limit: Optional[int] = Query(None, ge=1, le=1000, description="Maximum number of patients"),
+    department: Optional[str] = Query(None, description="Only patients whose department contains this name"),
+    priority: Optional[str] = Query(None, description="Filter by priority: HIGH, MEDIUM, LOW"),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Get waiting patients in treatment order.
+    
+    Ordered by priority (clinician override, else triage risk level), then
+    model confidence, then arrival. Served from the in-memory queue; live
+    changes arrive over the WebSocket as `{"type": "queue", ...}` messages.
+    """
+    priority_upper = None
+    if priority:
+        priority_upper = priority.upper()
+        if priority_upper not in ["HIGH", "MEDIUM", "LOW"]:
+            raise HTTPException(status_code=400, detail="Invalid priority. Must be HIGH, MEDIUM, or LOW")
+    
+    if not patient_queue.loaded:
+        await patient_queue.rebuild(db)
+    
+    return QueueResponse(
+        total_waiting=len(patient_queue),
+        patients=patient_queue.snapshot(limit, department, priority_upper)
+    )
+
+
+@router.patch("/{patient_id}", response_model=QueueEntry)
+async def reprioritize_patient(
+    patient_id: str,
+    request: ReprioritizeRequest,
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Override a waiting patient's queue priority.
+    
+    The original triage risk level is kept; only queue ordering changes.
+    """
+    patient = await _load_waiting_patient(db, patient_id)
+    patient.priority_override = request.priority.value
+    await db.commit()
+    
+    entry = queue_entry(patient)
+    publish_queue_change("update", entry)
+    return entry
+
+
+@router.post("/{patient_id}/discharge", response_model=QueueEntry)
+async def discharge_patient(
+    patient_id: str,
+    db: AsyncSession = Depends(get_db)
+):
+    """Remove a patient from the waiting queue."""
+    patient = await _load_waiting_patient(db, patient_id)
+    patient.status = DISCHARGED
+    await db.commit()
+    
+    entry = queue_entry(patient)
+    publish_queue_change("discharge", entry)
+    return entry
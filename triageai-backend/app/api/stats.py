@@ -1,12 +1,16 @@
 """Analytics and system health API endpoints."""
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func
+from datetime import datetime
+from typing import List, Optional
 from app.database import get_db
-from app.models.patient import Patient
-from app.schemas.stats import StatsResponse, HealthResponse
-from app.services.ml_service import ml_service
-from app.services.gemini_service import gemini_service
+from app.schemas.stats import (
+    StatsResponse, HealthResponse, LivenessResponse, ReadinessResponse, TrendsResponse, CohortResponse
+)
+from app.services.health import health_prober
+from app.services.stats_service import triage_stats
+from app.services.trends_service import get_trends
+from app.services.cohort_service import count_cohort
 
 router = APIRouter(prefix="/api", tags=["Analytics"])
 
@@ -20,64 +24,111 @@ async def get_statistics(db: AsyncSession = Depends(get_db)):
     - Total patient count
     - Risk level distribution (HIGH/MEDIUM/LOW counts)
     - Department workload distribution
+    
+    Served from counters maintained on insert; never scans the patients table.
     """
     try:
-        # Total patients
-        total_result = await db.execute(select(func.count(Patient.id)))
-        total_patients = total_result.scalar()
-        
-        # Risk distribution
-        risk_result = await db.execute(
-            select(Patient.risk_level, func.count(Patient.id))
-            .group_by(Patient.risk_level)
-        )
-        risk_distribution = {
-            "HIGH": 0,
-            "MEDIUM": 0,
-            "LOW": 0
-        }
-        for risk, count in risk_result.all():
-            risk_distribution[risk] = count
-        
-        # Department load
-        dept_result = await db.execute(
-            select(Patient.department, func.count(Patient.id))
-            .group_by(Patient.department)
-        )
-        department_load = {dept: count for dept, count in dept_result.all()}
-        
-        return StatsResponse(
-            total_patients=total_patients,
-            risk_distribution=risk_distribution,
-            department_load=department_load
-        )
-        
+        return await triage_stats.snapshot(db)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Stats query failed: {str(e)}")
 
 
+@router.get("/stats/trends", response_model=TrendsResponse)
+async def get_trend_statistics(
+    window: str = Query("24h", description="Lookback window, e.g. 90m, 24h, 7d"),
+    bucket: str = Query("hour", description="Bucket size: minute, hour, or day"),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Get triage counts over time.
+    
+    Returns one point per bucket (empty buckets included) with total count,
+    risk distribution, department load and clinical rules triggered.
+    Reads only pre-aggregated rollups, never the patients table.
+    Minute buckets are retained for ROLLUP_MINUTE_RETENTION_HOURS.
+    """
+    try:
+        return await get_trends(db, window, bucket.lower())
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Trends query failed: {str(e)}")
+
+
+@router.get("/stats/cohort", response_model=CohortResponse)
+async def get_cohort_statistics(
+    symptoms: List[str] = Query([], description="Canonical symptom names, e.g. chest_pain"),
+    conditions: List[str] = Query([], description="Canonical condition names, e.g. diabetes"),
+    match: str = Query("all", description="all: every listed item, any: at least one"),
+    risk_level: Optional[str] = Query(None, description="Filter by risk level: HIGH, MEDIUM, LOW"),
+    start: Optional[datetime] = Query(None, description="Triaged at or after (UTC)"),
+    end: Optional[datetime] = Query(None, description="Triaged before (UTC)"),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Count patients in a symptom/condition cohort.
+    
+    Example: `?symptoms=chest_pain&conditions=diabetes&risk_level=HIGH&start=2026-01-05`
+    
+    Filters run as bitwise predicates on the stored symptom/condition masks,
+    so no JSON is decoded per row.
+    """
+    risk_upper = None
+    if risk_level:
+        risk_upper = risk_level.upper()
+        if risk_upper not in ["HIGH", "MEDIUM", "LOW"]:
+            raise HTTPException(status_code=400, detail="Invalid risk_level. Must be HIGH, MEDIUM, or LOW")
+    
+    try:
+        return await count_cohort(db, symptoms, conditions, match.lower(), risk_upper, start, end)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Cohort query failed: {str(e)}")
+
+
 @router.get("/health", response_model=HealthResponse)
-async def health_check(db: AsyncSession = Depends(get_db)):
+async def health_check():
     """
     System health check endpoint.
     
-    Verifies:
+    Reports:
     - ML model is loaded
     - Gemini API is available
-    - Database is connected
+    - Database is connected (last background probe)
     
-    Returns status and component availability.
+    Status is "ok" only when the worker is ready (see /api/health/ready).
     """
-    try:
-        # Check database
-        await db.execute(select(1))
-        db_status = "connected"
-    except Exception:
-        db_status = "error"
-    
+    state = health_prober.readiness()
     return HealthResponse(
-        status="ok" if db_status == "connected" else "degraded",
-        model_loaded=ml_service.is_loaded(),
-        gemini_available=gemini_service.is_available(),
-        database=db_status
+        status="ok" if state["ready"] else "degraded",
+        model_loaded=state["model_loaded"],
+        gemini_available=state["gemini_available"],
+        database=state["database"]
     )
+
+
+@router.get("/health/live", response_model=LivenessResponse)
+async def liveness():
+    """
+    Liveness probe.
+    
+    Answers whenever the event loop does; checks no dependencies, so a
+    database or Gemini outage never gets the process restarted.
+    """
+    return LivenessResponse(status="alive")
+
+
+@router.get("/health/ready", response_model=ReadinessResponse)
+async def readiness(response: Response):
+    """
+    Readiness probe: 200 when ready for traffic, 503 otherwise.
+    
+    Ready means the last background database probe succeeded recently and
+    the ML model is loaded and warmed up. Served from cached state; never
+    touches the database.
+    """
+    state = health_prober.readiness()
+    if not state["ready"]:
+        response.status_code = 503
+    return ReadinessResponse(status="ready" if state["ready"] else "not_ready", **state)
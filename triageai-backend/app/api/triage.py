@@ -1,10 +1,12 @@
 """Triage API endpoints."""
 from fastapi import APIRouter, Depends, UploadFile, File, HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
+from app.config import settings
 from app.database import get_db
 from app.schemas.patient import PatientInput, TriageOutput
 from app.services.triage_service import run_full_triage
 from app.services.ehr_parser import parse_ehr_document
+from app.services.gemini_service import GeminiUnavailable
 
 router = APIRouter(prefix="/api/triage", tags=["Triage"])
 
@@ -69,6 +71,8 @@ async def triage_from_document(
         result = await run_full_triage(patient_input, db)
         return result
         
+    except GeminiUnavailable as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": str(int(settings.GEMINI_RESET_SECONDS))})
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
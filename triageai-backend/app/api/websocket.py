@@ -1,33 +1,42 @@
-"""WebSocket manager for real-time updates."""
-from fastapi import APIRouter, WebSocket, WebSocketDisconnect
-from typing import List
+"""WebSocket endpoint for real-time triage updates."""
+from fastapi import APIRouter, Depends, WebSocket, WebSocketDisconnect
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from app.database import get_session_factory
+from app.services.realtime import manager, broadcaster, handle_client_message
 
-class ConnectionManager:
-    def __init__(self):
-        self.active_connections: List[WebSocket] = []
-
-    async def connect(self, websocket: WebSocket):
-        await websocket.accept()
-        self.active_connections.append(websocket)
+router = APIRouter()
 
-    def disconnect(self, websocket: WebSocket):
-        self.active_connections.remove(websocket)
 
-    async def broadcast(self, message: str):
-        for connection in self.active_connections:
-            await connection.send_text(message)
+@router.get("/api/ws/stats", tags=["Realtime"])
+async def websocket_stats():
+    """WebSocket fan-out metrics: connections, queue depth, drops, evictions and broadcast backend."""
+    return {**manager.stats(), "broadcast": broadcaster.stats()}
 
-manager = ConnectionManager()
-router = APIRouter()
 
 @router.websocket("/ws")
-async def websocket_endpoint(websocket: WebSocket):
-    await manager.connect(websocket)
+async def websocket_endpoint(
+    websocket: WebSocket,
+    session_factory: async_sessionmaker = Depends(get_session_factory)
+):
+    """
+    Live triage event stream.
+    
+    Send `{"action": "subscribe", "departments": [...], "risk_levels": [...]}`
+    to receive a snapshot of matching recent patients followed by deltas.
+    Without a subscription, every triage event is delivered. Clients on
+    `triage.msgpack` may send the subscribe message as MessagePack.
+    """
+    client = await manager.connect(websocket)
     try:
         while True:
-            # Keep connection alive and listen for messages if needed
-            data = await websocket.receive_text()
-            # For now, just echo or ignore
-            pass 
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                raise WebSocketDisconnect(message.get("code", 1000))
+            data = message.get("text")
+            if data is None:
+                data = message.get("bytes", b"")
+            await handle_client_message(client, data, session_factory)
     except WebSocketDisconnect:
-        manager.disconnect(websocket)
+        pass
+    finally:
+        manager.disconnect(client)
@@ -1,6 +1,6 @@
 """Configuration settings for TriageAI backend."""
 from pydantic_settings import BaseSettings
-from typing import List
+from typing import Dict, List
 
 
 class Settings(BaseSettings):
@@ -8,15 +8,97 @@ class Settings(BaseSettings):
     
     # Gemini API
     GEMINI_API_KEY: str = ""
+    GEMINI_TIMEOUT_SECONDS: float = 15.0  # A call taking longer counts as a failure
+    GEMINI_FAILURE_THRESHOLD: int = 5  # Consecutive failures or timeouts before the circuit opens
+    GEMINI_RESET_SECONDS: float = 30.0  # Open circuit skips Gemini this long, then tries one call
     
     # Database
     DATABASE_URL: str = "sqlite+aiosqlite:///./triageai-backend/database/triageai.db"
     
+    # Database tuning (applied to every SQLite connection)
+    DB_JOURNAL_MODE: str = "WAL"
+    DB_SYNCHRONOUS: str = "NORMAL"
+    DB_CACHE_SIZE_KB: int = 65536
+    DB_MMAP_SIZE: int = 268435456
+    DB_BUSY_TIMEOUT_MS: int = 5000
+    
+    # Connection pool (file-backed databases only)
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30.0
+    
+    # Group commit for triage result persistence
+    PERSISTENCE_GROUP_COMMIT: bool = True
+    PERSISTENCE_BATCH_SIZE: int = 64
+    PERSISTENCE_FLUSH_INTERVAL_MS: float = 5.0
+    PERSISTENCE_QUEUE_SIZE: int = 1024
+    
+    # Statistics mirror refresh (picks up inserts from other workers)
+    STATS_REFRESH_SECONDS: float = 2.0
+    
+    # Trend rollups
+    ROLLUP_MINUTE_RETENTION_HOURS: int = 48
+    ROLLUP_PRUNE_INTERVAL_MINUTES: float = 10.0  # Expired minute buckets are deleted this often
+    TRENDS_MAX_POINTS: int = 5000
+    
+    # WebSocket fan-out
+    WS_QUEUE_SIZE: int = 100
+    WS_SLOW_CONSUMER_POLICY: str = "drop_oldest"  # "drop_oldest" or "evict"
+    WS_SEND_TIMEOUT_SECONDS: float = 5.0
+    WS_MAX_DROPPED: int = 1000
+    WS_SNAPSHOT_LIMIT: int = 100
+    WS_BATCH_INTERVAL_MS: float = 25.0  # Tick for batched subprotocols
+    WS_HEARTBEAT_SECONDS: float = 20.0  # 0 disables heartbeats
+    
+    # Cross-worker broadcast ("memory" for one worker, "unix" for several)
+    BROADCAST_BACKEND: str = "memory"
+    BROADCAST_SOCKET_DIR: str = "/tmp/triageai-broadcast"
+    BROADCAST_PEER_REFRESH_SECONDS: float = 5.0  # How long the list of peer sockets is cached
+    
+    # Password hashing (bcrypt runs on a dedicated thread pool, off the event loop)
+    BCRYPT_ROUNDS: int = 12  # Existing hashes are upgraded on next login when changed
+    PASSWORD_HASH_WORKERS: int = 2
+    PASSWORD_HASH_MAX_PENDING: int = 64  # Logins beyond this get 503 instead of queueing
+    
+    # Authenticated-user caches
+    AUTH_TOKEN_CACHE_SIZE: int = 10000  # Decoded tokens, each kept until it expires
+    AUTH_USER_CACHE_SIZE: int = 1000
+    AUTH_USER_CACHE_TTL_SECONDS: float = 60.0
+    
+    # Rate limiting ("METHOD /path": "N/second|minute|hour" per user or IP)
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMIT_RULES: Dict[str, str] = {
+        "POST /api/triage": "30/minute",
+        "POST /api/triage/upload": "10/minute",
+        "POST /auth/login": "20/minute",
+        "POST /auth/signup": "5/minute",
+    }
+    RATE_LIMIT_MAX_KEYS: int = 100000
+    RATE_LIMIT_TRUST_FORWARDED: bool = False  # Use X-Forwarded-For (only behind a trusted proxy)
+    
+    # Monitoring
+    METRICS_ENABLED: bool = True  # Serve Prometheus metrics at /metrics
+    
+    # Health probes (/api/health/ready serves the cached result)
+    HEALTH_PROBE_INTERVAL_SECONDS: float = 10.0
+    HEALTH_DB_TIMEOUT_SECONDS: float = 2.0
+    
+    # Request profiling (middleware and admin routes only installed when enabled)
+    PROFILING_ENABLED: bool = False
+    PROFILING_TOKEN: str = ""  # Requests with "X-Profile: <token>" are profiled; empty disables the header
+    PROFILING_SAMPLE_RATE: float = 0.0  # Fraction of other requests profiled at random
+    PROFILING_INTERVAL_MS: float = 5.0  # Stack sampling interval
+    PROFILING_MAX_CONCURRENT: int = 2
+    PROFILING_DIR: str = "profiles"
+    PROFILING_MAX_PROFILES: int = 200  # Oldest profiles deleted beyond this
+    
     # CORS
     CORS_ORIGINS: str = "http://localhost:3000,http://localhost:5173"
     
     # ML Model paths
     MODEL_DIR: str = "ml/models"
+    ML_MODEL_FILE: str = "xgb_model.pkl"  # e.g. xgb_model_compact.pkl from python -m ml.compress
+    QUICKFIX_MODEL_PATH: str = "app/models/quickfix_model.pkl"
     DATA_DIR: str = "ml/data"
     
     # Feature definitions
@@ -1,14 +1,88 @@
 """Async SQLAlchemy database setup."""
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
+from sqlalchemy import DateTime, event, inspect, text
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncEngine, AsyncSession, async_sessionmaker
 from sqlalchemy.orm import declarative_base
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 from app.config import settings
 
+
+def _is_sqlite(database_url: str) -> bool:
+    """Check if the URL points at a SQLite database."""
+    return make_url(database_url).get_backend_name() == "sqlite"
+
+
+def _is_sqlite_memory(database_url: str) -> bool:
+    """Check if the URL points at an in-memory SQLite database."""
+    database = make_url(database_url).database
+    return not database or database == ":memory:"
+
+
+def apply_sqlite_pragmas(dbapi_connection, connection_record=None):
+    """
+    Apply the SQLite tuning profile to a freshly opened connection.
+
+    WAL lets readers proceed while a writer commits, NORMAL synchronous
+    drops the per-commit fsync of the WAL (still durable across process
+    crashes), and busy_timeout makes writers wait for the lock instead of
+    failing immediately with "database is locked".
+    """
+    cursor = dbapi_connection.cursor()
+    try:
+        cursor.execute(f"PRAGMA journal_mode={settings.DB_JOURNAL_MODE}")
+        cursor.execute(f"PRAGMA synchronous={settings.DB_SYNCHRONOUS}")
+        # Negative cache_size is interpreted by SQLite as KiB
+        cursor.execute(f"PRAGMA cache_size=-{int(settings.DB_CACHE_SIZE_KB)}")
+        cursor.execute(f"PRAGMA mmap_size={int(settings.DB_MMAP_SIZE)}")
+        cursor.execute(f"PRAGMA busy_timeout={int(settings.DB_BUSY_TIMEOUT_MS)}")
+        cursor.execute("PRAGMA temp_store=MEMORY")
+    finally:
+        cursor.close()
+
+
+def build_engine(database_url: str = settings.DATABASE_URL) -> AsyncEngine:
+    """
+    Create an async engine with the tuning profile from settings.
+
+    File-backed SQLite databases get a bounded connection pool (aiosqlite
+    defaults to NullPool, which reopens the file and re-runs the pragmas on
+    every session). In-memory databases keep SQLAlchemy's StaticPool.
+
+    Args:
+        database_url: SQLAlchemy database URL
+
+    Returns:
+        Configured AsyncEngine
+    """
+    options = {"echo": False, "future": True}
+
+    if _is_sqlite(database_url):
+        options["connect_args"] = {"timeout": settings.DB_BUSY_TIMEOUT_MS / 1000}
+        if not _is_sqlite_memory(database_url):
+            options.update(
+                poolclass=AsyncAdaptedQueuePool,
+                pool_size=settings.DB_POOL_SIZE,
+                max_overflow=settings.DB_MAX_OVERFLOW,
+                pool_timeout=settings.DB_POOL_TIMEOUT,
+            )
+    else:
+        options.update(
+            pool_size=settings.DB_POOL_SIZE,
+            max_overflow=settings.DB_MAX_OVERFLOW,
+            pool_timeout=settings.DB_POOL_TIMEOUT,
+        )
+
+    async_engine = create_async_engine(database_url, **options)
+
+    if _is_sqlite(database_url):
+        event.listen(async_engine.sync_engine, "connect", apply_sqlite_pragmas)
+
+    return async_engine
+
+
 # Create async engine
-engine = create_async_engine(
-    settings.DATABASE_URL,
-    echo=False,
-    future=True
-)
+engine = build_engine(settings.DATABASE_URL)
 
 # Session factory
 AsyncSessionLocal = async_sessionmaker(
@@ -32,7 +106,110 @@ async def get_db():
             await session.close()
 
 
+# INSERT constructs with on_conflict_do_update, used for counter upserts
+UPSERT_INSERTS = {"sqlite": sqlite.insert, "postgresql": postgresql.insert}
+
+
+def check_upsert_support(dialect_name: str):
+    """
+    Refuse to run on a database without a supported upsert.
+    
+    Raises:
+        RuntimeError for dialects other than SQLite and PostgreSQL
+    """
+    if dialect_name not in UPSERT_INSERTS:
+        raise RuntimeError(
+            f"Unsupported database '{dialect_name}': statistics counters need "
+            f"INSERT ... ON CONFLICT ({', '.join(UPSERT_INSERTS)})"
+        )
+
+
+def upsert_insert(session: AsyncSession, table):
+    """INSERT for `table` supporting on_conflict_do_update on the session's database."""
+    dialect_name = session.get_bind().dialect.name
+    check_upsert_support(dialect_name)
+    return UPSERT_INSERTS[dialect_name](table)
+
+
+def get_session_factory() -> async_sessionmaker:
+    """Session factory dependency for work that outlives the request (e.g. streaming responses)."""
+    return AsyncSessionLocal
+
+
+def _add_missing_columns(sync_conn):
+    """
+    Add columns introduced after a table was created.
+    
+    create_all only creates missing tables, so databases from earlier
+    releases would lack newer columns. New columns must be nullable or
+    have a server default. Rows that predate the column get the column's
+    ``info["backfill"]`` value when it has one, instead of the default
+    meant for new rows.
+    """
+    inspector = inspect(sync_conn)
+    preparer = sync_conn.dialect.identifier_preparer
+    for table in Base.metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue
+        existing = {column["name"] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name in existing:
+                continue
+            ddl = (
+                f"ALTER TABLE {preparer.format_table(table)} "
+                f"ADD COLUMN {preparer.format_column(column)} "
+                f"{column.type.compile(dialect=sync_conn.dialect)}"
+            )
+            default = getattr(column.server_default, "arg", None)
+            if isinstance(default, str):
+                ddl += f" DEFAULT '{default}'"
+            sync_conn.execute(text(ddl))
+            if "backfill" in column.info:
+                sync_conn.execute(
+                    text(f"UPDATE {preparer.format_table(table)} SET {preparer.format_column(column)} = :value"),
+                    {"value": column.info["backfill"]}
+                )
+            print(f"✅ Added column {table.name}.{column.name}")
+
+
+def _normalize_sqlite_timestamps(sync_conn):
+    """
+    Give second-precision SQLite timestamps a microsecond part.
+    
+    SQLite stores datetimes as text. Rows written through a ``func.now()``
+    server default hold ``YYYY-MM-DD HH:MM:SS`` while SQLAlchemy binds
+    ``YYYY-MM-DD HH:MM:SS.ffffff``, so text comparisons (keyset cursors)
+    misorder the two within a second. Rewriting the old rows keeps the
+    comparison on the raw, indexed column.
+    """
+    if sync_conn.dialect.name != "sqlite":
+        return
+    preparer = sync_conn.dialect.identifier_preparer
+    for table in Base.metadata.sorted_tables:
+        for column in table.columns:
+            if not isinstance(column.type, DateTime) or column.server_default is None:
+                continue
+            name = preparer.format_column(column)
+            result = sync_conn.execute(text(
+                f"UPDATE {preparer.format_table(table)} SET {name} = {name} || '.000000' "
+                f"WHERE length({name}) = 19"
+            ))
+            if result.rowcount:
+                print(f"✅ Normalized {result.rowcount} {table.name}.{column.name} timestamps")
+
+
+def _add_missing_indexes(sync_conn):
+    """Create indexes introduced after a table was created."""
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(sync_conn, checkfirst=True)
+
+
 async def init_db():
     """Initialize database tables."""
+    check_upsert_support(engine.dialect.name)
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
+        await conn.run_sync(_add_missing_columns)
+        await conn.run_sync(_normalize_sqlite_timestamps)
+        await conn.run_sync(_add_missing_indexes)
@@ -1,20 +1,26 @@
 """TriageAI FastAPI Application."""
-from fastapi import FastAPI
+from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
-import os
-import joblib
-import pandas as pd
-import numpy as np
-import pickle
 from pydantic import BaseModel
-from typing import List, Optional
+from typing import List
 from app.config import settings
-from app.database import init_db
+from app.database import init_db, AsyncSessionLocal
 from app.services.ml_service import ml_service
+from app.services.quickfix_service import quickfix_service
 from app.services.gemini_service import gemini_service
-from app.api import triage, patients, stats, auth, websocket
+from app.services.health import health_prober
+from app.services.persistence import patient_writer
+from app.services.auth import password_hasher
+from app.services.realtime import manager as realtime_manager, broadcaster
+from app.services.stats_service import triage_stats
+from app.services.trends_service import prune_minute_rollups, rollup_pruner
+from app.services.queue_service import patient_queue
+from app.middleware.rate_limit import RateLimitMiddleware
+from app.middleware.profiling import ProfilingMiddleware
+from app.api import triage, patients, stats, queue, auth, websocket, metrics, profiling
 from app.models.user import User  # Import to register with Base
+from app.models.stats import TriageCounter, TriageRollup
 
 
 # --- Data Models ---
@@ -34,15 +40,6 @@ class QuickFixRequest(BaseModel):
     history: str
 
 
-# Global variables for Quick Fix model
-qf_model = None
-qf_le_history = None
-qf_le_disease = None
-qf_disease_to_medicine = None
-qf_symptoms_list = []
-qf_history_list = []
-
-
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Application lifecycle manager."""
@@ -53,28 +50,35 @@ async def lifespan(app: FastAPI):
     await init_db()
     print("✅ Database initialized")
     
-    # Load ML models
-    ml_service.load_models()
+    # Load statistics mirror and live queue, drop expired minute rollups
+    async with AsyncSessionLocal() as session:
+        await triage_stats.start(session)
+        await prune_minute_rollups(session)
+        waiting = await patient_queue.rebuild(session)
+    print(f"✅ Live queue loaded ({waiting} waiting)")
+    rollup_pruner.start()
+    
+    # Start group-commit writer for triage results
+    if settings.PERSISTENCE_GROUP_COMMIT:
+        await patient_writer.start()
+    
+    # Join cross-worker WebSocket broadcast and start heartbeats
+    await broadcaster.start()
+    realtime_manager.start_heartbeat()
+    
+    # Load ML models and warm up off the event loop (not ready until done)
+    if ml_service.load_models():
+        ml_service.start_warm_up()
 
     # Load Quick Fix Model
-    global qf_model, qf_le_history, qf_le_disease, qf_disease_to_medicine, qf_symptoms_list, qf_history_list
-    try:
-        with open("app/models/quickfix_model.pkl", "rb") as f:
-            quickfix_artifacts = pickle.load(f)
-            qf_model = quickfix_artifacts["model_disease"]
-            qf_le_history = quickfix_artifacts["le_history"]
-            qf_le_disease = quickfix_artifacts["le_disease"]
-            qf_disease_to_medicine = quickfix_artifacts["disease_to_medicine"]
-            qf_symptoms_list = quickfix_artifacts["all_symptoms"]
-            qf_history_list = quickfix_artifacts["all_history"]
-        print("✅ Quick Fix model loaded successfully")
-    except Exception as e:
-        print(f"⚠️ Failed to load Quick Fix model: {e}")
-        qf_model = None
+    quickfix_service.load_models()
     
     # Initialize Gemini
     gemini_service.initialize()
     
+    # Cache database health for the liveness/readiness probes
+    await health_prober.start()
+    
     print("✅ Application startup complete")
     print("📖 API Docs: http://localhost:8000/docs")
     
@@ -82,6 +86,13 @@ async def lifespan(app: FastAPI):
     
     # Shutdown
     print("👋 Shutting down TriageAI Backend...")
+    await health_prober.stop()
+    await ml_service.stop_warm_up()
+    await rollup_pruner.stop()
+    await patient_writer.stop()
+    await broadcaster.stop()
+    await realtime_manager.close_all()
+    password_hasher.shutdown()
 
 
 # Create FastAPI app
@@ -113,6 +124,14 @@ app = FastAPI(
     redoc_url="/redoc"
 )
 
+# Profile selected requests (innermost, so rate-limited requests are never profiled)
+if settings.PROFILING_ENABLED:
+    app.add_middleware(ProfilingMiddleware)
+
+# Rate limiting: reject over-budget clients before routing (added before
+# CORS so CORS headers still apply to 429s)
+app.add_middleware(RateLimitMiddleware)
+
 # CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -120,13 +139,20 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "Retry-After", "X-Profile-Id"],
 )
 
 # Register routers
 app.include_router(triage.router)
 app.include_router(patients.router)
+app.include_router(stats.router)
+app.include_router(queue.router)
 app.include_router(auth.router, prefix="/auth", tags=["auth"])
 app.include_router(websocket.router)
+if settings.METRICS_ENABLED:
+    app.include_router(metrics.router)
+if settings.PROFILING_ENABLED:
+    app.include_router(profiling.router)
 
 
 @app.get("/")
@@ -141,61 +167,20 @@ async def root():
 
 @app.get("/api/symptoms")
 async def get_symptoms():
-    if not qf_model:
+    if not quickfix_service.is_loaded():
         raise HTTPException(status_code=503, detail="Quick Fix model not loaded")
     return {
-        "symptoms": qf_symptoms_list,
-        "history": qf_history_list
+        "symptoms": quickfix_service.symptoms,
+        "history": quickfix_service.history
     }
 
 @app.post("/api/quick-fix")
 async def quick_fix_predict(data: QuickFixRequest):
-    if not qf_model:
+    if not quickfix_service.is_loaded():
         raise HTTPException(status_code=503, detail="Quick Fix model not loaded")
     
     try:
-        # Prepare Input Vector
-        input_vector = []
-        
-        # Encode History
-        # Handle unknown history gracefully by defaulting to "None"
-        try:
-            history_val = qf_le_history.transform([data.history])[0]
-        except ValueError:
-             try:
-                history_val = qf_le_history.transform(["None"])[0] 
-             except:
-                history_val = 0 # Fallback
-        
-        # Encode Symptoms (Multi-hot)
-        # Start with all zeros
-        symptom_vector = [0] * len(qf_symptoms_list)
-        
-        for symptom in data.symptoms:
-            if symptom in qf_symptoms_list:
-                idx = qf_symptoms_list.index(symptom)
-                symptom_vector[idx] = 1
-        
-        # Combine
-        X_input = [symptom_vector + [history_val]]
-        
-        # Predict Disease
-        disease_idx = qf_model.predict(X_input)[0]
-        disease = qf_le_disease.inverse_transform([disease_idx])[0]
-        
-        # Lookup Medicine
-        medicine = qf_disease_to_medicine.get(disease, "Consult Doctor")
-        
-        # Confidence
-        probs = qf_model.predict_proba(X_input)[0]
-        confidence = float(probs[disease_idx])
-        
-        return {
-            "disease": disease,
-            "medicine": medicine,
-            "confidence": round(confidence, 2)
-        }
-
+        return quickfix_service.predict(data.symptoms, data.history)
     except Exception as e:
         print(f"Quick Fix Error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -6,6 +6,7 @@ from app.config import settings
 from app.database import init_db
 from app.api import auth, websocket
 from app.models.user import User
+from app.services.auth import password_hasher
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
@@ -15,6 +16,7 @@ async def lifespan(app: FastAPI):
     print("✅ Application startup complete")
     yield
     print("👋 Shutting down TriageAI Backend...")
+    password_hasher.shutdown()
 
 app = FastAPI(
     title="TriageAI Backend (Auth)",
@@ -0,0 +1,73 @@
+"""Profile selected requests into flamegraph files.
+
+A request is profiled when it carries ``X-Profile: <PROFILING_TOKEN>`` or
+is picked at random at the profiler's sample rate (adjustable at runtime
+through /api/admin/profiling). The response of a profiled request carries
+``X-Profile-Id``; fetch the flamegraph from
+/api/admin/profiling/profiles/{id}.
+
+Only installed when PROFILING_ENABLED is set, so a disabled profiler adds
+no per-request work.
+"""
+import asyncio
+import time
+from typing import Optional
+from app.services.profiler import RequestProfiler, request_profiler
+
+ADMIN_PREFIX = "/api/admin/profiling"
+
+
+class ProfilingMiddleware:
+    """Raw ASGI middleware wrapping chosen requests in a stack sampler."""
+
+    def __init__(self, app, profiler: Optional[RequestProfiler] = None):
+        self.app = app
+        self.profiler = profiler or request_profiler
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"].startswith(ADMIN_PREFIX):
+            return await self.app(scope, receive, send)
+
+        reason = self.profiler.reason(dict(scope.get("headers") or ()))
+        if reason is None:
+            return await self.app(scope, receive, send)
+
+        sampler = self.profiler.begin()
+        if sampler is None:
+            return await self.app(scope, receive, send)
+
+        profile_id = None
+        response_status = [500]
+
+        async def send_with_id(message):
+            if message["type"] == "http.response.start":
+                response_status[0] = message["status"]
+                message["headers"] = list(message.get("headers", [])) + [(b"x-profile-id", profile_id.encode())]
+            await send(message)
+
+        started = time.perf_counter()
+        try:
+            profile_id = self.profiler.store.new_id()
+            await self.app(scope, receive, send_with_id)
+        finally:
+            duration = time.perf_counter() - started
+            counts = self.profiler.end(sampler)
+            if profile_id is not None:
+                await self._save(profile_id, counts, {
+                    "method": scope["method"],
+                    "path": scope["path"],
+                    "status": response_status[0],
+                    "reason": reason,
+                    "duration_ms": round(duration * 1000, 2),
+                    "samples": sum(counts.values()),
+                    "created_at": time.time(),
+                })
+
+    async def _save(self, profile_id: str, counts, meta: dict):
+        """Write the profile off the event loop; a failed write never fails the request."""
+        try:
+            await asyncio.get_running_loop().run_in_executor(
+                None, self.profiler.store.save, profile_id, counts, meta
+            )
+        except Exception as e:
+            print(f"⚠️  Saving profile {profile_id} failed: {e}")
@@ -0,0 +1,173 @@
+"""Per-client token-bucket rate limiting.
+
+Runs as raw ASGI middleware in front of the routers, so a rejected request
+costs one dictionary lookup: no routing, database session or model work.
+Clients are identified by the bearer token's user (see
+app.services.auth.decode_access_token) and otherwise by IP address.
+
+Budgets are configured per route in settings.RATE_LIMIT_RULES as
+``"METHOD /path": "N/second|minute|hour"``; each client may burst up to N
+requests and then refills at N per period.
+"""
+import json
+import math
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Optional, Tuple
+from jose import JWTError
+from app.config import settings
+from app.services.auth import decode_access_token
+
+PERIODS = {"second": 1.0, "minute": 60.0, "hour": 3600.0}
+
+
+class RateLimitRule:
+    """Bucket capacity and refill rate for one route."""
+
+    __slots__ = ("name", "capacity", "refill_per_second")
+
+    def __init__(self, name: str, capacity: int, period_seconds: float):
+        self.name = name
+        self.capacity = capacity
+        self.refill_per_second = capacity / period_seconds
+
+    @classmethod
+    def parse(cls, name: str, spec: str) -> "RateLimitRule":
+        """
+        Parse a budget like "30/minute".
+
+        Raises:
+            ValueError for malformed budgets
+        """
+        try:
+            count, period = spec.split("/")
+            return cls(name, int(count), PERIODS[period.strip()])
+        except (ValueError, KeyError):
+            raise ValueError(f"Invalid rate limit {spec!r} for {name}. Expected N/second, N/minute or N/hour")
+
+
+class TokenBucketStore:
+    """
+    Token buckets keyed by (route, client), bounded in memory.
+
+    Buckets are updated without awaiting, so on the event loop each update
+    is atomic and needs no lock. Buckets are kept in least-recently-used
+    order: once a bucket has been idle long enough to refill completely it
+    is indistinguishable from a new one and is dropped, and the least
+    recently used bucket is evicted when max_keys is reached.
+    """
+
+    def __init__(self, max_keys: Optional[int] = None, clock: Callable[[], float] = time.monotonic):
+        self.max_keys = max_keys or settings.RATE_LIMIT_MAX_KEYS
+        self.clock = clock
+        # key -> [tokens, last_refill, seconds_until_full_when_idle]
+        self._buckets: "OrderedDict[Tuple[str, str], list]" = OrderedDict()
+        self.rejected = 0
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+    def consume(self, rule: RateLimitRule, client: str) -> float:
+        """
+        Take one token for a client.
+
+        Returns:
+            0.0 if the request is allowed, else seconds until a token is available
+        """
+        now = self.clock()
+        self._expire_idle(now)
+
+        key = (rule.name, client)
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = [float(rule.capacity), now, rule.capacity / rule.refill_per_second]
+            self._buckets[key] = bucket
+            if len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        else:
+            bucket[0] = min(rule.capacity, bucket[0] + (now - bucket[1]) * rule.refill_per_second)
+            bucket[1] = now
+            self._buckets.move_to_end(key)
+
+        if bucket[0] >= 1.0:
+            bucket[0] -= 1.0
+            return 0.0
+        self.rejected += 1
+        return (1.0 - bucket[0]) / rule.refill_per_second
+
+    def _expire_idle(self, now: float, max_checks: int = 8):
+        """Drop a few of the least recently used buckets if they are full again."""
+        for _ in range(max_checks):
+            if not self._buckets:
+                return
+            key, bucket = next(iter(self._buckets.items()))
+            if now - bucket[1] < bucket[2]:
+                return
+            del self._buckets[key]
+
+
+def load_rules(specs: Dict[str, str]) -> Dict[Tuple[str, str], RateLimitRule]:
+    """Parse settings.RATE_LIMIT_RULES into rules keyed by (method, path)."""
+    rules = {}
+    for name, spec in specs.items():
+        method, path = name.split(" ", 1)
+        rules[(method.upper(), path.rstrip("/") or "/")] = RateLimitRule.parse(name, spec)
+    return rules
+
+
+class RateLimitMiddleware:
+    """ASGI middleware answering 429 with Retry-After for clients over budget."""
+
+    def __init__(
+        self,
+        app,
+        rules: Optional[Dict[str, str]] = None,
+        store: Optional[TokenBucketStore] = None,
+        enabled: Optional[bool] = None,
+        trust_forwarded: Optional[bool] = None
+    ):
+        self.app = app
+        self.rules = load_rules(settings.RATE_LIMIT_RULES if rules is None else rules)
+        self.store = store or TokenBucketStore()
+        self.enabled = (settings.RATE_LIMIT_ENABLED if enabled is None else enabled) and bool(self.rules)
+        self.trust_forwarded = settings.RATE_LIMIT_TRUST_FORWARDED if trust_forwarded is None else trust_forwarded
+
+    def client_key(self, scope) -> str:
+        """Authenticated username if the request carries a valid token, else the client IP."""
+        headers = dict(scope.get("headers") or ())
+        authorization = headers.get(b"authorization", b"").decode("latin-1")
+        if authorization.lower().startswith("bearer "):
+            try:
+                username = decode_access_token(authorization[7:].strip()).get("sub")
+                if username:
+                    return f"user:{username}"
+            except JWTError:
+                pass
+        if self.trust_forwarded and b"x-forwarded-for" in headers:
+            return "ip:" + headers[b"x-forwarded-for"].decode("latin-1").split(",")[0].strip()
+        client = scope.get("client")
+        return f"ip:{client[0]}" if client else "ip:unknown"
+
+    async def __call__(self, scope, receive, send):
+        if not self.enabled or scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        rule = self.rules.get((scope["method"], scope["path"].rstrip("/") or "/"))
+        if rule is None:
+            return await self.app(scope, receive, send)
+
+        retry_after = self.store.consume(rule, self.client_key(scope))
+        if not retry_after:
+            return await self.app(scope, receive, send)
+
+        body = json.dumps({"detail": f"Rate limit exceeded for {rule.name}. Retry later."}).encode()
+        await send({
+            "type": "http.response.start",
+            "status": 429,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"retry-after", str(math.ceil(retry_after)).encode()),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
@@ -1,7 +1,8 @@
 """SQLAlchemy Patient model."""
-from sqlalchemy import Column, String, Integer, Float, JSON, DateTime
+from sqlalchemy import Column, String, Integer, Float, JSON, DateTime, Index
 from sqlalchemy.sql import func
 from app.database import Base
+from datetime import datetime
 import uuid
 
 
@@ -9,6 +10,13 @@ class Patient(Base):
     """Patient database model storing triage results."""
     
     __tablename__ = "patients"
+    __table_args__ = (
+        # Keyset pagination: newest-first listing and per-risk filtering
+        Index("ix_patients_created_at_id", "created_at", "id"),
+        Index("ix_patients_risk_level_created_at_id", "risk_level", "created_at", "id"),
+        # Live queue rebuild at startup reads only waiting patients
+        Index("ix_patients_status", "status"),
+    )
     
     # Primary key
     id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
@@ -28,16 +36,43 @@ class Patient(Base):
     symptoms = Column(JSON, nullable=False)
     pre_existing = Column(JSON, nullable=False, default=list)
     
+    # Canonical bitmasks for cohort queries (bit order from settings.SYMPTOM_FEATURES
+    # and settings.CONDITION_FEATURES)
+    symptom_mask = Column(Integer, nullable=True)
+    condition_mask = Column(Integer, nullable=True)
+    
     # Triage results
     risk_level = Column(String, nullable=False)
     confidence = Column(Float, nullable=False)
     department = Column(String, nullable=False)
     rule_triggered = Column(String, nullable=True)
     
+    # Live queue state: WAITING until discharged; clinicians may override the
+    # queue priority without rewriting the triage result. Patients triaged
+    # before this column existed are history, not queue: backfilled DISCHARGED
+    status = Column(String, nullable=False, default="WAITING", server_default="WAITING",
+                    info={"backfill": "DISCHARGED"})
+    priority_override = Column(String, nullable=True)
+    
     # Explainability
     shap_factors = Column(JSON, nullable=True)
     explanation = Column(String, nullable=True)
     
     # Timestamps
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    # Set in Python so SQLite stores microseconds; its CURRENT_TIMESTAMP stops at seconds
+    created_at = Column(DateTime(timezone=True), default=datetime.utcnow, server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+
+
+# Columns for list views and live events; explanation and shap_factors are detail-only
+PATIENT_SUMMARY_COLUMNS = (
+    Patient.id,
+    Patient.age,
+    Patient.gender,
+    Patient.symptoms,
+    Patient.risk_level,
+    Patient.confidence,
+    Patient.department,
+    Patient.rule_triggered,
+    Patient.created_at,
+)
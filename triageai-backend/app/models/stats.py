@@ -0,0 +1,28 @@
+"""SQLAlchemy models for incrementally maintained statistics."""
+from sqlalchemy import Column, String, Integer, DateTime
+from app.database import Base
+
+
+class TriageCounter(Base):
+    """Running patient counts per dimension, updated with every insert."""
+    
+    __tablename__ = "triage_counters"
+    
+    # Dimension: "total", "risk_level" or "department"
+    dimension = Column(String, primary_key=True)
+    key = Column(String, primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
+
+
+class TriageRollup(Base):
+    """Patient counts per time bucket and dimension, updated with every insert."""
+    
+    __tablename__ = "triage_rollups"
+    
+    # Bucket granularity: "minute" or "hour"
+    bucket = Column(String, primary_key=True)
+    bucket_start = Column(DateTime, primary_key=True)
+    # Dimension: "total", "risk_level", "department" or "rule_triggered"
+    dimension = Column(String, primary_key=True)
+    key = Column(String, primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
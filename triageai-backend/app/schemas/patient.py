@@ -72,6 +72,23 @@ class TriageOutput(BaseModel):
     triage_timestamp: datetime
 
 
+class PatientSummary(BaseModel):
+    """Lightweight patient record for list views (no explanation or SHAP data)."""
+    
+    id: str
+    age: int
+    gender: str
+    symptoms: List[str]
+    risk_level: str
+    confidence: float
+    department: str
+    rule_triggered: Optional[str]
+    created_at: datetime
+    
+    class Config:
+        from_attributes = True
+
+
 class PatientResponse(BaseModel):
     """Patient database record response."""
     
@@ -0,0 +1,39 @@
+"""Schemas for the request profiler admin endpoints."""
+from pydantic import BaseModel, Field
+from typing import List
+
+
+class ProfilingStatus(BaseModel):
+    """Current profiler settings for this worker."""
+
+    sample_rate: float
+    header_enabled: bool  # X-Profile header accepted (PROFILING_TOKEN set)
+    interval_ms: float
+    max_concurrent: int
+    active: int
+    skipped: int  # Requests not profiled because max_concurrent were running
+
+
+class ProfilingUpdate(BaseModel):
+    """Runtime change to the fraction of requests profiled at random."""
+
+    sample_rate: float = Field(..., ge=0.0, le=1.0)
+
+
+class ProfileSummary(BaseModel):
+    """One stored profile."""
+
+    id: str
+    method: str
+    path: str
+    status: int
+    reason: str  # header or sampled
+    duration_ms: float
+    samples: int
+    created_at: float
+
+
+class ProfileListResponse(BaseModel):
+    """Stored profiles, newest first."""
+
+    profiles: List[ProfileSummary]
@@ -0,0 +1,23 @@
+"""Schemas for the live patient queue."""
+from pydantic import BaseModel
+from typing import List
+from app.schemas.patient import PatientSummary, RiskLevelEnum
+
+
+class QueueEntry(PatientSummary):
+    """Waiting patient with the priority used for queue ordering."""
+    
+    priority: str  # priority_override if set, else risk_level
+
+
+class QueueResponse(BaseModel):
+    """Waiting patients in treatment order."""
+    
+    total_waiting: int
+    patients: List[QueueEntry]
+
+
+class ReprioritizeRequest(BaseModel):
+    """Clinician override of a waiting patient's queue priority."""
+    
+    priority: RiskLevelEnum
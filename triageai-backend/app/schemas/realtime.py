@@ -0,0 +1,12 @@
+"""Schemas for real-time WebSocket messages."""
+from pydantic import BaseModel, Field
+from typing import List, Optional
+
+
+class SubscribeRequest(BaseModel):
+    """Client request to receive only matching triage events."""
+    
+    action: str = "subscribe"
+    departments: List[str] = Field(default_factory=list, description="Empty means all departments")
+    risk_levels: List[str] = Field(default_factory=list, description="Empty means all risk levels")
+    snapshot_limit: Optional[int] = Field(None, ge=0, le=500, description="Recent patients in the initial snapshot")
@@ -1,6 +1,7 @@
 """Analytics and statistics schemas."""
-from pydantic import BaseModel
-from typing import Dict
+from pydantic import BaseModel, ConfigDict
+from typing import Dict, List, Optional
+from datetime import datetime
 
 
 class StatsResponse(BaseModel):
@@ -18,3 +19,55 @@ class HealthResponse(BaseModel):
     model_loaded: bool
     gemini_available: bool
     database: str
+
+
+class LivenessResponse(BaseModel):
+    """Process liveness (the event loop is answering)."""
+    
+    status: str
+
+
+class ReadinessResponse(BaseModel):
+    """Readiness from cached component state."""
+    
+    model_config = ConfigDict(protected_namespaces=())
+    
+    status: str  # "ready" or "not_ready"
+    ready: bool
+    database: str  # connected, error, unknown or stale
+    database_checked_seconds_ago: Optional[float] = None
+    database_error: Optional[str] = None
+    model_loaded: bool
+    model_warmed_up: bool
+    gemini_available: bool
+    gemini_circuit: str  # closed, open or half_open
+
+
+class TrendPoint(BaseModel):
+    """Triage counts for one time bucket."""
+    
+    bucket_start: datetime
+    total: int
+    risk_distribution: Dict[str, int]
+    department_load: Dict[str, int]
+    rules_triggered: Dict[str, int]
+
+
+class TrendsResponse(BaseModel):
+    """Time series of triage counts."""
+    
+    window: str
+    bucket: str
+    points: List[TrendPoint]
+
+
+class CohortResponse(BaseModel):
+    """Patient count for a symptom/condition cohort."""
+    
+    count: int
+    symptoms: List[str]
+    conditions: List[str]
+    match: str
+    risk_level: Optional[str] = None
+    start: Optional[datetime] = None
+    end: Optional[datetime] = None
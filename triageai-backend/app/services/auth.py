@@ -1,17 +1,32 @@
 """Authentication services."""
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
 from passlib.context import CryptContext
 from datetime import datetime, timedelta
 from jose import jwt
-from typing import Optional
+from typing import Optional, Tuple
+from app.config import settings
+from app.utils.cache import TTLCache
 
-# Setup password hashing
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Setup password hashing; hashes with a different cost are flagged for upgrade
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=settings.BCRYPT_ROUNDS)
 
 # JWT Configuration
 SECRET_KEY = "your-secret-key-change-this-in-production"
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
 
+# User roles
+ROLE_PATIENT = "PATIENT"
+ROLE_MEDICAL_STAFF = "MEDICAL_STAFF"
+
+# Decoded token claims, each kept until the token's own expiry
+token_cache = TTLCache(settings.AUTH_TOKEN_CACHE_SIZE, clock=time.time)
+
+# Users by username (UserResponse); invalidate whenever a users row changes
+user_cache = TTLCache(settings.AUTH_USER_CACHE_SIZE, ttl=settings.AUTH_USER_CACHE_TTL_SECONDS)
+
 def verify_password(plain_password, hashed_password):
     """Verify password."""
     return pwd_context.verify(plain_password, hashed_password)
@@ -20,6 +35,87 @@ def get_password_hash(password):
     """Hash password."""
     return pwd_context.hash(password)
 
+
+class PasswordHashBusy(Exception):
+    """Raised when too many password hashes are already waiting."""
+
+
+class PasswordHasher:
+    """
+    Runs bcrypt on a small dedicated thread pool.
+    
+    bcrypt releases the GIL, so hashing in worker threads keeps the event
+    loop serving triage requests during a login storm. The number of
+    hashes waiting is capped so a storm cannot build an unbounded backlog.
+    """
+    
+    def __init__(
+        self,
+        workers: int = settings.PASSWORD_HASH_WORKERS,
+        max_pending: int = settings.PASSWORD_HASH_MAX_PENDING
+    ):
+        """
+        Initialize hasher.
+        
+        Args:
+            workers: Hashing threads (0 hashes inline on the event loop, for comparison benchmarks)
+            max_pending: Maximum hashes running or waiting
+        """
+        self.workers = workers
+        self.max_pending = max_pending
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="password-hash") if workers else None
+        self.pending = 0
+        self.rejected = 0
+        self.rehashed = 0
+    
+    async def _run(self, fn, *args):
+        if self.pending >= self.max_pending:
+            self.rejected += 1
+            raise PasswordHashBusy("Too many logins in progress, retry shortly")
+        if self._executor is None:
+            return fn(*args)
+        self.pending += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
+        finally:
+            self.pending -= 1
+    
+    async def hash(self, password: str) -> str:
+        """Hash a new password with the configured cost."""
+        return await self._run(pwd_context.hash, password)
+    
+    async def verify_and_update(self, password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+        """
+        Verify a password, re-hashing it if the stored hash uses an outdated cost.
+        
+        Returns:
+            (valid, new_hash) where new_hash is None unless the stored hash should be replaced
+        """
+        valid, new_hash = await self._run(pwd_context.verify_and_update, password, hashed_password)
+        if new_hash:
+            self.rehashed += 1
+        return valid, new_hash
+    
+    async def dummy_verify(self):
+        """Spend one verify's worth of time so unknown usernames are not revealed by timing."""
+        await self._run(pwd_context.dummy_verify)
+    
+    def stats(self) -> dict:
+        return {
+            "workers": self.workers,
+            "pending": self.pending,
+            "rejected": self.rejected,
+            "rehashed": self.rehashed,
+        }
+    
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+
+
+password_hasher = PasswordHasher()
+
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     """Create JWT access token."""
     to_encode = data.copy()
@@ -30,3 +126,25 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     to_encode.update({"exp": expire})
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
+
+
+def decode_access_token(token: str) -> dict:
+    """
+    Verify a token from create_access_token and return its claims.
+    
+    Signature and expiry are checked once per token; the claims are then
+    served from token_cache until the token expires.
+    
+    Raises:
+        JWTError if the token is invalid or expired
+    """
+    claims = token_cache.get(token)
+    if claims is None:
+        claims = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        token_cache.set(token, claims, expires_at=claims.get("exp"))
+    return claims
+
+
+def invalidate_user(username: str):
+    """Drop a cached user after their row changes."""
+    user_cache.pop(username)
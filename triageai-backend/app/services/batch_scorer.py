@@ -0,0 +1,210 @@
+"""Offline batch triage of patient files.
+
+Scores a CSV of historical patients without the HTTP API, FastAPI or the
+database. The input is read in chunks. Each chunk is scored in a worker
+process: the clinical rules run per row through evaluate_rules, and rows
+no rule catches go to the ML model as one vectorized batch (features,
+probabilities and tree SHAP top factors). Results are written in input
+order.
+
+Input columns follow PatientInput: age, gender, symptoms, bp_systolic,
+bp_diastolic, heart_rate, temperature, spo2, pre_existing. symptoms and
+pre_existing may be JSON lists (as written by export_service) or
+";"-separated strings. An optional id column is copied to the output.
+
+Usage:
+    python -m app.services.batch_scorer patients.csv -o triaged.csv --workers 4
+    python -m app.services.batch_scorer patients.csv --approx-factors > triaged.csv
+"""
+import argparse
+import contextlib
+import json
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterator, List, Tuple
+import pandas as pd
+from pydantic import ValidationError
+from app.schemas.patient import PatientInput
+from app.services.ml_service import ml_service
+from app.services.rule_engine import assign_department, evaluate_rules
+from app.utils.feature_engineering import build_feature_frame
+
+INPUT_FIELDS = list(PatientInput.model_fields)
+LIST_FIELDS = {"symptoms", "pre_existing"}
+OUTPUT_COLUMNS = ["row", "id", "risk_level", "confidence", "department", "rule_triggered", "top_factors", "error"]
+CHUNK_SIZE = 5000
+
+
+def _parse_list(value) -> List[str]:
+    if value is None or (isinstance(value, float) and pd.isna(value)):
+        return []
+    value = str(value).strip()
+    if value.startswith("["):
+        return json.loads(value)
+    return [item for item in value.split(";") if item.strip()]
+
+
+def parse_row(record: dict) -> PatientInput:
+    """
+    Build a PatientInput from one CSV record.
+
+    Raises:
+        ValidationError or ValueError for rows that fail validation
+    """
+    data = {}
+    for field in INPUT_FIELDS:
+        value = record.get(field)
+        if field in LIST_FIELDS:
+            data[field] = _parse_list(value)
+        elif value is not None and not (isinstance(value, float) and pd.isna(value)):
+            data[field] = value
+    return PatientInput(**data)
+
+
+def score_chunk(chunk: pd.DataFrame, top_k: int = 3, approx_factors: bool = False) -> pd.DataFrame:
+    """
+    Triage one chunk of input rows.
+
+    Returns:
+        DataFrame with OUTPUT_COLUMNS, one row per input row
+    """
+    results = []
+    ml_rows: List[Tuple[dict, PatientInput]] = []
+
+    for row, record in zip(chunk.index, chunk.to_dict("records")):
+        result = dict.fromkeys(OUTPUT_COLUMNS)
+        result["row"] = int(row)
+        result["id"] = record.get("id")
+        results.append(result)
+        try:
+            patient = parse_row(record)
+        except (ValidationError, ValueError) as e:
+            result["error"] = str(e).replace("\n", " ")
+            continue
+
+        rule_result = evaluate_rules(patient)
+        if rule_result.triggered:
+            result.update(
+                risk_level=rule_result.risk_level,
+                confidence=1.0,
+                department=rule_result.department,
+                rule_triggered=rule_result.rule_name,
+                top_factors="[]"
+            )
+        else:
+            ml_rows.append((result, patient))
+
+    if ml_rows:
+        patients = [patient for _, patient in ml_rows]
+        risk_levels, confidences, top_factors = ml_service.predict_batch(
+            build_feature_frame(patients), top_k, approx_factors
+        )
+        for (result, patient), risk_level, confidence, factors in zip(ml_rows, risk_levels, confidences, top_factors):
+            result.update(
+                risk_level=risk_level,
+                confidence=round(float(confidence), 4),
+                department=assign_department(risk_level, patient.symptoms),
+                top_factors=json.dumps([factor.model_dump() for factor in factors])
+            )
+
+    return pd.DataFrame(results, columns=OUTPUT_COLUMNS)
+
+
+def _init_worker():
+    # Keep load messages off stdout, which may be the output file
+    with contextlib.redirect_stdout(sys.stderr):
+        if not ml_service.is_loaded() and not ml_service.load_models():
+            raise RuntimeError("ML models could not be loaded")
+
+
+def iter_scored(
+    chunks: Iterator[pd.DataFrame],
+    workers: int = 1,
+    top_k: int = 3,
+    approx_factors: bool = False
+) -> Iterator[pd.DataFrame]:
+    """
+    Score chunks in order.
+
+    With workers > 1, chunks are scored in a process pool (each worker
+    loads the model bundle once) with at most 2 * workers chunks in
+    flight, so memory stays bounded however large the input is.
+    """
+    if workers <= 1:
+        _init_worker()
+        for chunk in chunks:
+            yield score_chunk(chunk, top_k, approx_factors)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+        in_flight = []
+        for chunk in chunks:
+            in_flight.append(pool.submit(score_chunk, chunk, top_k, approx_factors))
+            if len(in_flight) >= 2 * workers:
+                yield in_flight.pop(0).result()
+        for future in in_flight:
+            yield future.result()
+
+
+def score_file(
+    input_path,
+    output,
+    workers: int = 1,
+    chunk_size: int = CHUNK_SIZE,
+    top_k: int = 3,
+    approx_factors: bool = False
+) -> dict:
+    """
+    Stream a patient CSV through the triage pipeline into an output CSV.
+
+    Args:
+        input_path: Patient CSV
+        output: Output path or writable text file
+        workers: Scoring processes
+        chunk_size: Rows per chunk (and per model batch)
+        top_k: Top factors per ML-scored row
+        approx_factors: Approximate top factors (see MLService.predict_batch)
+
+    Returns:
+        Counts of rows scored, rule-triaged and rejected
+    """
+    chunks = pd.read_csv(input_path, chunksize=chunk_size, dtype={"id": str, "gender": str})
+    counts = {"rows": 0, "rules": 0, "errors": 0}
+    file = output if hasattr(output, "write") else open(output, "w", newline="")
+    try:
+        for scored in iter_scored(chunks, workers, top_k, approx_factors):
+            scored.to_csv(file, header=counts["rows"] == 0, index=False)
+            counts["rows"] += len(scored)
+            counts["rules"] += int(scored["rule_triggered"].notna().sum())
+            counts["errors"] += int(scored["error"].notna().sum())
+    finally:
+        if file is not output:
+            file.close()
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Triage a patient CSV offline.")
+    parser.add_argument("input", help="Patient CSV")
+    parser.add_argument("--output", "-o", help="Output CSV (default: stdout)")
+    parser.add_argument("--workers", type=int, default=1, help="Scoring processes")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    parser.add_argument("--top-k", type=int, default=3, help="Top factors per ML-scored row")
+    parser.add_argument("--approx-factors", action="store_true", help="Approximate top factors (much faster)")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    counts = score_file(
+        args.input, args.output or sys.stdout, args.workers, args.chunk_size, args.top_k, args.approx_factors
+    )
+    elapsed = time.perf_counter() - start
+    print(
+        f"✅ Scored {counts['rows']} rows in {elapsed:.1f}s "
+        f"({counts['rules']} by rule, {counts['errors']} rejected)",
+        file=sys.stderr
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,237 @@
+"""Broadcast backends that carry triage events between uvicorn workers.
+
+Each worker owns its own WebSocket connections, so an event published in
+one worker must also be delivered by every other worker. Backends:
+
+- ``memory``: single worker; events go straight to the local manager.
+- ``unix``: every worker binds a Unix datagram socket in
+  BROADCAST_SOCKET_DIR and sends each event to every peer socket found
+  there. No broker process is needed, only a shared directory on the host.
+  Datagrams can be dropped; each carries the sender's sequence number so a
+  receiver notices the gap and can resynchronize (see ``on_gap``).
+
+An event is encoded once per publish; the same bytes are sent to every
+peer and the same message string is queued for every local client.
+"""
+import asyncio
+import json
+import os
+import socket
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+# Callback into the local ConnectionManager: (message, department, risk_level, key)
+Deliver = Callable[[str, str, str, Optional[str]], None]
+
+# Key of the datagram a worker sends its peers when it binds its socket
+HELLO_KEY = "__hello__"
+
+
+class BroadcastBackend:
+    """In-process backend: deliver events to this worker's clients only."""
+
+    name = "memory"
+
+    def __init__(self, deliver: Deliver, has_local_clients: Callable[[], bool]):
+        self.deliver = deliver
+        self.has_local_clients = has_local_clients
+        self.published = 0
+
+    async def start(self):
+        pass
+
+    async def stop(self):
+        pass
+
+    def has_subscribers(self) -> bool:
+        """Check if anyone could receive an event (skips serialization otherwise)."""
+        return self.has_local_clients()
+
+    def publish(self, message: str, department: str, risk_level: str, key: Optional[str] = None):
+        """Deliver an already-serialized event."""
+        self.published += 1
+        self.deliver(message, department, risk_level, key)
+
+    def stats(self) -> dict:
+        return {"backend": self.name, "published": self.published}
+
+
+class UnixSocketBackend(BroadcastBackend):
+    """
+    Peer-to-peer fan-out over Unix datagram sockets.
+
+    Datagrams are ``<json header>\\n<message>`` where the header carries the
+    routing fields, so receivers filter without decoding the event body.
+    Sends never block: if a peer's receive buffer is full the datagram is
+    dropped and counted, matching the drop-oldest policy for slow clients.
+
+    The header also carries the sender's ID and a per-sender sequence
+    number. A receiver that sees a sequence number skip calls ``on_gap``
+    (the worker reloads its queue from the database). The peer list is
+    cached for ``peer_refresh`` seconds; a new worker announces itself on
+    start, and a send to a vanished peer drops the cache.
+    """
+
+    name = "unix"
+
+    def __init__(
+        self,
+        deliver: Deliver,
+        has_local_clients: Callable[[], bool],
+        socket_dir: str,
+        worker_id: Optional[str] = None,
+        on_gap: Optional[Callable[[], None]] = None,
+        peer_refresh: float = 5.0
+    ):
+        super().__init__(deliver, has_local_clients)
+        self.socket_dir = Path(socket_dir)
+        self.worker_id = worker_id or str(os.getpid())
+        self.on_gap = on_gap
+        self.peer_refresh = peer_refresh
+        self.path: Optional[Path] = None
+        self._sock: Optional[socket.socket] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._seq = 0
+        self._last_seq: Dict[str, int] = {}
+        self._peers: List[Path] = []
+        self._peers_at: Optional[float] = None
+
+        # Metrics
+        self.sent = 0
+        self.received = 0
+        self.send_dropped = 0
+        self.stale_peers_removed = 0
+        self.gaps = 0
+
+    async def start(self):
+        """Bind this worker's socket and start receiving peer events."""
+        self.socket_dir.mkdir(parents=True, exist_ok=True)
+        self.path = self.socket_dir / f"worker-{self.worker_id}.sock"
+        if self.path.exists():
+            self.path.unlink()
+
+        self._sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        self._sock.setblocking(False)
+        self._sock.bind(str(self.path))
+        self._loop = asyncio.get_running_loop()
+        self._loop.add_reader(self._sock.fileno(), self._on_readable)
+        self._send_to_peers(self._datagram("", "", HELLO_KEY, 0, ""))
+        print(f"✅ Broadcast socket bound at {self.path}")
+
+    async def stop(self):
+        """Stop receiving and remove this worker's socket."""
+        if self._sock is None:
+            return
+        self._loop.remove_reader(self._sock.fileno())
+        self._sock.close()
+        self._sock = None
+        if self.path is not None and self.path.exists():
+            self.path.unlink()
+
+    def peers(self) -> List[Path]:
+        """Socket paths of the other workers (directory listing cached for peer_refresh seconds)."""
+        now = time.monotonic()
+        if self._peers_at is None or now - self._peers_at >= self.peer_refresh:
+            self._peers = [path for path in self.socket_dir.glob("worker-*.sock") if path != self.path]
+            self._peers_at = now
+        return self._peers
+
+    def _invalidate_peers(self):
+        self._peers_at = None
+
+    def has_subscribers(self) -> bool:
+        return self.has_local_clients() or bool(self.peers())
+
+    def _datagram(self, department: str, risk_level: str, key: Optional[str], seq: int, message: str) -> bytes:
+        return json.dumps([department, risk_level, key, self.worker_id, seq]).encode() + b"\n" + message.encode()
+
+    def publish(self, message: str, department: str, risk_level: str, key: Optional[str] = None):
+        super().publish(message, department, risk_level, key)
+        if self._sock is None:
+            return
+        self._seq += 1
+        self._send_to_peers(self._datagram(department, risk_level, key, self._seq, message))
+
+    def _send_to_peers(self, datagram: bytes):
+        for peer in self.peers():
+            try:
+                self._sock.sendto(datagram, str(peer))
+                self.sent += 1
+            except BlockingIOError:
+                self.send_dropped += 1
+            except (ConnectionRefusedError, FileNotFoundError):
+                # Worker exited without cleaning up its socket
+                self._remove_stale(peer)
+                self._invalidate_peers()
+            except OSError as e:
+                self.send_dropped += 1
+                print(f"⚠️  Broadcast to {peer.name} failed: {e}")
+
+    def _remove_stale(self, peer: Path):
+        try:
+            peer.unlink()
+            self.stale_peers_removed += 1
+        except FileNotFoundError:
+            pass
+
+    def _on_readable(self):
+        """Drain every waiting datagram into the local manager."""
+        while self._sock is not None:
+            try:
+                datagram = self._sock.recv(65536 * 4)
+            except BlockingIOError:
+                return
+            try:
+                header, message = datagram.split(b"\n", 1)
+                department, risk_level, key, sender, seq = json.loads(header)
+            except ValueError:
+                continue
+            if key == HELLO_KEY:
+                # New worker: include it in the next publish and start its sequence
+                self._invalidate_peers()
+                self._last_seq[sender] = seq
+                continue
+            last = self._last_seq.get(sender)
+            self._last_seq[sender] = seq
+            self.received += 1
+            self.deliver(message.decode(), department, risk_level, key)
+            if last is not None and seq != last + 1:
+                self.gaps += 1
+                if self.on_gap is not None:
+                    self.on_gap()
+
+    def stats(self) -> dict:
+        return {
+            **super().stats(),
+            "peers": len(self.peers()),
+            "sent": self.sent,
+            "received": self.received,
+            "send_dropped": self.send_dropped,
+            "stale_peers_removed": self.stale_peers_removed,
+            "gaps": self.gaps,
+        }
+
+
+BACKENDS = ("memory", "unix")
+
+
+def create_backend(
+    name: str,
+    deliver: Deliver,
+    has_local_clients: Callable[[], bool],
+    socket_dir: str = "/tmp/triageai-broadcast",
+    on_gap: Optional[Callable[[], None]] = None,
+    peer_refresh: float = 5.0
+) -> BroadcastBackend:
+    """
+    Build the configured broadcast backend.
+
+    Raises:
+        ValueError for an unknown backend name
+    """
+    if name == "memory":
+        return BroadcastBackend(deliver, has_local_clients)
+    if name == "unix":
+        return UnixSocketBackend(deliver, has_local_clients, socket_dir, on_gap=on_gap, peer_refresh=peer_refresh)
+    raise ValueError(f"Unknown broadcast backend: {name}. Must be one of: {', '.join(BACKENDS)}")
@@ -0,0 +1,163 @@
+"""Cohort queries over symptom and condition bitmasks.
+
+Each patient row stores ``symptom_mask`` and ``condition_mask`` (see
+app.utils.feature_engineering), so questions like "HIGH-risk patients with
+chest pain and diabetes this week" become bitwise predicates evaluated by
+SQLite instead of JSON decoding in Python.
+
+Rows written before the mask columns existed have NULL masks. Fill them in:
+    python -m app.services.cohort_service backfill
+Recompute every row (after changing SYMPTOM_FEATURES / CONDITION_FEATURES):
+    python -m app.services.cohort_service backfill --all
+"""
+import argparse
+import asyncio
+from datetime import datetime
+from typing import List, Optional
+from sqlalchemy import select, update, func, or_
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.config import settings
+from app.database import AsyncSessionLocal, init_db
+from app.models.patient import Patient
+from app.schemas.stats import CohortResponse
+from app.utils.feature_engineering import encode_mask, symptom_mask, condition_mask
+
+
+def _canonical(values: List[str], vocabulary: List[str], kind: str) -> List[str]:
+    """
+    Normalize names and reject ones outside the vocabulary.
+
+    Raises:
+        ValueError for unknown names
+    """
+    normalized = [v.strip().lower().replace(" ", "_") for v in values if v.strip()]
+    unknown = [v for v in normalized if v not in vocabulary]
+    if unknown:
+        raise ValueError(f"Unknown {kind}: {', '.join(unknown)}. Must be one of: {', '.join(vocabulary)}")
+    return normalized
+
+
+def _mask_predicate(column, mask: int, match: str):
+    """Bitwise predicate: all bits present, or any bit present."""
+    masked = column.op("&")(mask)
+    return masked == mask if match == "all" else masked != 0
+
+
+async def count_cohort(
+    session: AsyncSession,
+    symptoms: List[str],
+    conditions: List[str],
+    match: str = "all",
+    risk_level: Optional[str] = None,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None
+) -> CohortResponse:
+    """
+    Count patients matching a symptom/condition cohort.
+
+    Args:
+        session: Database session
+        symptoms: Canonical symptom names (see settings.SYMPTOM_FEATURES)
+        conditions: Canonical condition names (see settings.CONDITION_FEATURES)
+        match: "all" requires every listed symptom and condition, "any" at least
+            one listed symptom (if given) and one listed condition (if given)
+        risk_level: Optional HIGH, MEDIUM or LOW filter
+        start: Triaged at or after
+        end: Triaged before
+
+    Raises:
+        ValueError for unknown names or match mode
+    """
+    if match not in ("all", "any"):
+        raise ValueError("Invalid match. Must be all or any")
+
+    symptoms = _canonical(symptoms, settings.SYMPTOM_FEATURES, "symptoms")
+    conditions = _canonical(conditions, settings.CONDITION_FEATURES, "conditions")
+
+    query = select(func.count(Patient.id))
+    if symptoms:
+        query = query.where(_mask_predicate(
+            Patient.symptom_mask, encode_mask(symptoms, settings.SYMPTOM_FEATURES), match
+        ))
+    if conditions:
+        query = query.where(_mask_predicate(
+            Patient.condition_mask, encode_mask(conditions, settings.CONDITION_FEATURES), match
+        ))
+    if risk_level:
+        query = query.where(Patient.risk_level == risk_level)
+    if start:
+        query = query.where(Patient.created_at >= start)
+    if end:
+        query = query.where(Patient.created_at < end)
+
+    count = (await session.execute(query)).scalar() or 0
+    return CohortResponse(
+        count=count,
+        symptoms=symptoms,
+        conditions=conditions,
+        match=match,
+        risk_level=risk_level,
+        start=start,
+        end=end
+    )
+
+
+async def backfill_masks(session: AsyncSession, recompute_all: bool = False, batch_size: int = 1000) -> int:
+    """
+    Compute masks for rows that lack them.
+
+    Args:
+        session: Database session
+        recompute_all: Recompute every row, not only rows with NULL masks
+        batch_size: Rows updated per transaction
+
+    Returns:
+        Number of rows updated
+    """
+    updated = 0
+    last_id = ""
+    while True:
+        query = (
+            select(Patient.id, Patient.symptoms, Patient.pre_existing)
+            .where(Patient.id > last_id)
+            .order_by(Patient.id)
+            .limit(batch_size)
+        )
+        if not recompute_all:
+            query = query.where(or_(Patient.symptom_mask.is_(None), Patient.condition_mask.is_(None)))
+
+        rows = (await session.execute(query)).all()
+        if not rows:
+            return updated
+
+        await session.execute(update(Patient), [
+            {
+                "id": row.id,
+                "symptom_mask": symptom_mask(row.symptoms or []),
+                "condition_mask": condition_mask(row.pre_existing or []),
+            }
+            for row in rows
+        ])
+        await session.commit()
+
+        updated += len(rows)
+        last_id = rows[-1].id
+
+
+async def _backfill(recompute_all: bool):
+    await init_db()
+    async with AsyncSessionLocal() as session:
+        updated = await backfill_masks(session, recompute_all)
+    print(f"✅ Backfilled symptom/condition masks for {updated} patients")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Maintain symptom/condition bitmask columns.")
+    parser.add_argument("command", choices=["backfill"], help="backfill: compute masks for existing rows")
+    parser.add_argument("--all", action="store_true", help="recompute every row, not only missing masks")
+    args = parser.parse_args()
+    asyncio.run(_backfill(args.all))
+
+
+if __name__ == "__main__":
+    main()
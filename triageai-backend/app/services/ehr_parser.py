@@ -1,9 +1,12 @@
 """EHR/EMR document parsing service using Gemini Vision."""
+import asyncio
 import base64
 import json
 import google.generativeai as genai
 from app.config import settings
 from app.schemas.patient import PatientInput, GenderEnum
+from app.services.gemini_service import gemini_service, GeminiUnavailable
+from app.utils.metrics import time_stage
 
 
 # Extraction prompt for Gemini Vision
@@ -49,6 +52,9 @@ async def parse_ehr_document(content: bytes, content_type: str) -> PatientInput:
     if not settings.GEMINI_API_KEY or settings.GEMINI_API_KEY == "your_api_key_here":
         raise ValueError("Gemini API key not configured. Cannot parse documents.")
     
+    if not gemini_service.breaker.allow():
+        raise GeminiUnavailable("Gemini is failing; document parsing is paused. Retry later.")
+    
     try:
         # Initialize Gemini with vision model
         genai.configure(api_key=settings.GEMINI_API_KEY)
@@ -58,40 +64,55 @@ async def parse_ehr_document(content: bytes, content_type: str) -> PatientInput:
         b64_content = base64.b64encode(content).decode()
         
         # Create multimodal request
-        response = await vision_model.generate_content_async([
-            {
-                'mime_type': content_type,
-                'data': b64_content
-            },
-            EHR_EXTRACTION_PROMPT
-        ])
+        with time_stage("ehr", "gemini_vision"):
+            try:
+                response = await asyncio.wait_for(
+                    vision_model.generate_content_async([
+                        {
+                            'mime_type': content_type,
+                            'data': b64_content
+                        },
+                        EHR_EXTRACTION_PROMPT
+                    ]),
+                    settings.GEMINI_TIMEOUT_SECONDS
+                )
+            except asyncio.TimeoutError:
+                gemini_service.breaker.record_failure()
+                raise GeminiUnavailable(f"Gemini did not respond within {settings.GEMINI_TIMEOUT_SECONDS}s. Retry later.")
+            except Exception:
+                gemini_service.breaker.record_failure()
+                raise
+        gemini_service.breaker.record_success()
         
-        # Parse response
-        text = response.text.strip()
+        with time_stage("ehr", "extract"):
+            # Parse response
+            text = response.text.strip()
         
-        # Strip markdown code fences if present
-        if text.startswith('```'):
-            lines = text.split('\n')
-            text = '\n'.join(lines[1:-1])  # Remove first and last lines
-            if text.startswith('json'):
-                text = text[4:].strip()
+            # Strip markdown code fences if present
+            if text.startswith('```'):
+                lines = text.split('\n')
+                text = '\n'.join(lines[1:-1])  # Remove first and last lines
+                if text.startswith('json'):
+                    text = text[4:].strip()
         
-        # Parse JSON
-        data = json.loads(text)
+            # Parse JSON
+            data = json.loads(text)
         
-        # Validate and build PatientInput
-        return PatientInput(
-            age=data.get('age', 30),
-            gender=GenderEnum(data.get('gender', 'Other')),
-            symptoms=data.get('symptoms') or ['unspecified'],
-            bp_systolic=data.get('bp_systolic'),
-            bp_diastolic=data.get('bp_diastolic'),
-            heart_rate=data.get('heart_rate'),
-            temperature=data.get('temperature'),
-            spo2=data.get('spo2'),
-            pre_existing=data.get('pre_existing') or []
-        )
+            # Validate and build PatientInput
+            return PatientInput(
+                age=data.get('age', 30),
+                gender=GenderEnum(data.get('gender', 'Other')),
+                symptoms=data.get('symptoms') or ['unspecified'],
+                bp_systolic=data.get('bp_systolic'),
+                bp_diastolic=data.get('bp_diastolic'),
+                heart_rate=data.get('heart_rate'),
+                temperature=data.get('temperature'),
+                spo2=data.get('spo2'),
+                pre_existing=data.get('pre_existing') or []
+            )
         
+    except GeminiUnavailable:
+        raise
     except json.JSONDecodeError as e:
         raise ValueError(f"Failed to parse Gemini response as JSON: {e}")
     except Exception as e:
@@ -0,0 +1,270 @@
+"""Streaming bulk export of triage records.
+
+Rows are read in keyset-ordered batches, each in its own short read
+transaction, so an export of millions of rows holds neither the whole
+table in memory nor a database snapshot open for its full duration.
+
+Export from the command line:
+    python -m app.services.export_service --format csv --output patients.csv
+    python -m app.services.export_service --format parquet --risk-level HIGH --start 2026-01-01 -o high.parquet
+"""
+import argparse
+import asyncio
+import csv
+import io
+import json
+import sys
+from datetime import datetime
+from typing import AsyncIterator, List, Optional
+from sqlalchemy import JSON, DateTime, Float, Integer, String, select
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from app.database import AsyncSessionLocal
+from app.models.patient import Patient
+from app.utils.pagination import apply_keyset, encode_cursor
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # Parquet export is optional
+    pa = None
+    pq = None
+
+EXPORT_COLUMNS = [column.name for column in Patient.__table__.columns]
+JSON_COLUMNS = {column.name for column in Patient.__table__.columns if isinstance(column.type, JSON)}
+# JSON columns holding lists of strings; other JSON columns go to Parquet as encoded strings
+PARQUET_LIST_COLUMNS = {"symptoms", "pre_existing"}
+
+EXPORT_FORMATS = {
+    "ndjson": ("application/x-ndjson", "ndjson"),
+    "csv": ("text/csv", "csv"),
+    "parquet": ("application/vnd.apache.parquet", "parquet"),
+}
+
+
+def parquet_available() -> bool:
+    """Check if pyarrow is installed."""
+    return pa is not None
+
+
+async def iter_patient_batches(
+    session_factory: async_sessionmaker = AsyncSessionLocal,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    risk_level: Optional[str] = None,
+    batch_size: int = 2000
+) -> AsyncIterator[List[dict]]:
+    """
+    Yield patient rows oldest-first in batches of plain dicts.
+
+    Args:
+        session_factory: Factory for the per-batch sessions
+        start: Include patients triaged at or after this time
+        end: Include patients triaged before this time
+        risk_level: Include only HIGH, MEDIUM or LOW
+        batch_size: Rows per batch (and per read transaction)
+    """
+    base_query = select(*(getattr(Patient, name) for name in EXPORT_COLUMNS))
+    if start:
+        base_query = base_query.where(Patient.created_at >= start)
+    if end:
+        base_query = base_query.where(Patient.created_at < end)
+    if risk_level:
+        base_query = base_query.where(Patient.risk_level == risk_level)
+
+    cursor = None
+    while True:
+        query = apply_keyset(base_query, cursor, descending=False).limit(batch_size)
+        async with session_factory() as session:
+            rows = [dict(row._mapping) for row in (await session.execute(query)).all()]
+        if not rows:
+            return
+        yield rows
+        if len(rows) < batch_size:
+            return
+        cursor = encode_cursor(rows[-1]["created_at"], rows[-1]["id"])
+
+
+def _json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+
+def _csv_value(name: str, value):
+    if value is None:
+        return ""
+    if name in JSON_COLUMNS:
+        return json.dumps(value)
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+async def stream_ndjson(batches: AsyncIterator[List[dict]]) -> AsyncIterator[bytes]:
+    """Encode batches as newline-delimited JSON."""
+    async for rows in batches:
+        yield "".join(json.dumps(row, default=_json_default) + "\n" for row in rows).encode()
+
+
+async def stream_csv(batches: AsyncIterator[List[dict]]) -> AsyncIterator[bytes]:
+    """Encode batches as CSV with a header row (list columns JSON-encoded)."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_COLUMNS)
+    async for rows in batches:
+        writer.writerows([_csv_value(name, row[name]) for name in EXPORT_COLUMNS] for row in rows)
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate(0)
+    if buffer.tell():
+        yield buffer.getvalue().encode()
+
+
+class _ChunkSink:
+    """Write-only file object that hands written bytes back in chunks."""
+
+    def __init__(self):
+        self.chunks: List[bytes] = []
+        self.position = 0
+        self.closed = False
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        self.chunks.append(data)
+        self.position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self.position
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def take(self) -> bytes:
+        data = b"".join(self.chunks)
+        self.chunks.clear()
+        return data
+
+
+def _parquet_type(column):
+    if column.name in PARQUET_LIST_COLUMNS:
+        return pa.list_(pa.string())
+    if isinstance(column.type, JSON):
+        return pa.string()
+    if isinstance(column.type, Integer):
+        return pa.int64()
+    if isinstance(column.type, Float):
+        return pa.float64()
+    if isinstance(column.type, DateTime):
+        return pa.timestamp("us")
+    if isinstance(column.type, String):
+        return pa.string()
+    raise TypeError(f"No Parquet type for column {column.name} ({column.type})")
+
+
+def _parquet_schema():
+    """Parquet schema following the Patient model, so new columns are never dropped."""
+    return pa.schema([(column.name, _parquet_type(column)) for column in Patient.__table__.columns])
+
+
+async def stream_parquet(batches: AsyncIterator[List[dict]]) -> AsyncIterator[bytes]:
+    """
+    Encode batches as Parquet, one row group per batch.
+
+    Raises:
+        RuntimeError if pyarrow is not installed
+    """
+    if not parquet_available():
+        raise RuntimeError("Parquet export requires pyarrow (pip install pyarrow)")
+
+    schema = _parquet_schema()
+    sink = _ChunkSink()
+    writer = pq.ParquetWriter(pa.PythonFile(sink, mode="w"), schema, compression="zstd")
+    try:
+        async for rows in batches:
+            columns = {name: [row[name] for row in rows] for name in schema.names}
+            for name in JSON_COLUMNS - PARQUET_LIST_COLUMNS:
+                columns[name] = [json.dumps(value) if value is not None else None for value in columns[name]]
+            writer.write_table(pa.Table.from_pydict(columns, schema=schema))
+            chunk = sink.take()
+            if chunk:
+                yield chunk
+    finally:
+        writer.close()
+    yield sink.take()
+
+
+STREAMERS = {
+    "ndjson": stream_ndjson,
+    "csv": stream_csv,
+    "parquet": stream_parquet,
+}
+
+
+def export_patients(
+    export_format: str,
+    session_factory: async_sessionmaker = AsyncSessionLocal,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    risk_level: Optional[str] = None,
+    batch_size: int = 2000
+) -> AsyncIterator[bytes]:
+    """
+    Stream an export of the patients table.
+
+    Args:
+        export_format: "ndjson", "csv" or "parquet"
+        session_factory: Factory for the per-batch sessions
+        start, end, risk_level: Optional filters
+        batch_size: Rows per read transaction
+
+    Returns:
+        Async iterator of encoded byte chunks
+
+    Raises:
+        ValueError for an unknown format
+    """
+    if export_format not in STREAMERS:
+        raise ValueError(f"Unsupported format. Must be one of: {', '.join(STREAMERS)}")
+    batches = iter_patient_batches(session_factory, start, end, risk_level, batch_size)
+    return STREAMERS[export_format](batches)
+
+
+async def _export_to_file(args):
+    output = open(args.output, "wb") if args.output else sys.stdout.buffer
+    try:
+        async for chunk in export_patients(
+            args.format,
+            start=args.start,
+            end=args.end,
+            risk_level=args.risk_level.upper() if args.risk_level else None,
+            batch_size=args.batch_size
+        ):
+            output.write(chunk)
+    finally:
+        if args.output:
+            output.close()
+    if args.output:
+        print(f"✅ Exported patients to {args.output}", file=sys.stderr)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export triage records.")
+    parser.add_argument("--format", choices=list(STREAMERS), default="ndjson")
+    parser.add_argument("--output", "-o", help="Output file (default: stdout)")
+    parser.add_argument("--start", type=datetime.fromisoformat, help="Triaged at or after (ISO date/time, UTC)")
+    parser.add_argument("--end", type=datetime.fromisoformat, help="Triaged before (ISO date/time, UTC)")
+    parser.add_argument("--risk-level", choices=["HIGH", "MEDIUM", "LOW", "high", "medium", "low"])
+    parser.add_argument("--batch-size", type=int, default=2000)
+    args = parser.parse_args()
+
+    if args.format == "parquet" and not args.output:
+        parser.error("--output is required for parquet")
+    asyncio.run(_export_to_file(args))
+
+
+if __name__ == "__main__":
+    main()
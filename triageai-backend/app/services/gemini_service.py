@@ -1,10 +1,16 @@
 """Gemini AI service for natural language explanations."""
+import asyncio
 import google.generativeai as genai
 from app.config import settings
 from app.schemas.patient import PatientInput, TopFactor
+from app.utils.circuit_breaker import CircuitBreaker
 from typing import List, Optional
 
 
+class GeminiUnavailable(Exception):
+    """Raised instead of calling Gemini while its circuit is open."""
+
+
 class GeminiService:
     """Gemini AI integration for triage explanations."""
     
@@ -12,6 +18,9 @@ class GeminiService:
         """Initialize Gemini service."""
         self.model = None
         self.available = False
+        # Shared by every Gemini call so repeated failures or timeouts stop
+        # costing each request a full round trip
+        self.breaker = CircuitBreaker(settings.GEMINI_FAILURE_THRESHOLD, settings.GEMINI_RESET_SECONDS)
         
     def initialize(self):
         """Configure and initialize Gemini API."""
@@ -34,6 +43,10 @@ class GeminiService:
         """Check if Gemini is available."""
         return self.available
     
+    def circuit_state(self) -> str:
+        """closed, open or half_open."""
+        return self.breaker.state
+    
     async def generate_explanation(
         self,
         patient: PatientInput,
@@ -55,7 +68,7 @@ class GeminiService:
         Returns:
             Natural language explanation string
         """
-        if not self.is_available():
+        if not self.is_available() or not self.breaker.allow():
             return self._fallback_explanation(patient, risk_level, department, top_factors)
         
         # Build structured prompt
@@ -85,11 +98,20 @@ Mention the most critical factors and any immediate recommendations.
 Use medical terminology appropriately but remain clear. Do not use markdown formatting."""
 
         try:
-            response = await self.model.generate_content_async(prompt)
-            return response.text.strip()
+            response = await asyncio.wait_for(
+                self.model.generate_content_async(prompt), settings.GEMINI_TIMEOUT_SECONDS
+            )
+            text = response.text.strip()
+        except asyncio.TimeoutError:
+            self.breaker.record_failure()
+            print(f"⚠️  Gemini API call timed out after {settings.GEMINI_TIMEOUT_SECONDS}s")
+            return self._fallback_explanation(patient, risk_level, department, top_factors)
         except Exception as e:
+            self.breaker.record_failure()
             print(f"⚠️  Gemini API call failed: {e}")
             return self._fallback_explanation(patient, risk_level, department, top_factors)
+        self.breaker.record_success()
+        return text
     
     def _format_factors(self, factors: List[TopFactor]) -> str:
         """Format SHAP factors for prompt."""
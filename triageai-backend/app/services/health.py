@@ -0,0 +1,112 @@
+"""Background health probing for liveness and readiness endpoints.
+
+The database is checked by a background task every
+HEALTH_PROBE_INTERVAL_SECONDS, never by a probe request, so any number of
+replicas and probe frequencies cost the database one `SELECT 1` per worker
+per interval. Model warm-up and the Gemini circuit are in-process flags,
+read directly.
+
+Readiness requires a connected database (checked recently) and a loaded,
+warmed-up model. An open Gemini circuit is reported but does not make the
+worker unready: triage falls back to template explanations, and every
+replica shares the same Gemini outage, so pulling them all from the load
+balancer would only turn degraded service into none.
+"""
+import asyncio
+import contextlib
+import time
+from typing import Callable, Optional
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine
+from app.config import settings
+from app.database import engine as default_engine
+from app.services.gemini_service import gemini_service
+from app.services.ml_service import ml_service
+
+# A result older than this many intervals means the prober stopped running
+STALE_AFTER_INTERVALS = 3
+
+
+class HealthProber:
+    """Caches the database check from a background task."""
+
+    def __init__(
+        self,
+        engine: Optional[AsyncEngine] = None,
+        interval: Optional[float] = None,
+        timeout: Optional[float] = None,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.engine = engine or default_engine
+        self.interval = interval or settings.HEALTH_PROBE_INTERVAL_SECONDS
+        self.timeout = timeout or settings.HEALTH_DB_TIMEOUT_SECONDS
+        self.clock = clock
+        self.database = "unknown"
+        self.last_error: Optional[str] = None
+        self.checked_at: Optional[float] = None
+        self.probes = 0
+        self._task: Optional[asyncio.Task] = None
+
+    async def _select_one(self):
+        async with self.engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+
+    async def probe(self):
+        """Run the database check once and cache the result."""
+        try:
+            await asyncio.wait_for(self._select_one(), self.timeout)
+            self.database = "connected"
+            self.last_error = None
+        except asyncio.TimeoutError:
+            self.database = "error"
+            self.last_error = f"SELECT 1 timed out after {self.timeout}s"
+        except Exception as e:
+            self.database = "error"
+            self.last_error = str(e)
+        self.checked_at = self.clock()
+        self.probes += 1
+
+    async def start(self):
+        """Probe once, then keep probing in the background (application startup)."""
+        await self.probe()
+        if self._task is None:
+            self._task = asyncio.create_task(self._probe_loop())
+
+    async def _probe_loop(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            await self.probe()
+
+    async def stop(self):
+        task, self._task = self._task, None
+        if task is not None:
+            task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await task
+
+    def database_status(self) -> str:
+        """connected, error, unknown (never probed) or stale (prober not running)."""
+        if self.checked_at is None:
+            return "unknown"
+        if self.clock() - self.checked_at > self.interval * STALE_AFTER_INTERVALS:
+            return "stale"
+        return self.database
+
+    def readiness(self) -> dict:
+        """Component states and whether this worker should receive traffic."""
+        database = self.database_status()
+        checked_ago = None if self.checked_at is None else round(self.clock() - self.checked_at, 3)
+        return {
+            "ready": database == "connected" and ml_service.is_ready(),
+            "database": database,
+            "database_checked_seconds_ago": checked_ago,
+            "database_error": self.last_error,
+            "model_loaded": ml_service.is_loaded(),
+            "model_warmed_up": ml_service.warmed_up,
+            "gemini_available": gemini_service.is_available(),
+            "gemini_circuit": gemini_service.circuit_state(),
+        }
+
+
+# Global prober instance
+health_prober = HealthProber()
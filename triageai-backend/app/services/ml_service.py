@@ -1,14 +1,19 @@
 """Machine Learning model service with SHAP explainability."""
+import asyncio
 import pickle
 import numpy as np
 import pandas as pd
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Tuple
 from pathlib import Path
 import shap
+import xgboost as xgb
 from app.config import settings
-from app.schemas.patient import PatientInput, TopFactor
+from app.schemas.patient import GenderEnum, PatientInput, TopFactor
 from app.utils.feature_engineering import build_features, get_feature_names
+from app.utils.metrics import time_stage
 
+# Any patient works; warm-up only needs every prediction stage to run once
+WARMUP_PATIENT = PatientInput(age=45, gender=GenderEnum.OTHER, symptoms=["headache"], pre_existing=[])
 
 class MLService:
     """ML model loader and prediction service."""
@@ -19,14 +24,17 @@ class MLService:
         self.scaler = None
         self.encoder = None
         self.explainer = None
+        self.warmed_up = False
+        self.warm_up_future: Optional[asyncio.Future] = None
         self.feature_names = get_feature_names()
         
     def load_models(self):
         """Load trained XGBoost model, scaler, and encoder."""
         model_dir = Path(settings.MODEL_DIR)
+        self.warmed_up = False
         
         try:
-            with open(model_dir / "xgb_model.pkl", "rb") as f:
+            with open(model_dir / settings.ML_MODEL_FILE, "rb") as f:
                 self.model = pickle.load(f)
             
             with open(model_dir / "scaler.pkl", "rb") as f:
@@ -43,12 +51,12 @@ class MLService:
                 background_data
             )
             
-            print("✅ ML models loaded successfully")
+            print(f"✅ ML models loaded successfully ({settings.ML_MODEL_FILE})")
             return True
             
         except FileNotFoundError as e:
             print(f"⚠️  ML models not found: {e}")
-            print("   Run 'python ml/generate_data.py' and 'python ml/train_model.py' first")
+            print("   Run 'python -m ml.generate_data' and 'python -m ml.train_model' first")
             return False
         except Exception as e:
             print(f"❌ Error loading ML models: {e}")
@@ -58,6 +66,51 @@ class MLService:
         """Check if models are loaded."""
         return self.model is not None
     
+    def warm_up(self) -> bool:
+        """
+        Run one throwaway prediction after loading.
+        
+        The first prediction pays for lazy initialization (XGBoost predictor
+        setup, SHAP background sampling); doing it here keeps that off the
+        first patient. Readiness waits for this to finish.
+        """
+        if not self.is_loaded():
+            return False
+        try:
+            self.predict_with_shap(WARMUP_PATIENT)
+        except Exception as e:
+            print(f"❌ ML warm-up prediction failed: {e}")
+            return False
+        self.warmed_up = True
+        print("✅ ML model warmed up")
+        return True
+    
+    def start_warm_up(self) -> asyncio.Future:
+        """Run warm_up on the default executor (application startup); readiness flips when it succeeds."""
+        self.warm_up_future = asyncio.get_running_loop().run_in_executor(None, self.warm_up)
+        self.warm_up_future.add_done_callback(self._warm_up_finished)
+        return self.warm_up_future
+    
+    @staticmethod
+    def _warm_up_finished(future: asyncio.Future):
+        if future.cancelled():
+            print("⚠️  ML warm-up cancelled")
+        elif future.exception() is not None:
+            print(f"❌ ML warm-up crashed: {future.exception()!r}; /api/health/ready stays 503")
+        elif not future.result():
+            print("❌ ML warm-up did not complete; /api/health/ready stays 503")
+    
+    async def stop_warm_up(self):
+        """Wait for a running warm-up (application shutdown; its thread cannot be interrupted)."""
+        future, self.warm_up_future = self.warm_up_future, None
+        if future is not None and not future.done():
+            print("⏳ Waiting for ML warm-up to finish...")
+            await asyncio.wait([future])
+    
+    def is_ready(self) -> bool:
+        """Check if models are loaded and warmed up."""
+        return self.is_loaded() and self.warmed_up
+    
     def predict_with_shap(
         self, 
         patient: PatientInput
@@ -75,16 +128,18 @@ class MLService:
             raise RuntimeError("ML models not loaded. Call load_models() first.")
         
         # Build features
-        features_df = build_features(patient)
-        
-        # Ensure correct column order
-        features_df = features_df[self.feature_names]
-        
-        # Scale features
-        features_scaled = self.scaler.transform(features_df)
+        with time_stage("triage", "features"):
+            features_df = build_features(patient)
+            
+            # Ensure correct column order
+            features_df = features_df[self.feature_names]
+            
+            # Scale features
+            features_scaled = self.scaler.transform(features_df)
         
         # Get predictions
-        probabilities = self.model.predict_proba(features_scaled)[0]
+        with time_stage("triage", "xgboost"):
+            probabilities = self.model.predict_proba(features_scaled)[0]
         predicted_class_idx = np.argmax(probabilities)
         predicted_class = int(predicted_class_idx) # Cast to Python int
         confidence = float(probabilities[predicted_class])
@@ -95,7 +150,8 @@ class MLService:
         top_factors = []
         try:
             # SHAP explanations
-            shap_values = self.explainer.shap_values(features_scaled)
+            with time_stage("triage", "shap"):
+                shap_values = self.explainer.shap_values(features_scaled)
             
             # For multi-class, shap_values is a list of arrays (one per class)
             # Use the predicted class's SHAP values
@@ -139,6 +195,58 @@ class MLService:
         
         return risk_level, confidence, top_factors
 
+    def predict_batch(
+        self,
+        features_df: pd.DataFrame,
+        top_k: int = 3,
+        approx_factors: bool = False
+    ) -> Tuple[np.ndarray, np.ndarray, List[List[TopFactor]]]:
+        """
+        Predict many feature rows at once (offline batch scoring).
+
+        Top factors come from XGBoost's own tree SHAP values (pred_contribs)
+        for the predicted class, computed for the whole batch in one call,
+        instead of the per-row KernelExplainer used by predict_with_shap.
+
+        Args:
+            features_df: Rows from build_feature_frame
+            top_k: Factors to return per row
+            approx_factors: Use XGBoost's approximate (Saabas) contributions,
+                much cheaper than exact tree SHAP on large ensembles
+
+        Returns:
+            Tuple of (risk_levels, confidences, top_factors per row)
+        """
+        if not self.is_loaded():
+            raise RuntimeError("ML models not loaded. Call load_models() first.")
+
+        features_scaled = self.scaler.transform(features_df[self.feature_names])
+        probabilities = self.model.predict_proba(features_scaled)
+        predicted = probabilities.argmax(axis=1)
+        rows = np.arange(len(predicted))
+        confidences = probabilities[rows, predicted]
+        risk_levels = self.encoder.inverse_transform(predicted)
+
+        # (rows, classes, features + bias) for multi-class models
+        contribs = self.model.get_booster().predict(
+            xgb.DMatrix(features_scaled), pred_contribs=True, approx_contribs=approx_factors
+        )
+        contribs = contribs[rows, predicted, :-1]
+        top_indices = np.argsort(-np.abs(contribs), axis=1)[:, :top_k]
+
+        top_factors = [
+            [
+                TopFactor(
+                    feature=self.feature_names[idx].replace("_", " ").title(),
+                    contribution=abs(float(row_contribs[idx])),
+                    direction="increases" if row_contribs[idx] > 0 else "decreases"
+                )
+                for idx in row_top
+            ]
+            for row_contribs, row_top in zip(contribs, top_indices)
+        ]
+        return risk_levels, confidences, top_factors
+
 
 # Global ML service instance
 ml_service = MLService()
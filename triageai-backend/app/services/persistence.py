@@ -0,0 +1,166 @@
+"""Triage result persistence with group commit."""
+import asyncio
+from typing import List, Optional, Tuple
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from app.config import settings
+from app.database import AsyncSessionLocal
+from app.models.patient import Patient
+from app.services.stats_service import count_records, increment_counters, triage_stats
+from app.services.trends_service import count_record_rollups, increment_rollups
+
+
+async def persist_patients(session: AsyncSession, records: List[Patient]) -> None:
+    """
+    Insert triage records in a single transaction.
+
+    Records must carry client-side ``id`` and ``created_at`` values so the
+    caller never has to refresh them after commit. Statistics counters and
+    trend rollups are updated in the same transaction.
+
+    Args:
+        session: Database session
+        records: Patient rows to insert
+    """
+    deltas = count_records(records)
+    session.add_all(records)
+    await increment_counters(session, deltas)
+    await increment_rollups(session, count_record_rollups(records))
+    await session.commit()
+    triage_stats.apply(deltas)
+
+
+class PatientWriter:
+    """
+    Write-behind buffer that group-commits Patient inserts.
+
+    Concurrent triage requests enqueue their records; a single background
+    task collects them for up to ``flush_interval_ms`` (or ``max_batch``
+    rows) and commits them in one transaction. Callers are acknowledged
+    only after that commit returns, so a completed request is durable.
+    """
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker = AsyncSessionLocal,
+        max_batch: int = settings.PERSISTENCE_BATCH_SIZE,
+        flush_interval_ms: float = settings.PERSISTENCE_FLUSH_INTERVAL_MS,
+        queue_size: int = settings.PERSISTENCE_QUEUE_SIZE
+    ):
+        """Initialize writer (background task started on startup)."""
+        self.session_factory = session_factory
+        self.max_batch = max_batch
+        self.flush_interval = flush_interval_ms / 1000
+        self.queue_size = queue_size
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+
+        # Counters for monitoring
+        self.batches_flushed = 0
+        self.rows_flushed = 0
+
+    def is_running(self) -> bool:
+        """Check if the background flush task is active."""
+        return self._task is not None and not self._task.done()
+
+    def queue_depth(self) -> int:
+        """Number of records waiting to be flushed."""
+        return self._queue.qsize() if self._queue is not None else 0
+
+    async def start(self):
+        """Start the background flush task."""
+        if self.is_running():
+            return
+        self._queue = asyncio.Queue(maxsize=self.queue_size)
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Flush pending records and stop the background task."""
+        if not self.is_running():
+            return
+        await self._queue.put(None)
+        await self._task
+        self._task = None
+
+    async def submit(self, record: Patient) -> None:
+        """
+        Queue a record and wait until its group commit is durable.
+
+        Raises:
+            Exception from the failed commit, if the record could not be saved
+        """
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((record, future))
+        await future
+
+    def _drain(self, batch: List[Tuple[Patient, asyncio.Future]]) -> bool:
+        """Move queued items into batch without waiting. Returns False on stop sentinel."""
+        while len(batch) < self.max_batch:
+            try:
+                item = self._queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return True
+            if item is None:
+                return False
+            batch.append(item)
+        return True
+
+    async def _run(self):
+        """Collect records into batches and flush them."""
+        running = True
+        while running:
+            item = await self._queue.get()
+            if item is None:
+                running = False
+                batch = []
+            else:
+                batch = [item]
+                running = self._drain(batch)
+                if running and len(batch) < self.max_batch and self.flush_interval > 0:
+                    # Give concurrent requests a moment to join this commit
+                    await asyncio.sleep(self.flush_interval)
+                    running = self._drain(batch)
+
+            if not running:
+                # Stop requested: flush everything still queued
+                while not self._queue.empty():
+                    leftover = self._queue.get_nowait()
+                    if leftover is not None:
+                        batch.append(leftover)
+
+            if batch:
+                await self._flush(batch)
+
+    async def _flush(self, batch: List[Tuple[Patient, asyncio.Future]]):
+        """Commit a batch, falling back to per-row commits if it fails."""
+        try:
+            async with self.session_factory() as session:
+                await persist_patients(session, [record for record, _ in batch])
+        except Exception:
+            # Isolate the bad row(s) so one failure does not reject the whole batch
+            for record, future in batch:
+                try:
+                    async with self.session_factory() as session:
+                        await persist_patients(session, [record])
+                    self._resolve(future)
+                except Exception as e:
+                    self._resolve(future, e)
+        else:
+            for _, future in batch:
+                self._resolve(future)
+
+        self.batches_flushed += 1
+        self.rows_flushed += len(batch)
+
+    @staticmethod
+    def _resolve(future: asyncio.Future, error: Optional[Exception] = None):
+        """Acknowledge a waiting caller."""
+        if future.done():
+            return
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(None)
+
+
+# Global writer instance
+patient_writer = PatientWriter()
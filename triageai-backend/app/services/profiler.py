@@ -0,0 +1,193 @@
+"""On-demand request profiling.
+
+A profiled request gets a sampler thread that, every few milliseconds,
+records the Python stack of the thread serving the request. Samples are
+written in the folded-stack format (``frame;frame;frame count`` per line)
+read by flamegraph.pl, speedscope and inferno, next to a small JSON file
+describing the request.
+
+The sampler only reads the stack; nothing is traced per function call, so
+a profiled request runs at close to its normal speed. Requests that are
+not profiled pay for one header lookup and one random draw, and nothing at
+all when PROFILING_ENABLED is off (the middleware is not installed).
+
+The event loop thread is shared: while a profiled request awaits I/O the
+samples show whatever else the loop runs (idle polling, other requests).
+Work sent to executors (password hashing) appears as the awaiting frame.
+"""
+import hmac
+import json
+import os
+import random
+import re
+import secrets
+import sys
+import threading
+import time
+from collections import Counter
+from functools import lru_cache
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+from app.config import settings
+
+PROFILE_HEADER = b"x-profile"
+_PROFILE_ID = re.compile(r"^\d{8}T\d{6}-[0-9a-f]{8}$")
+
+
+@lru_cache(maxsize=4096)
+def _short_path(filename: str) -> str:
+    """Path relative to site-packages or the working directory, for readable frame names."""
+    marker = f"site-packages{os.sep}"
+    if marker in filename:
+        return filename.split(marker, 1)[1]
+    try:
+        relative = os.path.relpath(filename)
+    except ValueError:
+        return os.path.basename(filename)
+    return os.path.basename(filename) if relative.startswith("..") else relative
+
+
+def fold_stack(frame) -> str:
+    """One sampled stack as ``root;...;leaf`` with one ``func (file:line)`` per frame."""
+    names = []
+    while frame is not None:
+        code = frame.f_code
+        name = getattr(code, "co_qualname", code.co_name)
+        names.append(f"{name} ({_short_path(code.co_filename)}:{code.co_firstlineno})".replace(";", ":"))
+        frame = frame.f_back
+    return ";".join(reversed(names))
+
+
+class StackSampler:
+    """Samples one thread's stack on a background thread until stopped."""
+
+    def __init__(self, thread_id: int, interval: float):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.counts: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="profile-sampler", daemon=True)
+
+    def start(self) -> "StackSampler":
+        self._thread.start()
+        return self
+
+    def stop(self) -> Counter:
+        """Stop sampling and return the sample count per folded stack."""
+        self._stop.set()
+        self._thread.join()
+        return self.counts
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is not None:
+                self.counts[fold_stack(frame)] += 1
+            del frame
+
+
+class ProfileStore:
+    """Folded-stack files plus JSON metadata in one directory, oldest pruned first."""
+
+    def __init__(self, directory: Optional[str] = None, max_profiles: Optional[int] = None):
+        self.directory = Path(directory or settings.PROFILING_DIR)
+        self.max_profiles = max_profiles or settings.PROFILING_MAX_PROFILES
+
+    @staticmethod
+    def new_id() -> str:
+        return f"{time.strftime('%Y%m%dT%H%M%S', time.gmtime())}-{secrets.token_hex(4)}"
+
+    def save(self, profile_id: str, counts: Counter, meta: dict):
+        self.directory.mkdir(parents=True, exist_ok=True)
+        folded = "".join(f"{stack} {count}\n" for stack, count in counts.most_common())
+        (self.directory / f"{profile_id}.folded").write_text(folded)
+        (self.directory / f"{profile_id}.json").write_text(json.dumps({"id": profile_id, **meta}))
+        self.prune()
+
+    def prune(self):
+        for meta_file in sorted(self.directory.glob("*.json"))[:-self.max_profiles]:
+            meta_file.unlink(missing_ok=True)
+            meta_file.with_suffix(".folded").unlink(missing_ok=True)
+
+    def list(self) -> List[dict]:
+        """Metadata for stored profiles, newest first."""
+        if not self.directory.is_dir():
+            return []
+        profiles = []
+        for meta_file in sorted(self.directory.glob("*.json"), reverse=True):
+            try:
+                profiles.append(json.loads(meta_file.read_text()))
+            except (OSError, ValueError):
+                continue  # Pruned or half-written by another worker
+        return profiles
+
+    def path(self, profile_id: str) -> Optional[Path]:
+        """Folded-stack file for an ID, or None if unknown (IDs never reach the filesystem unchecked)."""
+        if not _PROFILE_ID.match(profile_id):
+            return None
+        path = self.directory / f"{profile_id}.folded"
+        return path if path.is_file() else None
+
+
+class RequestProfiler:
+    """Decides which requests to profile and runs their samplers."""
+
+    def __init__(
+        self,
+        store: Optional[ProfileStore] = None,
+        token: Optional[str] = None,
+        sample_rate: Optional[float] = None,
+        interval_ms: Optional[float] = None,
+        max_concurrent: Optional[int] = None,
+        rng: Callable[[], float] = random.random
+    ):
+        self.store = store or ProfileStore()
+        self.token = (settings.PROFILING_TOKEN if token is None else token).encode()
+        self.sample_rate = settings.PROFILING_SAMPLE_RATE if sample_rate is None else sample_rate
+        self.interval = (interval_ms or settings.PROFILING_INTERVAL_MS) / 1000
+        self.max_concurrent = max_concurrent or settings.PROFILING_MAX_CONCURRENT
+        self.rng = rng
+        self.active = 0
+        self.skipped = 0
+
+    def reason(self, headers: Dict[bytes, bytes]) -> Optional[str]:
+        """'header' for a request carrying the profiling token, 'sampled' for a random pick, else None."""
+        requested = headers.get(PROFILE_HEADER)
+        if requested is not None and self.token and hmac.compare_digest(requested, self.token):
+            return "header"
+        if self.sample_rate > 0 and self.rng() < self.sample_rate:
+            return "sampled"
+        return None
+
+    def begin(self) -> Optional[StackSampler]:
+        """Start sampling the calling thread, unless too many profiles are already running."""
+        if self.active >= self.max_concurrent:
+            self.skipped += 1
+            return None
+        self.active += 1
+        try:
+            return StackSampler(threading.get_ident(), self.interval).start()
+        except BaseException:
+            self.active -= 1
+            raise
+
+    def end(self, sampler: StackSampler) -> Counter:
+        """Stop a sampler from begin(); always frees its concurrency slot."""
+        try:
+            return sampler.stop()
+        finally:
+            self.active -= 1
+
+    def status(self) -> dict:
+        return {
+            "sample_rate": self.sample_rate,
+            "header_enabled": bool(self.token),
+            "interval_ms": self.interval * 1000,
+            "max_concurrent": self.max_concurrent,
+            "active": self.active,
+            "skipped": self.skipped,
+        }
+
+
+# Global profiler instance (used only when PROFILING_ENABLED is set)
+request_profiler = RequestProfiler()
@@ -0,0 +1,145 @@
+"""Live priority queue of waiting patients.
+
+Patients are ordered by priority (HIGH, MEDIUM, LOW), then confidence
+(highest first), then arrival time. The queue keeps a list of sort keys in
+treatment order, maintained with bisect on every admit, re-prioritize and
+discharge, so reads never sort: a snapshot walks the list from the front
+and stops after ``limit`` matching patients.
+
+Every worker holds its own copy, rebuilt from the ``patients`` table at
+startup and kept current by the queue changes published through the
+broadcast backend (see app.services.realtime.publish_queue_change).
+"""
+from bisect import bisect_left, insort
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.patient import Patient, PATIENT_SUMMARY_COLUMNS
+from app.schemas.queue import QueueEntry
+
+WAITING = "WAITING"
+DISCHARGED = "DISCHARGED"
+
+PRIORITY_RANK = {"HIGH": 0, "MEDIUM": 1, "LOW": 2}
+
+SortKey = Tuple[int, float, str, str]
+
+
+def sort_key(entry: dict) -> SortKey:
+    """Queue ordering for an entry (smallest is treated first; unique per patient)."""
+    return (
+        PRIORITY_RANK.get(entry["priority"], len(PRIORITY_RANK)),
+        -entry["confidence"],
+        entry["created_at"],
+        entry["id"],
+    )
+
+
+def queue_entry(record, priority_override: Optional[str] = None) -> dict:
+    """JSON-ready queue entry for a patient record or summary row."""
+    priority = priority_override or getattr(record, "priority_override", None) or record.risk_level
+    return QueueEntry.model_validate({
+        **{column.key: getattr(record, column.key) for column in PATIENT_SUMMARY_COLUMNS},
+        "priority": priority,
+    }).model_dump(mode="json")
+
+
+class PatientQueue:
+    """Waiting patients kept in treatment order."""
+
+    def __init__(self):
+        """Initialize empty queue (loaded on application startup)."""
+        self._order: List[Tuple[SortKey, str]] = []
+        self._entries: Dict[str, Tuple[SortKey, dict]] = {}
+        self.loaded = False
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, patient_id: str) -> bool:
+        return patient_id in self._entries
+
+    def get(self, patient_id: str) -> Optional[dict]:
+        """Current entry for a waiting patient."""
+        item = self._entries.get(patient_id)
+        return item[1] if item else None
+
+    def upsert(self, entry: dict):
+        """Admit a patient or move them to a new position."""
+        key = sort_key(entry)
+        current = self._entries.get(entry["id"])
+        self._entries[entry["id"]] = (key, entry)
+        if current is not None:
+            if current[0] == key:
+                return
+            self._unlink(current[0], entry["id"])
+        insort(self._order, (key, entry["id"]))
+
+    def remove(self, patient_id: str) -> Optional[dict]:
+        """Discharge a patient."""
+        item = self._entries.pop(patient_id, None)
+        if item is None:
+            return None
+        self._unlink(item[0], patient_id)
+        return item[1]
+
+    def _unlink(self, key: SortKey, patient_id: str):
+        i = bisect_left(self._order, (key, patient_id))
+        if i < len(self._order) and self._order[i] == (key, patient_id):
+            del self._order[i]
+
+    def peek(self) -> Optional[dict]:
+        """Next patient to be seen."""
+        return self._entries[self._order[0][1]][1] if self._order else None
+
+    def snapshot(
+        self,
+        limit: Optional[int] = None,
+        department: Optional[str] = None,
+        priority: Optional[str] = None
+    ) -> List[dict]:
+        """
+        Waiting patients in treatment order.
+
+        Args:
+            limit: Maximum entries (None = all)
+            department: Only entries whose department contains this name
+            priority: Only HIGH, MEDIUM or LOW entries
+        """
+        ordered = []
+        for _, patient_id in self._order:
+            entry = self._entries[patient_id][1]
+            if priority and entry["priority"] != priority:
+                continue
+            if department and department.lower() not in entry["department"].lower():
+                continue
+            ordered.append(entry)
+            if limit is not None and len(ordered) >= limit:
+                break
+        return ordered
+
+    def apply(self, change: dict):
+        """Apply a published queue change ({"op": ..., "patient": {...}})."""
+        if change.get("op") == "discharge":
+            self.remove(change["patient"]["id"])
+        else:
+            self.upsert(change["patient"])
+
+    async def rebuild(self, session: AsyncSession) -> int:
+        """
+        Load every waiting patient from the database.
+
+        Returns:
+            Number of waiting patients
+        """
+        result = await session.execute(
+            select(*PATIENT_SUMMARY_COLUMNS, Patient.priority_override).where(Patient.status == WAITING)
+        )
+        entries = [queue_entry(row) for row in result.all()]
+        self._entries = {entry["id"]: (sort_key(entry), entry) for entry in entries}
+        self._order = sorted((key, patient_id) for patient_id, (key, _) in self._entries.items())
+        self.loaded = True
+        return len(self._entries)
+
+
+patient_queue = PatientQueue()
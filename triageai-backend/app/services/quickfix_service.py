@@ -0,0 +1,99 @@
+"""Quick Fix disease and medicine suggestion service."""
+import pickle
+from pathlib import Path
+from typing import Dict, List, Optional
+import numpy as np
+from app.config import settings
+from app.utils.metrics import time_stage
+
+
+class QuickFixService:
+    """Loads the Quick Fix artifact (see ml/train_quickfix.py) and predicts diseases."""
+
+    def __init__(self):
+        """Initialize Quick Fix service (model loaded on startup)."""
+        self.model = None
+        self.le_history = None
+        self.le_disease = None
+        self.disease_to_medicine: Dict[str, str] = {}
+        self.symptoms: List[str] = []
+        self.history: List[str] = []
+        self._symptom_index: Dict[str, int] = {}
+
+    def load_models(self, path: Optional[str] = None) -> bool:
+        """Load the Quick Fix model bundle."""
+        try:
+            with open(Path(path or settings.QUICKFIX_MODEL_PATH), "rb") as f:
+                artifacts = pickle.load(f)
+            self.model = artifacts["model_disease"]
+            self.le_history = artifacts["le_history"]
+            self.le_disease = artifacts["le_disease"]
+            self.disease_to_medicine = artifacts["disease_to_medicine"]
+            self.symptoms = artifacts["all_symptoms"]
+            self.history = artifacts["all_history"]
+            self._symptom_index = {symptom: i for i, symptom in enumerate(self.symptoms)}
+
+            # Trained with n_jobs=-1; one row per request is faster without
+            # dispatching every prediction to a pool of threads
+            self.model.n_jobs = 1
+            print("✅ Quick Fix model loaded successfully")
+            return True
+        except Exception as e:
+            print(f"⚠️ Failed to load Quick Fix model: {e}")
+            self.model = None
+            return False
+
+    def is_loaded(self) -> bool:
+        """Check if the model is loaded."""
+        return self.model is not None
+
+    def encode(self, symptoms: List[str], history: str) -> np.ndarray:
+        """
+        Build the model input row: multi-hot symptoms followed by the history code.
+
+        Unknown symptoms are ignored; unknown history falls back to "None".
+        """
+        try:
+            history_val = self.le_history.transform([history])[0]
+        except ValueError:
+            try:
+                history_val = self.le_history.transform(["None"])[0]
+            except ValueError:
+                history_val = 0
+
+        row = np.zeros((1, len(self.symptoms) + 1))
+        for symptom in symptoms:
+            idx = self._symptom_index.get(symptom)
+            if idx is not None:
+                row[0, idx] = 1
+        row[0, -1] = history_val
+        return row
+
+    def predict(self, symptoms: List[str], history: str) -> dict:
+        """
+        Predict the most likely disease and its suggested medicine.
+
+        Returns:
+            Dict with disease, medicine and confidence
+        """
+        if not self.is_loaded():
+            raise RuntimeError("Quick Fix model not loaded. Call load_models() first.")
+
+        with time_stage("quick_fix", "encode"):
+            row = self.encode(symptoms, history)
+
+        # One predict_proba pass gives both the class and its confidence
+        with time_stage("quick_fix", "predict"):
+            probs = self.model.predict_proba(row)[0]
+        best = int(np.argmax(probs))
+        disease = self.le_disease.inverse_transform([self.model.classes_[best]])[0]
+
+        return {
+            "disease": disease,
+            "medicine": self.disease_to_medicine.get(disease, "Consult Doctor"),
+            "confidence": round(float(probs[best]), 2)
+        }
+
+
+# Global Quick Fix service instance
+quickfix_service = QuickFixService()
@@ -0,0 +1,470 @@
+"""Real-time triage event fan-out to WebSocket clients.
+
+Clients receive every triage event until they send a subscribe message::
+
+    {"action": "subscribe", "departments": ["Cardiology"], "risk_levels": ["HIGH"]}
+
+The server then answers with a snapshot of recent matching patients
+(``{"type": "snapshot", "patients": [...]}``) followed only by deltas
+(``{"type": "triage", "patient": {...}}``) for newly triaged patients.
+
+Queue changes (``{"type": "queue", "op": "admit" | "update" | "discharge",
+"patient": {...}}``) are sent to every matching client so dashboards can
+patch their copy of the live queue instead of re-sorting it.
+
+Clients may negotiate batched JSON or MessagePack framing with a
+WebSocket subprotocol (see app.utils.ws_framing). Idle clients get a
+``{"type": "heartbeat"}`` message from a single manager-wide timer.
+
+Events are published through ``broadcaster`` (see app.services.broadcast)
+so they also reach clients connected to other uvicorn workers.
+"""
+import asyncio
+import itertools
+import json
+import time
+from collections import OrderedDict
+from typing import Iterable, List, Optional, Set, Union
+from fastapi import WebSocket
+from pydantic import ValidationError
+from sqlalchemy import select, or_
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from app.config import settings
+from app.database import AsyncSessionLocal
+from app.models.patient import Patient, PATIENT_SUMMARY_COLUMNS
+from app.schemas.patient import PatientSummary
+from app.schemas.realtime import SubscribeRequest
+from app.services.broadcast import create_backend
+from app.services.queue_service import patient_queue
+from app.utils.ws_framing import Codec, DEFAULT_CODEC, Event, Message, as_event, negotiate
+
+
+class Subscription:
+    """Department / risk-level filter for one client (empty filters match everything)."""
+
+    def __init__(self, departments: Iterable[str] = (), risk_levels: Iterable[str] = ()):
+        self.departments = {d.strip().lower() for d in departments if d.strip()}
+        self.risk_levels = {r.strip().upper() for r in risk_levels if r.strip()}
+
+    def matches(self, department: str, risk_level: str) -> bool:
+        """
+        Check if an event is wanted.
+
+        A department filter matches the full name or any part of a combined
+        name, so "Cardiology" matches "Cardiology / Emergency".
+        """
+        if self.risk_levels and risk_level not in self.risk_levels:
+            return False
+        if self.departments:
+            names = {part.strip().lower() for part in department.split("/")}
+            names.add(department.lower())
+            return bool(names & self.departments)
+        return True
+
+
+class ClientConnection:
+    """
+    One connected socket with its own bounded outbound queue and sender task.
+
+    Broadcasts only enqueue, so a slow or stalled client never delays the
+    others. Messages that share a key (e.g. updates to the same patient)
+    replace each other while still queued, so a lagging client receives
+    the latest state instead of every intermediate one.
+    """
+
+    def __init__(self, websocket: WebSocket, manager: "ConnectionManager", codec: Codec = DEFAULT_CODEC):
+        self.websocket = websocket
+        self.manager = manager
+        self.codec = codec
+        self.last_sent = time.monotonic()
+        self.pending: "OrderedDict[object, Event]" = OrderedDict()
+        self.subscription: Optional[Subscription] = None
+        self._held: Optional[list] = None
+        self.dropped = 0
+        self.closed = False
+        self._wakeup = asyncio.Event()
+        self._sender: Optional[asyncio.Task] = None
+
+    def start(self):
+        """Start the sender task."""
+        self._sender = asyncio.create_task(self._send_loop())
+
+    def enqueue(self, message: Message, key: Optional[str] = None) -> bool:
+        """
+        Queue a message without blocking.
+
+        Returns:
+            False if the client was evicted as a slow consumer
+        """
+        if self.closed:
+            return False
+        message = as_event(message)
+
+        if key is not None and key in self.pending:
+            self.pending[key] = message
+            self.manager.coalesced += 1
+            return True
+
+        if len(self.pending) >= self.manager.queue_size:
+            if self.manager.policy == "evict":
+                self.manager.evict(self, "queue full")
+                return False
+            self.pending.popitem(last=False)
+            self.dropped += 1
+            self.manager.dropped += 1
+            if self.dropped > self.manager.max_dropped:
+                self.manager.evict(self, "too many dropped messages")
+                return False
+
+        self.pending[key if key is not None else next(self.manager.sequence)] = message
+        self._wakeup.set()
+        return True
+
+    def wants(self, department: str, risk_level: str) -> bool:
+        """Check the client's subscription (no subscription = everything)."""
+        return self.subscription is None or self.subscription.matches(department, risk_level)
+
+    def deliver(self, message: Message, key: Optional[str] = None):
+        """Queue an event, or hold it while a snapshot is being prepared."""
+        if self._held is not None:
+            self._held.append((message, key))
+        else:
+            self.enqueue(message, key)
+
+    def hold(self):
+        """Buffer incoming events until release() (snapshot in progress)."""
+        self._held = []
+
+    def release(self, skip_keys: Set[str] = frozenset()):
+        """Send buffered events, skipping those already covered by the snapshot."""
+        held, self._held = self._held or [], None
+        for message, key in held:
+            if key not in skip_keys:
+                self.enqueue(message, key)
+
+    async def _send_loop(self):
+        """
+        Drain the queue to the socket, evicting on stalls or errors.
+
+        Batched codecs wait one tick after the first queued event so a burst
+        goes out as a single frame.
+        """
+        send = self.websocket.send_bytes if self.codec.binary else self.websocket.send_text
+        try:
+            while not self.closed:
+                await self._wakeup.wait()
+                if self.codec.batched and self.manager.batch_interval:
+                    await asyncio.sleep(self.manager.batch_interval)
+                self._wakeup.clear()
+                while self.pending and not self.closed:
+                    if self.codec.batched:
+                        events = list(self.pending.values())
+                        self.pending.clear()
+                    else:
+                        events = [self.pending.popitem(last=False)[1]]
+                    for frame in self.codec.frames(events):
+                        await asyncio.wait_for(send(frame), timeout=self.manager.send_timeout)
+                        self.manager.frames_sent += 1
+                    self.manager.messages_sent += len(events)
+                    self.last_sent = time.monotonic()
+        except asyncio.CancelledError:
+            pass
+        except asyncio.TimeoutError:
+            self.manager.evict(self, "send timed out")
+        except Exception:
+            self.manager.evict(self, "send failed")
+
+    def stop(self):
+        """Stop the sender task and discard queued messages."""
+        self.closed = True
+        self.pending.clear()
+        if self._sender is not None and self._sender is not asyncio.current_task():
+            self._sender.cancel()
+
+    async def close(self):
+        """Stop the sender and close the socket."""
+        self.stop()
+        try:
+            await self.websocket.close()
+        except Exception:
+            pass
+
+
+class ConnectionManager:
+    """Tracks connected clients and fans messages out through their queues."""
+
+    def __init__(
+        self,
+        queue_size: int = settings.WS_QUEUE_SIZE,
+        policy: str = settings.WS_SLOW_CONSUMER_POLICY,
+        send_timeout: float = settings.WS_SEND_TIMEOUT_SECONDS,
+        max_dropped: int = settings.WS_MAX_DROPPED,
+        batch_interval: float = settings.WS_BATCH_INTERVAL_MS / 1000,
+        heartbeat_interval: float = settings.WS_HEARTBEAT_SECONDS
+    ):
+        self.queue_size = queue_size
+        self.policy = policy
+        self.send_timeout = send_timeout
+        self.max_dropped = max_dropped
+        self.batch_interval = batch_interval
+        self.heartbeat_interval = heartbeat_interval
+        self.active_connections: Set[ClientConnection] = set()
+        self.sequence = itertools.count()
+        self._closing: Set[asyncio.Task] = set()
+        self._heartbeat: Optional[asyncio.Task] = None
+
+        # Metrics
+        self.messages_sent = 0
+        self.frames_sent = 0
+        self.heartbeats = 0
+        self.dropped = 0
+        self.coalesced = 0
+        self.evictions = 0
+
+    async def connect(self, websocket: WebSocket) -> ClientConnection:
+        """Accept a socket, choosing its wire format from the offered subprotocols."""
+        codec = negotiate(getattr(websocket, "scope", {}).get("subprotocols", []))
+        await websocket.accept(subprotocol=codec.subprotocol)
+        client = ClientConnection(websocket, self, codec)
+        self.active_connections.add(client)
+        client.start()
+        return client
+
+    def disconnect(self, client: ClientConnection):
+        self.active_connections.discard(client)
+        client.stop()
+
+    def evict(self, client: ClientConnection, reason: str):
+        """Drop a slow or broken client without affecting the others."""
+        if client not in self.active_connections:
+            return
+        self.active_connections.discard(client)
+        self.evictions += 1
+        print(f"⚠️  Evicted WebSocket client: {reason}")
+        task = asyncio.create_task(client.close())
+        self._closing.add(task)
+        task.add_done_callback(self._closing.discard)
+
+    def start_heartbeat(self):
+        """Start the shared heartbeat timer (application startup)."""
+        if self.heartbeat_interval and self._heartbeat is None:
+            self._heartbeat = asyncio.create_task(self._heartbeat_loop())
+
+    async def _heartbeat_loop(self):
+        """
+        Every interval, queue one heartbeat for each client idle that long.
+
+        The heartbeat is encoded once per tick and shares a coalescing key,
+        so a client never has more than one queued.
+        """
+        while True:
+            await asyncio.sleep(self.heartbeat_interval)
+            idle_since = time.monotonic() - self.heartbeat_interval
+            heartbeat = None
+            for client in list(self.active_connections):
+                if client.last_sent <= idle_since and not client.pending:
+                    heartbeat = heartbeat or Event.from_payload({"type": "heartbeat", "ts": time.time()})
+                    if client.enqueue(heartbeat, key="heartbeat"):
+                        self.heartbeats += 1
+
+    async def close_all(self):
+        """Close every connection (application shutdown)."""
+        if self._heartbeat is not None:
+            self._heartbeat.cancel()
+            self._heartbeat = None
+        clients = list(self.active_connections)
+        self.active_connections.clear()
+        await asyncio.gather(*(client.close() for client in clients))
+        await asyncio.gather(*self._closing)
+
+    async def broadcast(self, message: Message, key: Optional[str] = None):
+        """Queue a message for every client; never waits on a socket."""
+        message = as_event(message)
+        for client in list(self.active_connections):
+            client.enqueue(message, key)
+
+    def publish(self, message: Message, department: str, risk_level: str, key: Optional[str] = None):
+        """Queue an already-serialized event for every subscribed client."""
+        message = as_event(message)
+        for client in list(self.active_connections):
+            if client.wants(department, risk_level):
+                client.deliver(message, key)
+
+    def stats(self) -> dict:
+        """Connection and queue metrics."""
+        depths = [len(client.pending) for client in self.active_connections]
+        formats = {}
+        for client in self.active_connections:
+            name = client.codec.subprotocol or "json"
+            formats[name] = formats.get(name, 0) + 1
+        return {
+            "connections": len(depths),
+            "formats": formats,
+            "queue_depth_total": sum(depths),
+            "queue_depth_max": max(depths, default=0),
+            "messages_sent": self.messages_sent,
+            "frames_sent": self.frames_sent,
+            "heartbeats": self.heartbeats,
+            "dropped": self.dropped,
+            "coalesced": self.coalesced,
+            "evictions": self.evictions,
+        }
+
+
+manager = ConnectionManager()
+
+QUEUE_KEY_PREFIX = "queue:"
+
+
+def _deliver(message: str, department: str, risk_level: str, key: Optional[str]):
+    """Apply queue changes to this worker's queue, then fan out to its clients."""
+    if key is not None and key.startswith(QUEUE_KEY_PREFIX):
+        patient_queue.apply(json.loads(message))
+    manager.publish(message, department, risk_level, key)
+
+
+class QueueResync:
+    """Reloads this worker's queue from the database after a lost queue change."""
+
+    def __init__(self, session_factory: async_sessionmaker = AsyncSessionLocal):
+        self.session_factory = session_factory
+        self.task: Optional[asyncio.Task] = None
+        self.pending = False
+        self.rebuilds = 0
+
+    def request(self):
+        """Schedule a rebuild; gaps seen while one is running trigger one more."""
+        if self.task is not None and not self.task.done():
+            self.pending = True
+            return
+        self.task = asyncio.get_running_loop().create_task(self._run())
+
+    async def _run(self):
+        while True:
+            self.pending = False
+            try:
+                async with self.session_factory() as session:
+                    waiting = await patient_queue.rebuild(session)
+                self.rebuilds += 1
+                print(f"🔄 Broadcast gap detected; live queue reloaded ({waiting} waiting)")
+            except Exception as e:
+                print(f"⚠️  Live queue reload failed: {e}")
+            if not self.pending:
+                return
+
+
+queue_resync = QueueResync()
+
+broadcaster = create_backend(
+    settings.BROADCAST_BACKEND,
+    deliver=_deliver,
+    has_local_clients=lambda: bool(manager.active_connections),
+    socket_dir=settings.BROADCAST_SOCKET_DIR,
+    on_gap=queue_resync.request,
+    peer_refresh=settings.BROADCAST_PEER_REFRESH_SECONDS
+)
+
+
+def patient_event_key(patient_id: str) -> str:
+    """Coalescing key for events about one patient."""
+    return f"patient:{patient_id}"
+
+
+def serialize_patient(record) -> dict:
+    """Compact JSON-ready patient summary (no explanation or SHAP data)."""
+    return PatientSummary.model_validate(record).model_dump(mode="json")
+
+
+def publish_triage_event(record: Patient):
+    """
+    Push a newly triaged patient to subscribed clients.
+
+    The event is serialized once and the same string is queued for every
+    matching client, in this worker and in its peers.
+    """
+    if not broadcaster.has_subscribers():
+        return
+    message = json.dumps({"type": "triage", "patient": serialize_patient(record)})
+    broadcaster.publish(message, record.department, record.risk_level, patient_event_key(record.id))
+
+
+def publish_queue_change(op: str, entry: dict):
+    """
+    Apply a queue change in every worker and notify subscribed clients.
+
+    Changes always go through the broadcaster, even with no clients
+    connected, since that is also how each worker's queue is kept current.
+
+    Args:
+        op: "admit", "update" or "discharge"
+        entry: Queue entry (see app.services.queue_service.queue_entry)
+    """
+    message = json.dumps({"type": "queue", "op": op, "patient": entry})
+    broadcaster.publish(message, entry["department"], entry["risk_level"], f"{QUEUE_KEY_PREFIX}{entry['id']}")
+
+
+async def load_snapshot(session: AsyncSession, subscription: Subscription, limit: int) -> List[dict]:
+    """Most recent patients matching a subscription, newest first."""
+    query = select(*PATIENT_SUMMARY_COLUMNS)
+    if subscription.risk_levels:
+        query = query.where(Patient.risk_level.in_(subscription.risk_levels))
+    if subscription.departments:
+        department = Patient.department
+        query = query.where(or_(*(
+            condition
+            for name in subscription.departments
+            for condition in (
+                department.ilike(name),
+                department.ilike(f"{name} / %"),
+                department.ilike(f"% / {name}"),
+                department.ilike(f"% / {name} / %"),
+            )
+        )))
+    query = query.order_by(Patient.created_at.desc(), Patient.id.desc()).limit(limit)
+    rows = (await session.execute(query)).all()
+    return [serialize_patient(row) for row in rows]
+
+
+async def subscribe(client: ClientConnection, request: SubscribeRequest, session_factory: async_sessionmaker):
+    """
+    Apply a subscription and send the initial snapshot.
+
+    Events published while the snapshot is loading are held and sent after
+    it, minus any patients the snapshot already contains.
+    """
+    client.subscription = Subscription(request.departments, request.risk_levels)
+    limit = request.snapshot_limit if request.snapshot_limit is not None else settings.WS_SNAPSHOT_LIMIT
+
+    client.hold()
+    try:
+        async with session_factory() as session:
+            patients = await load_snapshot(session, client.subscription, limit)
+    except Exception:
+        client.release()
+        raise
+
+    client.enqueue(json.dumps({"type": "snapshot", "patients": patients}))
+    client.release({patient_event_key(p["id"]) for p in patients})
+
+
+async def handle_client_message(
+    client: ClientConnection,
+    data: Union[str, bytes],
+    session_factory: async_sessionmaker
+):
+    """
+    Process one message received from a client.
+
+    Failures are reported to the client as an error message; the
+    connection stays open.
+    """
+    try:
+        payload = client.codec.decode(data)
+        if not isinstance(payload, dict) or payload.get("action") != "subscribe":
+            raise ValueError("Unsupported message. Expected {\"action\": \"subscribe\", ...}")
+        await subscribe(client, SubscribeRequest(**payload), session_factory)
+    except (ValueError, ValidationError) as e:
+        client.enqueue(json.dumps({"type": "error", "detail": str(e)}))
+    except Exception as e:
+        print(f"⚠️  WebSocket subscribe failed: {e!r}")
+        client.enqueue(json.dumps({"type": "error", "detail": "Subscription failed. Try again."}))
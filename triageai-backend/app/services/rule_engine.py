@@ -142,3 +142,47 @@ def evaluate_rules(patient: PatientInput) -> RuleResult:
     
     # No rules triggered
     return RuleResult(triggered=False)
+
+
+def assign_department(risk_level: str, symptoms: list, rule_name: str = None) -> str:
+    """
+    Assign appropriate department based on risk and symptoms.
+    
+    Args:
+        risk_level: HIGH, MEDIUM, or LOW
+        symptoms: List of patient symptoms
+        rule_name: Clinical rule name if triggered
+        
+    Returns:
+        Department name
+    """
+    # If rule already assigned department, use it
+    if rule_name:
+        # Rule engine already provides department in most cases
+        return "Emergency"  # Fallback
+    
+    symptoms_lower = [s.lower() for s in symptoms]
+    
+    # High risk general emergency
+    if risk_level == "HIGH":
+        if any("chest" in s or "heart" in s for s in symptoms_lower):
+            return "Cardiology / Emergency"
+        elif any("breath" in s for s in symptoms_lower):
+            return "Respiratory / Emergency"
+        elif any("head" in s or "confusion" in s for s in symptoms_lower):
+            return "Neurology / Emergency"
+        else:
+            return "Emergency"
+    
+    # Medium risk specialized departments
+    elif risk_level == "MEDIUM":
+        if any("abdominal" in s or "stomach" in s for s in symptoms_lower):
+            return "Gastroenterology"
+        elif any("cough" in s or "fever" in s for s in symptoms_lower):
+            return "Internal Medicine"
+        else:
+            return "General Medicine"
+    
+    # Low risk outpatient
+    else:
+        return "Outpatient / General Practice"
@@ -0,0 +1,191 @@
+"""Incrementally maintained triage statistics.
+
+Counters in ``triage_counters`` are incremented in the same transaction as
+each Patient insert, so they always agree with the ``patients`` table.
+An in-memory mirror serves ``/api/stats`` without touching the database;
+it is refreshed from the counters table every few seconds so that inserts
+committed by other worker processes show up too.
+
+Reconcile the counters and trend rollups with the patients table:
+    python -m app.services.stats_service rebuild
+"""
+import argparse
+import asyncio
+import time
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import select, delete, func
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.config import settings
+from app.database import AsyncSessionLocal, init_db, upsert_insert
+from app.models.patient import Patient
+from app.models.stats import TriageCounter
+from app.schemas.stats import StatsResponse
+from app.services.trends_service import rebuild_rollups
+
+TOTAL = "total"
+RISK_LEVEL = "risk_level"
+DEPARTMENT = "department"
+
+
+def count_records(records: List[Patient]) -> Counter:
+    """
+    Tally counter increments for a batch of new patients.
+
+    Returns:
+        Counter keyed by (dimension, key)
+    """
+    deltas = Counter()
+    for record in records:
+        deltas[(TOTAL, TOTAL)] += 1
+        deltas[(RISK_LEVEL, record.risk_level)] += 1
+        deltas[(DEPARTMENT, record.department)] += 1
+    return deltas
+
+
+async def increment_counters(session: AsyncSession, deltas: Counter) -> None:
+    """
+    Add deltas to the counters table inside the caller's transaction.
+
+    Args:
+        session: Session holding the Patient insert transaction
+        deltas: Counter keyed by (dimension, key)
+    """
+    if not deltas:
+        return
+    stmt = upsert_insert(session, TriageCounter).values([
+        {"dimension": dimension, "key": key, "count": count}
+        for (dimension, key), count in deltas.items()
+    ])
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[TriageCounter.dimension, TriageCounter.key],
+        set_={"count": TriageCounter.count + stmt.excluded.count}
+    )
+    await session.execute(stmt)
+
+
+async def read_counters(session: AsyncSession) -> Dict[Tuple[str, str], int]:
+    """Read the counters table (a handful of rows, independent of patient count)."""
+    result = await session.execute(
+        select(TriageCounter.dimension, TriageCounter.key, TriageCounter.count)
+    )
+    return {(dimension, key): count for dimension, key, count in result.all()}
+
+
+async def rebuild_counters(session: AsyncSession) -> Dict[Tuple[str, str], int]:
+    """
+    Recompute all counters from the patients table.
+
+    This is the only full-table aggregation left; run it after restoring a
+    backup or upgrading a database created before counters existed.
+
+    Returns:
+        Rebuilt counters keyed by (dimension, key)
+    """
+    deltas = Counter()
+
+    total = (await session.execute(select(func.count(Patient.id)))).scalar() or 0
+    if total:
+        deltas[(TOTAL, TOTAL)] = total
+
+    for column, dimension in ((Patient.risk_level, RISK_LEVEL), (Patient.department, DEPARTMENT)):
+        result = await session.execute(select(column, func.count(Patient.id)).group_by(column))
+        for key, count in result.all():
+            deltas[(dimension, key)] = count
+
+    await session.execute(delete(TriageCounter))
+    await increment_counters(session, deltas)
+    await session.commit()
+    return dict(deltas)
+
+
+def build_stats_response(counters: Dict[Tuple[str, str], int]) -> StatsResponse:
+    """Shape raw counters into the /api/stats response."""
+    risk_distribution = {"HIGH": 0, "MEDIUM": 0, "LOW": 0}
+    department_load = {}
+
+    for (dimension, key), count in counters.items():
+        if dimension == RISK_LEVEL:
+            risk_distribution[key] = count
+        elif dimension == DEPARTMENT:
+            department_load[key] = count
+
+    return StatsResponse(
+        total_patients=counters.get((TOTAL, TOTAL), 0),
+        risk_distribution=risk_distribution,
+        department_load=department_load
+    )
+
+
+class TriageStats:
+    """In-memory mirror of the counters table."""
+
+    def __init__(self, refresh_seconds: float = settings.STATS_REFRESH_SECONDS):
+        """Initialize mirror (enabled on application startup)."""
+        self.refresh_seconds = refresh_seconds
+        self.enabled = False
+        self._counters: Dict[Tuple[str, str], int] = {}
+        self._loaded_at: Optional[float] = None
+
+    async def start(self, session: AsyncSession):
+        """Load the mirror, rebuilding counters if the table predates them."""
+        counters = await read_counters(session)
+        if not counters:
+            has_patients = (await session.execute(select(Patient.id).limit(1))).first()
+            if has_patients:
+                print("⚠️  Statistics counters missing, rebuilding from patients table...")
+                counters = await rebuild_counters(session)
+        self._set(counters)
+        self.enabled = True
+
+    def apply(self, deltas: Counter):
+        """Add committed deltas to the mirror."""
+        if not self.enabled:
+            return
+        for key, count in deltas.items():
+            self._counters[key] = self._counters.get(key, 0) + count
+
+    async def snapshot(self, session: AsyncSession) -> StatsResponse:
+        """
+        Current statistics.
+
+        Served from memory while fresh; otherwise (or when the mirror is
+        disabled) re-read from the counters table.
+        """
+        if not self.enabled:
+            return build_stats_response(await read_counters(session))
+
+        if time.monotonic() - self._loaded_at > self.refresh_seconds:
+            self._set(await read_counters(session))
+
+        return build_stats_response(self._counters)
+
+    def _set(self, counters: Dict[Tuple[str, str], int]):
+        self._counters = dict(counters)
+        self._loaded_at = time.monotonic()
+
+
+# Global statistics mirror
+triage_stats = TriageStats()
+
+
+async def _rebuild():
+    await init_db()
+    async with AsyncSessionLocal() as session:
+        counters = await rebuild_counters(session)
+        await rebuild_rollups(session)
+    stats = build_stats_response(counters)
+    print(f"✅ Rebuilt statistics counters and rollups: {stats.total_patients} patients")
+    print(f"   Risk: {stats.risk_distribution}")
+    print(f"   Departments: {stats.department_load}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Maintain triage statistics counters.")
+    parser.add_argument("command", choices=["rebuild"], help="rebuild: recompute counters and rollups from patients")
+    parser.parse_args()
+    asyncio.run(_rebuild())
+
+
+if __name__ == "__main__":
+    main()
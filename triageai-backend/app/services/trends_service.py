@@ -0,0 +1,259 @@
+"""Time-bucketed triage rollups for trend charts.
+
+Per-minute and per-hour counts are upserted into ``triage_rollups`` in the
+same transaction as each Patient insert. Trend queries read only the
+rollups, so a week of hourly data is at most a few thousand small rows no
+matter how many patients were triaged.
+"""
+import asyncio
+import contextlib
+import re
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import select, delete
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from app.config import settings
+from app.database import AsyncSessionLocal, upsert_insert
+from app.models.patient import Patient
+from app.models.stats import TriageRollup
+from app.schemas.stats import TrendPoint, TrendsResponse
+
+MINUTE = "minute"
+HOUR = "hour"
+DAY = "day"
+
+BUCKET_SIZES = {
+    MINUTE: timedelta(minutes=1),
+    HOUR: timedelta(hours=1),
+    DAY: timedelta(days=1),
+}
+
+WINDOW_UNITS = {"m": "minutes", "h": "hours", "d": "days"}
+MAX_WINDOW = timedelta(days=3650)
+
+
+def truncate(timestamp: datetime, bucket: str) -> datetime:
+    """Round a timestamp down to the start of its bucket."""
+    if bucket == MINUTE:
+        return timestamp.replace(second=0, microsecond=0)
+    if bucket == HOUR:
+        return timestamp.replace(minute=0, second=0, microsecond=0)
+    return timestamp.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def parse_window(window: str) -> timedelta:
+    """
+    Parse a window like "90m", "24h" or "7d".
+
+    Raises:
+        ValueError if the window is malformed
+    """
+    match = re.fullmatch(r"(\d+)([mhd])", window.strip().lower())
+    if not match or int(match.group(1)) == 0:
+        raise ValueError("Invalid window. Use a number followed by m, h or d (e.g. 24h, 7d)")
+    try:
+        span = timedelta(**{WINDOW_UNITS[match.group(2)]: int(match.group(1))})
+    except OverflowError:
+        span = None
+    if span is None or span > MAX_WINDOW:
+        raise ValueError(f"Invalid window. Maximum is {MAX_WINDOW.days}d")
+    return span
+
+
+def count_rollups(rows: List[Tuple[datetime, str, str, str]]) -> Counter:
+    """
+    Tally rollup increments.
+
+    Args:
+        rows: (created_at, risk_level, department, rule_triggered) tuples
+
+    Returns:
+        Counter keyed by (bucket, bucket_start, dimension, key)
+    """
+    deltas = Counter()
+    for created_at, risk_level, department, rule_triggered in rows:
+        for bucket in (MINUTE, HOUR):
+            start = truncate(created_at, bucket)
+            deltas[(bucket, start, "total", "total")] += 1
+            deltas[(bucket, start, "risk_level", risk_level)] += 1
+            deltas[(bucket, start, "department", department)] += 1
+            if rule_triggered:
+                deltas[(bucket, start, "rule_triggered", rule_triggered)] += 1
+    return deltas
+
+
+def count_record_rollups(records: List[Patient]) -> Counter:
+    """Tally rollup increments for a batch of new patients."""
+    return count_rollups([
+        (r.created_at, r.risk_level, r.department, r.rule_triggered) for r in records
+    ])
+
+
+async def increment_rollups(session: AsyncSession, deltas: Counter) -> None:
+    """
+    Add deltas to the rollup table inside the caller's transaction.
+
+    Args:
+        session: Session holding the Patient insert transaction
+        deltas: Counter keyed by (bucket, bucket_start, dimension, key)
+    """
+    if not deltas:
+        return
+    stmt = upsert_insert(session, TriageRollup).values([
+        {"bucket": bucket, "bucket_start": start, "dimension": dimension, "key": key, "count": count}
+        for (bucket, start, dimension, key), count in deltas.items()
+    ])
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[
+            TriageRollup.bucket, TriageRollup.bucket_start,
+            TriageRollup.dimension, TriageRollup.key
+        ],
+        set_={"count": TriageRollup.count + stmt.excluded.count}
+    )
+    await session.execute(stmt)
+
+
+async def prune_minute_rollups(session: AsyncSession, now: datetime = None) -> None:
+    """Delete minute buckets older than ROLLUP_MINUTE_RETENTION_HOURS."""
+    now = now or datetime.utcnow()
+    cutoff = now - timedelta(hours=settings.ROLLUP_MINUTE_RETENTION_HOURS)
+    await session.execute(
+        delete(TriageRollup)
+        .where(TriageRollup.bucket == MINUTE)
+        .where(TriageRollup.bucket_start < cutoff)
+    )
+    await session.commit()
+
+
+class MinuteRollupPruner:
+    """Deletes expired minute buckets every ROLLUP_PRUNE_INTERVAL_MINUTES while the server runs."""
+
+    def __init__(self, session_factory: async_sessionmaker = AsyncSessionLocal, interval: Optional[float] = None):
+        self.session_factory = session_factory
+        self.interval = interval or settings.ROLLUP_PRUNE_INTERVAL_MINUTES * 60
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._prune_loop())
+
+    async def stop(self):
+        """Cancel the loop and wait for it, so a prune in progress is rolled back before shutdown."""
+        task, self._task = self._task, None
+        if task is not None:
+            task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await task
+
+    async def _prune_loop(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                async with self.session_factory() as session:
+                    await prune_minute_rollups(session)
+            except Exception as e:
+                print(f"⚠️  Pruning minute rollups failed: {e}")
+
+
+# Global pruner (started in the application lifespan)
+rollup_pruner = MinuteRollupPruner()
+
+
+async def rebuild_rollups(session: AsyncSession, chunk_size: int = 5000) -> int:
+    """
+    Recompute all rollups from the patients table.
+
+    Streams patients in chunks so memory stays flat on large tables.
+
+    Returns:
+        Number of patients processed
+    """
+    await session.execute(delete(TriageRollup))
+
+    processed = 0
+    result = await session.stream(
+        select(Patient.created_at, Patient.risk_level, Patient.department, Patient.rule_triggered)
+        .execution_options(yield_per=chunk_size)
+    )
+    async for rows in result.partitions():
+        rows = [row for row in rows if row.created_at is not None]
+        await increment_rollups(session, count_rollups(rows))
+        processed += len(rows)
+
+    await session.commit()
+    await prune_minute_rollups(session)
+    return processed
+
+
+async def get_trends(
+    session: AsyncSession,
+    window: str,
+    bucket: str,
+    now: datetime = None
+) -> TrendsResponse:
+    """
+    Build a gap-free time series from the rollup table.
+
+    Day buckets are aggregated from hourly rollups.
+
+    Args:
+        session: Database session
+        window: Lookback window, e.g. "24h" or "7d"
+        bucket: "minute", "hour" or "day"
+        now: End of the window (defaults to the current UTC time)
+
+    Raises:
+        ValueError for an unknown bucket or out-of-range window
+    """
+    if bucket not in BUCKET_SIZES:
+        raise ValueError("Invalid bucket. Must be minute, hour, or day")
+
+    span = parse_window(window)
+    if bucket == MINUTE and span > timedelta(hours=settings.ROLLUP_MINUTE_RETENTION_HOURS):
+        raise ValueError(
+            f"Minute buckets are kept for {settings.ROLLUP_MINUTE_RETENTION_HOURS}h; "
+            f"use bucket=hour for longer windows"
+        )
+
+    now = now or datetime.utcnow()
+    step = BUCKET_SIZES[bucket]
+    first = truncate(now - span, bucket) + step
+    last = truncate(now, bucket)
+    if (last - first) / step > settings.TRENDS_MAX_POINTS:
+        raise ValueError(f"Window too large for {bucket} buckets (max {settings.TRENDS_MAX_POINTS} points)")
+
+    source = MINUTE if bucket == MINUTE else HOUR
+    result = await session.execute(
+        select(TriageRollup.bucket_start, TriageRollup.dimension, TriageRollup.key, TriageRollup.count)
+        .where(TriageRollup.bucket == source)
+        .where(TriageRollup.bucket_start >= first)
+        .where(TriageRollup.bucket_start <= now)
+    )
+
+    points: Dict[datetime, TrendPoint] = {}
+    start = first
+    while start <= last:
+        points[start] = TrendPoint(
+            bucket_start=start,
+            total=0,
+            risk_distribution={"HIGH": 0, "MEDIUM": 0, "LOW": 0},
+            department_load={},
+            rules_triggered={}
+        )
+        start += step
+
+    for bucket_start, dimension, key, count in result.all():
+        point = points.get(truncate(bucket_start, bucket))
+        if point is None:
+            continue
+        if dimension == "total":
+            point.total += count
+        elif dimension == "risk_level":
+            point.risk_distribution[key] = point.risk_distribution.get(key, 0) + count
+        elif dimension == "department":
+            point.department_load[key] = point.department_load.get(key, 0) + count
+        elif dimension == "rule_triggered":
+            point.rules_triggered[key] = point.rules_triggered.get(key, 0) + count
+
+    return TrendsResponse(window=window, bucket=bucket, points=list(points.values()))
@@ -1,55 +1,17 @@
 """Main triage orchestration service."""
+import uuid
 from datetime import datetime
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.schemas.patient import PatientInput, TriageOutput, RiskLevelEnum
 from app.models.patient import Patient
-from app.services.rule_engine import evaluate_rules
+from app.services.rule_engine import assign_department, evaluate_rules
 from app.services.ml_service import ml_service
 from app.services.gemini_service import gemini_service
-
-
-def assign_department(risk_level: str, symptoms: list, rule_name: str = None) -> str:
-    """
-    Assign appropriate department based on risk and symptoms.
-    
-    Args:
-        risk_level: HIGH, MEDIUM, or LOW
-        symptoms: List of patient symptoms
-        rule_name: Clinical rule name if triggered
-        
-    Returns:
-        Department name
-    """
-    # If rule already assigned department, use it
-    if rule_name:
-        # Rule engine already provides department in most cases
-        return "Emergency"  # Fallback
-    
-    symptoms_lower = [s.lower() for s in symptoms]
-    
-    # High risk general emergency
-    if risk_level == "HIGH":
-        if any("chest" in s or "heart" in s for s in symptoms_lower):
-            return "Cardiology / Emergency"
-        elif any("breath" in s for s in symptoms_lower):
-            return "Respiratory / Emergency"
-        elif any("head" in s or "confusion" in s for s in symptoms_lower):
-            return "Neurology / Emergency"
-        else:
-            return "Emergency"
-    
-    # Medium risk specialized departments
-    elif risk_level == "MEDIUM":
-        if any("abdominal" in s or "stomach" in s for s in symptoms_lower):
-            return "Gastroenterology"
-        elif any("cough" in s or "fever" in s for s in symptoms_lower):
-            return "Internal Medicine"
-        else:
-            return "General Medicine"
-    
-    # Low risk outpatient
-    else:
-        return "Outpatient / General Practice"
+from app.services.persistence import patient_writer, persist_patients
+from app.services.realtime import publish_triage_event, publish_queue_change
+from app.services.queue_service import queue_entry
+from app.utils.feature_engineering import symptom_mask, condition_mask
+from app.utils.metrics import time_stage
 
 
 async def run_full_triage(
@@ -65,6 +27,7 @@ async def run_full_triage(
     3. Department assignment
     4. Gemini explanation generation
     5. Database persistence
+    6. Live event to subscribed WebSocket clients and admission to the waiting queue
     
     Args:
         patient_input: Validated patient data
@@ -74,7 +37,8 @@ async def run_full_triage(
         Complete triage output
     """
     # Step 1: Check clinical rules
-    rule_result = evaluate_rules(patient_input)
+    with time_stage("triage", "rules"):
+        rule_result = evaluate_rules(patient_input)
     
     if rule_result.triggered:
         # Rule overrides ML prediction
@@ -92,16 +56,19 @@ async def run_full_triage(
         department = assign_department(risk_level, patient_input.symptoms)
     
     # Step 4: Generate explanation
-    explanation = await gemini_service.generate_explanation(
-        patient=patient_input,
-        risk_level=risk_level,
-        department=department,
-        top_factors=top_factors,
-        rule_triggered=rule_name
-    )
+    with time_stage("triage", "gemini"):
+        explanation = await gemini_service.generate_explanation(
+            patient=patient_input,
+            risk_level=risk_level,
+            department=department,
+            top_factors=top_factors,
+            rule_triggered=rule_name
+        )
     
-    # Step 5: Save to database
+    # Step 5: Save to database (ID and timestamp assigned here so no refresh is needed)
     patient_record = Patient(
+        id=str(uuid.uuid4()),
+        created_at=datetime.utcnow(),
         age=patient_input.age,
         gender=patient_input.gender.value,
         bp_systolic=patient_input.bp_systolic,
@@ -111,6 +78,8 @@ async def run_full_triage(
         spo2=patient_input.spo2,
         symptoms=patient_input.symptoms,
         pre_existing=patient_input.pre_existing,
+        symptom_mask=symptom_mask(patient_input.symptoms),
+        condition_mask=condition_mask(patient_input.pre_existing),
         risk_level=risk_level,
         confidence=confidence,
         department=department,
@@ -119,9 +88,16 @@ async def run_full_triage(
         explanation=explanation
     )
     
-    db.add(patient_record)
-    await db.commit()
-    await db.refresh(patient_record)
+    with time_stage("triage", "commit"):
+        if patient_writer.is_running():
+            await patient_writer.submit(patient_record)
+        else:
+            await persist_patients(db, [patient_record])
+    
+    # Step 6: Push to live dashboards and admit to the waiting queue
+    with time_stage("triage", "publish"):
+        publish_triage_event(patient_record)
+        publish_queue_change("admit", queue_entry(patient_record))
     
     # Build output
     return TriageOutput(
@@ -132,5 +108,5 @@ async def run_full_triage(
         rule_triggered=rule_name,
         top_factors=top_factors,
         explanation=explanation,
-        triage_timestamp=patient_record.created_at or datetime.utcnow()
+        triage_timestamp=patient_record.created_at
     )
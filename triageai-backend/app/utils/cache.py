@@ -0,0 +1,83 @@
+"""Bounded in-memory caches."""
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional
+
+
+class TTLCache:
+    """
+    LRU cache with a size bound and per-entry expiry.
+    
+    Lookups and inserts are O(1). Expired entries are dropped when read;
+    the least recently used entry is evicted when the cache is full.
+    """
+    
+    def __init__(self, max_size: int, ttl: Optional[float] = None, clock: Callable[[], float] = time.monotonic):
+        """
+        Initialize cache.
+        
+        Args:
+            max_size: Maximum number of entries
+            ttl: Default seconds an entry lives (None = until evicted)
+            clock: Time source that expiry times are measured against
+        """
+        self.max_size = max_size
+        self.ttl = ttl
+        self.clock = clock
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        
+        # Metrics
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+    
+    def __len__(self) -> int:
+        return len(self._data)
+    
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Cached value, or None if missing or expired."""
+        item = self._data.get(key)
+        if item is None:
+            self.misses += 1
+            return None
+        value, expires_at = item
+        if expires_at is not None and expires_at <= self.clock():
+            del self._data[key]
+            self.misses += 1
+            return None
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+    
+    def set(self, key: Hashable, value: Any, expires_at: Optional[float] = None):
+        """
+        Store a value.
+        
+        Args:
+            key: Cache key
+            value: Value to store
+            expires_at: Absolute expiry on the cache's clock (default: now + ttl)
+        """
+        if expires_at is None and self.ttl is not None:
+            expires_at = self.clock() + self.ttl
+        self._data[key] = (value, expires_at)
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_size:
+            self._data.popitem(last=False)
+            self.evictions += 1
+    
+    def pop(self, key: Hashable):
+        """Remove an entry if present."""
+        self._data.pop(key, None)
+    
+    def clear(self):
+        self._data.clear()
+    
+    def stats(self) -> dict:
+        return {
+            "size": len(self._data),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
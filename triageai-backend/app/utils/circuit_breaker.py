@@ -0,0 +1,84 @@
+"""Consecutive-failure circuit breaker for calls to external services."""
+import time
+from typing import Callable
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """
+    Stops calling a failing dependency until it has had time to recover.
+
+    After `failure_threshold` consecutive failures the circuit opens and
+    allow() refuses calls for `reset_timeout` seconds. Then one trial call
+    is let through (half-open): success closes the circuit, failure opens
+    it for another `reset_timeout`.
+
+    Usage:
+        if not breaker.allow():
+            return fallback()
+        try:
+            result = await call()
+        except Exception:
+            breaker.record_failure()
+            raise
+        breaker.record_success()
+    """
+
+    def __init__(self, failure_threshold: int, reset_timeout: float, clock: Callable[[], float] = time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.clock = clock
+        self.failures = 0
+        self.opened_at = None
+        self.trial_started_at = None
+        self.rejected = 0
+        self.opens = 0
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return CLOSED
+        if self.clock() - self.opened_at >= self.reset_timeout:
+            return HALF_OPEN
+        return OPEN
+
+    @property
+    def trial_running(self) -> bool:
+        # A trial whose outcome was never recorded (cancelled call) expires
+        return self.trial_started_at is not None and self.clock() - self.trial_started_at < self.reset_timeout
+
+    def allow(self) -> bool:
+        """Whether a call may go ahead now (at most one at a time while half-open)."""
+        state = self.state
+        if state == CLOSED:
+            return True
+        if state == HALF_OPEN and not self.trial_running:
+            self.trial_started_at = self.clock()
+            return True
+        self.rejected += 1
+        return False
+
+    def record_success(self):
+        self.failures = 0
+        self.opened_at = None
+        self.trial_started_at = None
+
+    def record_failure(self):
+        self.failures += 1
+        trial = self.trial_started_at is not None
+        if trial or self.failures >= self.failure_threshold:
+            if self.opened_at is None or trial:
+                self.opens += 1
+            self.opened_at = self.clock()
+        self.trial_started_at = None
+
+    def stats(self) -> dict:
+        return {
+            "state": self.state,
+            "consecutive_failures": self.failures,
+            "opens": self.opens,
+            "rejected": self.rejected,
+        }
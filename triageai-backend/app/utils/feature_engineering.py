@@ -1,4 +1,5 @@
 """Feature engineering utilities for ML model."""
+import numpy as np
 import pandas as pd
 from typing import Dict, List
 from app.schemas.patient import PatientInput
@@ -15,37 +16,52 @@ def build_features(patient: PatientInput) -> pd.DataFrame:
     Returns:
         DataFrame with single row containing all engineered features
     """
+    return build_feature_frame([patient])
+
+
+def build_feature_frame(patients: List[PatientInput]) -> pd.DataFrame:
+    """
+    Transform many patients into feature rows at once (batch scoring).
+    
+    Produces the same columns and values as build_features, one row per
+    patient, with each column built as a single array.
+    
+    Args:
+        patients: Validated patient input data
+        
+    Returns:
+        DataFrame with one row per patient
+    """
     features = {}
     
     # Demographics
-    features["age"] = patient.age
-    features["gender_M"] = 1 if patient.gender.value == "M" else 0
-    features["gender_F"] = 1 if patient.gender.value == "F" else 0
-    features["gender_Other"] = 1 if patient.gender.value == "Other" else 0
+    genders = np.array([p.gender.value for p in patients])
+    features["age"] = np.array([p.age for p in patients], dtype=np.int64)
+    features["gender_M"] = (genders == "M").astype(np.int64)
+    features["gender_F"] = (genders == "F").astype(np.int64)
+    features["gender_Other"] = (genders == "Other").astype(np.int64)
     
     # Vital signs (use mean values if missing)
-    features["bp_systolic"] = patient.bp_systolic if patient.bp_systolic else 120
-    features["bp_diastolic"] = patient.bp_diastolic if patient.bp_diastolic else 80
-    features["heart_rate"] = patient.heart_rate if patient.heart_rate else 75
-    features["temperature"] = patient.temperature if patient.temperature else 37.0
-    features["spo2"] = patient.spo2 if patient.spo2 else 98.0
-    
-    # One-hot encode symptoms
-    patient_symptoms = [s.lower().replace(" ", "_") for s in patient.symptoms]
-    for symptom in settings.SYMPTOM_FEATURES:
-        features[f"symptom_{symptom}"] = 1 if symptom in patient_symptoms else 0
-    
-    # One-hot encode pre-existing conditions
-    patient_conditions = [c.lower().replace(" ", "_") for c in patient.pre_existing]
-    for condition in settings.CONDITION_FEATURES:
-        features[f"condition_{condition}"] = 1 if condition in patient_conditions else 0
+    features["bp_systolic"] = np.array([p.bp_systolic if p.bp_systolic else 120 for p in patients], dtype=np.int64)
+    features["bp_diastolic"] = np.array([p.bp_diastolic if p.bp_diastolic else 80 for p in patients], dtype=np.int64)
+    features["heart_rate"] = np.array([p.heart_rate if p.heart_rate else 75 for p in patients], dtype=np.int64)
+    features["temperature"] = np.array([p.temperature if p.temperature else 37.0 for p in patients], dtype=np.float64)
+    features["spo2"] = np.array([p.spo2 if p.spo2 else 98.0 for p in patients], dtype=np.float64)
+    
+    # One-hot encode symptoms and pre-existing conditions from their bitmasks
+    symptoms = np.array([symptom_mask(p.symptoms) for p in patients], dtype=np.int64)
+    for bit, symptom in enumerate(settings.SYMPTOM_FEATURES):
+        features[f"symptom_{symptom}"] = (symptoms >> bit) & 1
+    
+    conditions = np.array([condition_mask(p.pre_existing) for p in patients], dtype=np.int64)
+    for bit, condition in enumerate(settings.CONDITION_FEATURES):
+        features[f"condition_{condition}"] = (conditions >> bit) & 1
     
     # Derived features
-    features["symptom_count"] = len(patient.symptoms)
-    features["condition_count"] = len(patient.pre_existing)
+    features["symptom_count"] = np.array([len(p.symptoms) for p in patients], dtype=np.int64)
+    features["condition_count"] = np.array([len(p.pre_existing) for p in patients], dtype=np.int64)
     
-    # Create DataFrame
-    return pd.DataFrame([features])
+    return pd.DataFrame(features)
 
 
 def get_feature_names() -> List[str]:
@@ -73,3 +89,35 @@ def get_feature_names() -> List[str]:
     features.extend(["symptom_count", "condition_count"])
     
     return features
+
+
+def encode_mask(values: List[str], vocabulary: List[str]) -> int:
+    """
+    Encode values as a bitmask over a fixed vocabulary.
+    
+    Bit i is set when vocabulary[i] is present. Values are normalized the
+    same way as in build_features; values outside the vocabulary are ignored.
+    
+    Args:
+        values: Symptom or condition names
+        vocabulary: Ordered canonical names (e.g. settings.SYMPTOM_FEATURES)
+        
+    Returns:
+        Integer bitmask
+    """
+    normalized = {v.lower().replace(" ", "_") for v in values}
+    mask = 0
+    for bit, name in enumerate(vocabulary):
+        if name in normalized:
+            mask |= 1 << bit
+    return mask
+
+
+def symptom_mask(symptoms: List[str]) -> int:
+    """Bitmask of canonical symptoms (bit order follows settings.SYMPTOM_FEATURES)."""
+    return encode_mask(symptoms, settings.SYMPTOM_FEATURES)
+
+
+def condition_mask(conditions: List[str]) -> int:
+    """Bitmask of canonical conditions (bit order follows settings.CONDITION_FEATURES)."""
+    return encode_mask(conditions, settings.CONDITION_FEATURES)
@@ -0,0 +1,160 @@
+"""Low-overhead metrics in Prometheus text format.
+
+Stage timings are recorded into fixed-bucket histograms: an observation is
+one bisect and three in-place additions, with no locks or allocations
+beyond the timer object. Point-in-time values (queue depths, cache
+counters, connection counts) are not recorded on the hot path at all;
+collectors registered with the registry read them when /metrics is
+scraped.
+
+Metrics are per process. With several uvicorn workers, Prometheus scrapes
+whichever worker answers; run one scrape target per worker (or a single
+worker) when exact totals matter.
+"""
+import time
+from bisect import bisect_left
+from typing import Callable, Dict, Iterable, List, Sequence, Tuple
+
+# 0.5 ms to 10 s: covers in-process stages (rules, features) through Gemini calls
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+Labels = Dict[str, str]
+# (name, type, help, [(labels, value)]) as returned by collectors
+Family = Tuple[str, str, str, List[Tuple[Labels, float]]]
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels: Labels) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels.items()) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Timer:
+    """Context manager that observes its elapsed seconds."""
+
+    __slots__ = ("child", "start")
+
+    def __init__(self, child: "HistogramChild"):
+        self.child = child
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.child.observe(time.perf_counter() - self.start)
+        return False
+
+
+class HistogramChild:
+    """One labelled series of a histogram."""
+
+    __slots__ = ("bounds", "counts", "sum", "count")
+
+    def __init__(self, bounds: Sequence[float]):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)  # Last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def time(self) -> _Timer:
+        return _Timer(self)
+
+
+class Histogram:
+    """Histogram family with fixed buckets and label values given positionally."""
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._children: Dict[Tuple[str, ...], HistogramChild] = {}
+
+    def labels(self, *values: str) -> HistogramChild:
+        child = self._children.get(values)
+        if child is None:
+            if len(values) != len(self.labelnames):
+                raise ValueError(f"{self.name} expects labels {self.labelnames}")
+            child = self._children[values] = HistogramChild(self.buckets)
+        return child
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for values, child in sorted(self._children.items()):
+            labels = dict(zip(self.labelnames, values))
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), child.counts):
+                cumulative += count
+                lines.append(f"{self.name}_bucket{_format_labels({**labels, 'le': _format_value(bound)})} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(labels)} {_format_value(child.sum)}")
+            lines.append(f"{self.name}_count{_format_labels(labels)} {child.count}")
+        return lines
+
+
+def render_family(family: Family) -> List[str]:
+    name, kind, help, samples = family
+    lines = [f"# HELP {name} {help}", f"# TYPE {name} {kind}"]
+    lines.extend(f"{name}{_format_labels(labels)} {_format_value(value)}" for labels, value in samples)
+    return lines
+
+
+class Registry:
+    """Histograms recorded in-process plus collectors read at scrape time."""
+
+    def __init__(self):
+        self._histograms: List[Histogram] = []
+        self._collectors: List[Callable[[], Iterable[Family]]] = []
+
+    def histogram(self, name: str, help: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        histogram = Histogram(name, help, labelnames, buckets)
+        self._histograms.append(histogram)
+        return histogram
+
+    def add_collector(self, collector: Callable[[], Iterable[Family]]):
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        """All metrics in Prometheus text exposition format (version 0.0.4)."""
+        lines: List[str] = []
+        for histogram in self._histograms:
+            lines.extend(histogram.render())
+        for collector in self._collectors:
+            for family in collector():
+                lines.extend(render_family(family))
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+STAGE_SECONDS = registry.histogram(
+    "triageai_stage_duration_seconds",
+    "Time spent in each stage of a request pipeline.",
+    ("pipeline", "stage"),
+)
+
+
+def time_stage(pipeline: str, stage: str) -> _Timer:
+    """
+    Time a block into the stage histogram.
+
+    Usage:
+        with time_stage("triage", "rules"):
+            rule_result = evaluate_rules(patient_input)
+    """
+    return STAGE_SECONDS.labels(pipeline, stage).time()
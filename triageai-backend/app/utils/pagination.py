@@ -0,0 +1,65 @@
+"""Keyset pagination helpers."""
+import base64
+from datetime import datetime
+from typing import Optional, Tuple
+from sqlalchemy import tuple_
+from sqlalchemy.sql import Select
+from app.models.patient import Patient
+
+
+def encode_cursor(created_at: datetime, patient_id: str) -> str:
+    """
+    Encode a (created_at, id) position as an opaque cursor string.
+
+    Args:
+        created_at: Triage timestamp of the last row returned
+        patient_id: ID of the last row returned
+
+    Returns:
+        URL-safe cursor
+    """
+    raw = f"{created_at.isoformat()}|{patient_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, str]:
+    """
+    Decode a cursor produced by encode_cursor.
+
+    Raises:
+        ValueError if the cursor is malformed
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        raw = base64.urlsafe_b64decode(padded.encode()).decode()
+        timestamp, patient_id = raw.split("|", 1)
+        return datetime.fromisoformat(timestamp), patient_id
+    except Exception:
+        raise ValueError("Invalid cursor")
+
+
+def apply_keyset(query: Select, cursor: Optional[str], descending: bool = True) -> Select:
+    """
+    Order a Patient query by (created_at, id) and start after the cursor.
+
+    The row-value comparison lets SQLite seek straight into the
+    (created_at, id) index, so every page costs the same regardless of
+    how deep into the table it is.
+
+    Args:
+        query: Select over Patient columns
+        cursor: Cursor from the previous page, or None for the first page
+        descending: Newest first when True, oldest first otherwise
+
+    Returns:
+        Ordered (and filtered) query
+    """
+    key = tuple_(Patient.created_at, Patient.id)
+
+    if cursor:
+        position = tuple_(*decode_cursor(cursor))
+        query = query.where(key < position if descending else key > position)
+
+    if descending:
+        return query.order_by(Patient.created_at.desc(), Patient.id.desc())
+    return query.order_by(Patient.created_at.asc(), Patient.id.asc())
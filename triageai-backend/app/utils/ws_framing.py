@@ -0,0 +1,139 @@
+"""WebSocket wire formats for the live triage stream.
+
+Clients pick a format with the WebSocket subprotocol header:
+
+- no subprotocol: one JSON text frame per event (original format)
+- ``triage.json``: JSON text frames holding an array of events
+- ``triage.msgpack``: MessagePack binary frames holding an array of events
+  (requires ``pip install msgpack`` on the server)
+
+Batched formats collect the events queued during one tick into a single
+frame. Compression is negotiated separately by the server (uvicorn enables
+permessage-deflate for clients that offer it).
+
+Each event is encoded at most once per format; batch frames are built by
+joining already-encoded events rather than re-encoding them. Messages from
+the client (subscribe requests) may arrive as JSON in text or binary
+frames, or as MessagePack binary frames on ``triage.msgpack``.
+"""
+import json
+import struct
+from typing import List, Optional, Sequence, Union
+
+try:
+    import msgpack
+except ImportError:  # MessagePack framing is optional
+    msgpack = None
+
+JSON_SUBPROTOCOL = "triage.json"
+MSGPACK_SUBPROTOCOL = "triage.msgpack"
+
+
+def msgpack_available() -> bool:
+    """Check if msgpack is installed."""
+    return msgpack is not None
+
+
+class Event:
+    """One outbound message with per-format encodings cached."""
+
+    __slots__ = ("text", "_packed")
+
+    def __init__(self, text: str):
+        self.text = text
+        self._packed: Optional[bytes] = None
+
+    @classmethod
+    def from_payload(cls, payload: dict) -> "Event":
+        return cls(json.dumps(payload))
+
+    def packed(self) -> bytes:
+        """MessagePack encoding (computed on first use)."""
+        if self._packed is None:
+            self._packed = msgpack.packb(json.loads(self.text))
+        return self._packed
+
+
+Message = Union[str, Event]
+
+
+def as_event(message: Message) -> Event:
+    return message if isinstance(message, Event) else Event(message)
+
+
+def _msgpack_array_header(length: int) -> bytes:
+    if length < 16:
+        return bytes([0x90 | length])
+    if length < 1 << 16:
+        return b"\xdc" + struct.pack(">H", length)
+    return b"\xdd" + struct.pack(">I", length)
+
+
+class Codec:
+    """Original format: one JSON text frame per event."""
+
+    subprotocol: Optional[str] = None
+    batched = False
+    binary = False
+
+    def frames(self, events: Sequence[Event]) -> List[Union[str, bytes]]:
+        return [event.text for event in events]
+
+    def decode(self, frame: Union[str, bytes]):
+        """
+        Parse a frame received from the client.
+
+        Raises:
+            ValueError if the frame is not valid JSON
+        """
+        return json.loads(frame)
+
+
+class JsonBatchCodec(Codec):
+    """JSON array of events per text frame."""
+
+    subprotocol = JSON_SUBPROTOCOL
+    batched = True
+
+    def frames(self, events: Sequence[Event]) -> List[Union[str, bytes]]:
+        return ["[" + ",".join(event.text for event in events) + "]"]
+
+
+class MsgpackBatchCodec(Codec):
+    """MessagePack array of events per binary frame."""
+
+    subprotocol = MSGPACK_SUBPROTOCOL
+    batched = True
+    binary = True
+
+    def frames(self, events: Sequence[Event]) -> List[Union[str, bytes]]:
+        return [_msgpack_array_header(len(events)) + b"".join(event.packed() for event in events)]
+
+    def decode(self, frame: Union[str, bytes]):
+        """Parse a MessagePack binary frame (text frames are read as JSON)."""
+        if isinstance(frame, str):
+            return json.loads(frame)
+        try:
+            return msgpack.unpackb(frame, raw=False)
+        except Exception as e:
+            raise ValueError(f"Invalid MessagePack frame: {e}")
+
+
+DEFAULT_CODEC = Codec()
+JSON_BATCH_CODEC = JsonBatchCodec()
+MSGPACK_BATCH_CODEC = MsgpackBatchCodec()
+
+
+def negotiate(offered: Sequence[str]) -> Codec:
+    """
+    Choose a codec from the client's offered subprotocols, in the client's order.
+
+    Unknown subprotocols (and msgpack when it is not installed) are skipped;
+    with no match the original one-event-per-frame JSON format is used.
+    """
+    for subprotocol in offered:
+        if subprotocol == MSGPACK_SUBPROTOCOL and msgpack_available():
+            return MSGPACK_BATCH_CODEC
+        if subprotocol == JSON_SUBPROTOCOL:
+            return JSON_BATCH_CODEC
+    return DEFAULT_CODEC
@@ -0,0 +1,146 @@
+"""Concurrent read/write benchmark: SQLite defaults vs the tuning profile.
+
+Simulates a busy ward: several writers insert triage records (one commit
+each, like run_full_triage) while dashboard readers run the /api/stats
+aggregations. Each engine gets its own temporary database file.
+
+Usage:
+    python -m benchmarks.db_concurrency --writers 8 --readers 4 --seconds 5
+"""
+import argparse
+import asyncio
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
+
+from app.database import Base, build_engine
+from app.models.patient import Patient
+
+
+def _make_patient(i: int) -> Patient:
+    """Build a representative triage record."""
+    return Patient(
+        age=20 + i % 70,
+        gender="M" if i % 2 else "F",
+        bp_systolic=120,
+        bp_diastolic=80,
+        heart_rate=75,
+        temperature=37.0,
+        spo2=98.0,
+        symptoms=["headache", "fever"],
+        pre_existing=["diabetes"],
+        risk_level=("LOW", "MEDIUM", "HIGH")[i % 3],
+        confidence=0.9,
+        department="General Medicine",
+        explanation="Benchmark record " * 8,
+    )
+
+
+async def _writer(sessionmaker, deadline, latencies, errors, offset):
+    i = offset
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        try:
+            async with sessionmaker() as session:
+                session.add(_make_patient(i))
+                await session.commit()
+            latencies.append(time.perf_counter() - start)
+        except Exception as e:
+            errors.append(str(e))
+        i += 1
+
+
+async def _reader(sessionmaker, deadline, latencies, errors):
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        try:
+            async with sessionmaker() as session:
+                await session.execute(select(func.count(Patient.id)))
+                await session.execute(
+                    select(Patient.risk_level, func.count(Patient.id)).group_by(Patient.risk_level)
+                )
+            latencies.append(time.perf_counter() - start)
+        except Exception as e:
+            errors.append(str(e))
+
+
+def _summarize(latencies):
+    if not latencies:
+        return {"ops": 0, "p50_ms": 0.0, "p95_ms": 0.0, "p99_ms": 0.0}
+    arr = np.array(latencies) * 1000
+    return {
+        "ops": len(latencies),
+        "p50_ms": float(np.percentile(arr, 50)),
+        "p95_ms": float(np.percentile(arr, 95)),
+        "p99_ms": float(np.percentile(arr, 99)),
+    }
+
+
+async def run_scenario(engine, writers: int, readers: int, seconds: float) -> dict:
+    """Run concurrent writers and readers against one engine."""
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    sessionmaker = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    write_latencies, read_latencies, errors = [], [], []
+    deadline = time.perf_counter() + seconds
+
+    tasks = [
+        _writer(sessionmaker, deadline, write_latencies, errors, w * 1_000_000)
+        for w in range(writers)
+    ]
+    tasks += [_reader(sessionmaker, deadline, read_latencies, errors) for _ in range(readers)]
+    await asyncio.gather(*tasks)
+    await engine.dispose()
+
+    return {
+        "writes": _summarize(write_latencies),
+        "reads": _summarize(read_latencies),
+        "errors": len(errors),
+        "locked_errors": sum("locked" in e for e in errors),
+    }
+
+
+async def main_async(args):
+    """Benchmark both configurations and print a comparison."""
+    with tempfile.TemporaryDirectory() as tmp:
+        default_url = f"sqlite+aiosqlite:///{Path(tmp) / 'default.db'}"
+        tuned_url = f"sqlite+aiosqlite:///{Path(tmp) / 'tuned.db'}"
+
+        results = {
+            "default": await run_scenario(
+                create_async_engine(default_url), args.writers, args.readers, args.seconds
+            ),
+            "tuned": await run_scenario(
+                build_engine(tuned_url), args.writers, args.readers, args.seconds
+            ),
+        }
+
+    print(f"\n📊 {args.writers} writers / {args.readers} readers for {args.seconds:.0f}s")
+    print(f"{'profile':<10}{'writes/s':>10}{'w p95 ms':>10}{'reads/s':>10}{'r p95 ms':>10}{'locked':>8}")
+    for name, r in results.items():
+        print(
+            f"{name:<10}"
+            f"{r['writes']['ops'] / args.seconds:>10.1f}"
+            f"{r['writes']['p95_ms']:>10.2f}"
+            f"{r['reads']['ops'] / args.seconds:>10.1f}"
+            f"{r['reads']['p95_ms']:>10.2f}"
+            f"{r['locked_errors']:>8}"
+        )
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--writers", type=int, default=8)
+    parser.add_argument("--readers", type=int, default=4)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
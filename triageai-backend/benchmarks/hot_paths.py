@@ -0,0 +1,340 @@
+"""Microbenchmarks for the triage hot paths, with baseline comparison.
+
+Times each hot path in-process at several batch sizes: rule evaluation,
+feature building, ML prediction (per patient with SHAP, and batched), Quick
+Fix prediction, department assignment and the database insert. A "call"
+handles batch_size patients: one loop over the per-patient function, or
+one call of the batch API where there is one. The database insert commits
+batch_size records in one transaction, as the group-commit writer does.
+
+Everything runs offline. ML cases use the models in MODEL_DIR, Quick Fix
+uses QUICKFIX_MODEL_PATH, and cases whose model is missing are skipped. The
+database case writes to a temporary SQLite file.
+
+Results are saved as JSON. With --baseline, each case's p50 (or --metric)
+is compared with the baseline. The command exits with status 1 if any case
+is slower by more than --threshold (fraction; per-case overrides with
+--case-threshold NAME=FRACTION).
+
+Usage:
+    python -m benchmarks.hot_paths --output bench.json --save-baseline benchmarks/baseline.json
+    python -m benchmarks.hot_paths --baseline benchmarks/baseline.json --threshold 0.25
+    python -m benchmarks.hot_paths --cases evaluate_rules,build_features --batch-sizes 1,64
+"""
+import argparse
+import asyncio
+import json
+import platform
+import random
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+import sklearn
+import xgboost
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.config import settings
+from app.database import Base, build_engine
+from app.models.patient import Patient
+from app.models.stats import TriageCounter, TriageRollup  # Register tables
+from app.schemas.patient import GenderEnum, PatientInput
+from app.services.ml_service import ml_service
+from app.services.persistence import persist_patients
+from app.services.quickfix_service import quickfix_service
+from app.services.rule_engine import assign_department, evaluate_rules
+from app.utils.feature_engineering import build_feature_frame, build_features, condition_mask, symptom_mask
+
+BATCH_SIZES = (1, 16, 128)
+METRICS = ("mean_ms", "p50_ms", "p90_ms", "p99_ms")
+SYMPTOMS = [s.replace("_", " ") for s in settings.SYMPTOM_FEATURES] + ["sore throat", "back pain"]
+CONDITIONS = [c.replace("_", " ") for c in settings.CONDITION_FEATURES]
+
+
+def make_patients(count: int, seed: int = 0) -> List[PatientInput]:
+    """Deterministic mix of patients; roughly half trigger a clinical rule."""
+    rng = random.Random(seed)
+    return [
+        PatientInput(
+            age=rng.randint(18, 90),
+            gender=rng.choice(list(GenderEnum)),
+            symptoms=rng.sample(SYMPTOMS, rng.randint(1, 4)),
+            bp_systolic=rng.randint(95, 190),
+            bp_diastolic=rng.randint(60, 115),
+            heart_rate=rng.randint(55, 125),
+            temperature=round(rng.uniform(36.2, 40.2), 1),
+            spo2=round(rng.uniform(88.0, 100.0), 1),
+            pre_existing=rng.sample(CONDITIONS, rng.randint(0, 2)),
+        )
+        for _ in range(count)
+    ]
+
+
+def make_record(patient: PatientInput) -> Patient:
+    """The Patient row run_full_triage would persist for this input."""
+    return Patient(
+        id=str(uuid.uuid4()),
+        created_at=datetime.utcnow(),
+        age=patient.age,
+        gender=patient.gender.value,
+        bp_systolic=patient.bp_systolic,
+        bp_diastolic=patient.bp_diastolic,
+        heart_rate=patient.heart_rate,
+        temperature=patient.temperature,
+        spo2=patient.spo2,
+        symptoms=patient.symptoms,
+        pre_existing=patient.pre_existing,
+        symptom_mask=symptom_mask(patient.symptoms),
+        condition_mask=condition_mask(patient.pre_existing),
+        risk_level="MEDIUM",
+        confidence=0.8,
+        department="General Medicine",
+        explanation="Benchmark record " * 8,
+    )
+
+
+class Case:
+    """One benchmarked hot path."""
+
+    def __init__(
+        self,
+        name: str,
+        build: Callable[[List[PatientInput]], Callable[[], object]],
+        max_batch_size: Optional[int] = None,
+        available: Callable[[], bool] = lambda: True
+    ):
+        """
+        Args:
+            name: Case name used in results and thresholds
+            build: Returns the timed callable for a batch of patients
+            max_batch_size: Skip larger batch sizes (for slow paths)
+            available: Whether the case can run (e.g. its model is loaded)
+        """
+        self.name = name
+        self.build = build
+        self.max_batch_size = max_batch_size
+        self.available = available
+
+
+class DatabaseFixture:
+    """Temporary SQLite database with the production schema and tuning."""
+
+    def __init__(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.loop = asyncio.new_event_loop()
+        self.engine = build_engine(f"sqlite+aiosqlite:///{Path(self.tmp.name) / 'bench.db'}")
+        self.factory = async_sessionmaker(self.engine, class_=AsyncSession, expire_on_commit=False)
+        self.loop.run_until_complete(self._create())
+
+    async def _create(self):
+        async with self.engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+
+    async def _insert(self, patients: List[PatientInput]):
+        async with self.factory() as session:
+            await persist_patients(session, [make_record(p) for p in patients])
+
+    def insert(self, patients: List[PatientInput]):
+        self.loop.run_until_complete(self._insert(patients))
+
+    def close(self):
+        self.loop.run_until_complete(self.engine.dispose())
+        self.loop.close()
+        self.tmp.cleanup()
+
+
+def build_cases(db: DatabaseFixture) -> List[Case]:
+    def loop_over(fn):
+        return lambda batch: lambda: [fn(p) for p in batch]
+
+    def departments(batch):
+        pairs = [(("HIGH", "MEDIUM", "LOW")[i % 3], p.symptoms) for i, p in enumerate(batch)]
+        return lambda: [assign_department(risk, symptoms) for risk, symptoms in pairs]
+
+    def quick_fix(batch):
+        symptoms = quickfix_service.symptoms
+        requests = [(symptoms[i % len(symptoms):i % len(symptoms) + 3], "None") for i in range(len(batch))]
+        return lambda: [quickfix_service.predict(s, history) for s, history in requests]
+
+    return [
+        Case("evaluate_rules", loop_over(evaluate_rules)),
+        Case("build_features", loop_over(build_features)),
+        Case("build_feature_frame", lambda batch: lambda: build_feature_frame(batch)),
+        Case("assign_department", departments),
+        Case("predict_with_shap", loop_over(lambda p: ml_service.predict_with_shap(p)),
+             max_batch_size=1, available=ml_service.is_loaded),
+        Case("predict_batch", lambda batch: lambda: ml_service.predict_batch(build_feature_frame(batch)),
+             available=ml_service.is_loaded),
+        Case("quick_fix_predict", quick_fix, available=quickfix_service.is_loaded),
+        Case("db_insert", lambda batch: lambda: db.insert(batch)),
+    ]
+
+
+def measure(fn: Callable[[], object], batch_size: int, min_calls: int, max_calls: int,
+            max_seconds: float, warmup: int) -> dict:
+    """Call fn repeatedly; summarize per-call latency and items per second."""
+    for _ in range(warmup):
+        fn()
+    timings = []
+    start = time.perf_counter()
+    while len(timings) < max_calls and (len(timings) < min_calls or time.perf_counter() - start < max_seconds):
+        call_start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - call_start)
+
+    ms = np.array(timings) * 1000
+    return {
+        "batch_size": batch_size,
+        "calls": len(timings),
+        "mean_ms": float(ms.mean()),
+        "p50_ms": float(np.percentile(ms, 50)),
+        "p90_ms": float(np.percentile(ms, 90)),
+        "p99_ms": float(np.percentile(ms, 99)),
+        "max_ms": float(ms.max()),
+        "throughput_per_s": float(batch_size * len(ms) / (ms.sum() / 1000)),
+    }
+
+
+def run_suite(args) -> dict:
+    """Run the selected cases; returns the JSON-ready results document."""
+    ml_service.load_models()
+    quickfix_service.load_models()
+
+    db = DatabaseFixture()
+    results, skipped = {}, []
+    try:
+        cases = build_cases(db)
+        if args.cases:
+            wanted = set(args.cases.split(","))
+            cases = [case for case in cases if case.name in wanted]
+        for case in cases:
+            if not case.available():
+                skipped.append(case.name)
+                print(f"⏭️  {case.name}: skipped (model not loaded)")
+                continue
+            for batch_size in args.batch_sizes:
+                if case.max_batch_size and batch_size > case.max_batch_size:
+                    continue
+                batch = make_patients(batch_size, seed=batch_size)
+                result = measure(case.build(batch), batch_size, args.min_calls, args.max_calls,
+                                 args.seconds, args.warmup)
+                key = f"{case.name}@{batch_size}"
+                results[key] = result
+                print(f"⏱️  {key:<26} p50 {result['p50_ms']:9.3f} ms  p99 {result['p99_ms']:9.3f} ms  "
+                      f"{result['throughput_per_s']:12.1f}/s  ({result['calls']} calls)")
+    finally:
+        db.close()
+
+    return {
+        "meta": {
+            "created_at": datetime.utcnow().isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "xgboost": xgboost.__version__,
+            "sklearn": sklearn.__version__,
+            "model_file": settings.ML_MODEL_FILE,
+        },
+        "skipped": skipped,
+        "results": results,
+    }
+
+
+def threshold_for(key: str, threshold: float, overrides: Dict[str, float]) -> float:
+    """Per-case override by exact key ("case@batch") or case name, else the default."""
+    if key in overrides:
+        return overrides[key]
+    return overrides.get(key.split("@", 1)[0], threshold)
+
+
+def compare(current: dict, baseline: dict, metric: str = "p50_ms", threshold: float = 0.2,
+            overrides: Optional[Dict[str, float]] = None) -> List[dict]:
+    """
+    Compare results documents case by case.
+
+    Returns:
+        One row per case with baseline and current values, the relative
+        change and a status: "regressed", "improved", "ok", "new" or "missing"
+    """
+    overrides = overrides or {}
+    rows = []
+    current_results, baseline_results = current["results"], baseline["results"]
+    for key in sorted(set(current_results) | set(baseline_results)):
+        row = {"case": key, "baseline": None, "current": None, "change": None, "status": "ok"}
+        if key not in baseline_results:
+            row.update(current=current_results[key][metric], status="new")
+        elif key not in current_results:
+            row.update(baseline=baseline_results[key][metric], status="missing")
+        else:
+            before, after = baseline_results[key][metric], current_results[key][metric]
+            change = (after - before) / before if before else 0.0
+            limit = threshold_for(key, threshold, overrides)
+            row.update(baseline=before, current=after, change=change, threshold=limit)
+            if change > limit:
+                row["status"] = "regressed"
+            elif change < -limit:
+                row["status"] = "improved"
+        rows.append(row)
+    return rows
+
+
+def format_comparison(rows: List[dict], metric: str) -> str:
+    icons = {"regressed": "❌", "improved": "🚀", "ok": "✅", "new": "🆕", "missing": "⚠️ "}
+    lines = [f"\n📊 {metric} vs baseline"]
+    for row in rows:
+        before = f"{row['baseline']:.3f}" if row["baseline"] is not None else "-"
+        after = f"{row['current']:.3f}" if row["current"] is not None else "-"
+        change = f"{row['change']:+.1%}" if row["change"] is not None else ""
+        lines.append(f"{icons[row['status']]} {row['case']:<26} {before:>10} → {after:>10} ms  {change}")
+    return "\n".join(lines)
+
+
+def _parse_override(value: str):
+    name, _, fraction = value.partition("=")
+    if not name or not fraction:
+        raise argparse.ArgumentTypeError("expected NAME=FRACTION, e.g. db_insert=0.5")
+    return name, float(fraction)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cases", help="Comma-separated case names (default: all)")
+    parser.add_argument("--batch-sizes", type=lambda s: [int(x) for x in s.split(",")], default=list(BATCH_SIZES))
+    parser.add_argument("--seconds", type=float, default=1.0, help="Time budget per case and batch size")
+    parser.add_argument("--min-calls", type=int, default=5, help="Calls per case even past --seconds")
+    parser.add_argument("--max-calls", type=int, default=10000)
+    parser.add_argument("--warmup", type=int, default=3)
+    parser.add_argument("--output", "-o", help="Write results JSON here")
+    parser.add_argument("--baseline", help="Baseline results JSON to compare against")
+    parser.add_argument("--save-baseline", help="Also write results to this baseline path")
+    parser.add_argument("--metric", choices=METRICS, default="p50_ms")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Allowed slowdown as a fraction (0.2 = 20%%)")
+    parser.add_argument("--case-threshold", type=_parse_override, action="append", default=[],
+                        help="Per-case threshold NAME=FRACTION (NAME is case or case@batch); repeatable")
+    args = parser.parse_args()
+
+    document = run_suite(args)
+    for path in filter(None, (args.output, args.save_baseline)):
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "w") as f:
+            json.dump(document, f, indent=2)
+        print(f"💾 Results saved to {path}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        rows = compare(document, baseline, args.metric, args.threshold, dict(args.case_threshold))
+        print(format_comparison(rows, args.metric))
+        regressed = [row["case"] for row in rows if row["status"] == "regressed"]
+        if regressed:
+            print(f"\n❌ {len(regressed)} regression(s): {', '.join(regressed)}")
+            sys.exit(1)
+        print("\n✅ No regressions")
+
+
+if __name__ == "__main__":
+    main()
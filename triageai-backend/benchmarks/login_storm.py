@@ -0,0 +1,144 @@
+"""Login-storm benchmark: triage latency while many staff log in at once.
+
+Runs a burst of concurrent /auth/login requests against the app in-process
+and measures /api/triage latency alongside, once with bcrypt run inline on
+the event loop (the old behaviour) and once on the password-hash executor.
+Each mode gets its own temporary database file. The rate limiter is turned
+off: the storm deliberately exceeds the login and triage budgets.
+
+Usage:
+    python -m benchmarks.login_storm --logins 40 --concurrency 20
+"""
+import argparse
+import asyncio
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+import app.api.auth as auth_api
+from app.config import settings
+from app.database import Base, build_engine, get_db, get_session_factory
+from app.main import app
+from app.models.user import User
+from app.services.auth import PasswordHasher, pwd_context
+
+TRIAGE_PAYLOAD = {
+    "age": 67,
+    "gender": "M",
+    "symptoms": ["chest pain", "shortness of breath"],
+    "bp_systolic": 188,
+    "bp_diastolic": 112,
+    "heart_rate": 98,
+    "temperature": 37.8,
+    "spo2": 94.0,
+    "pre_existing": ["diabetes", "hypertension"],
+}
+
+
+async def _probe(client, stop, latencies, interval):
+    while not stop.is_set():
+        start = time.perf_counter()
+        response = await client.post("/api/triage", json=TRIAGE_PAYLOAD)
+        response.raise_for_status()
+        latencies.append(time.perf_counter() - start)
+        await asyncio.sleep(interval)
+
+
+async def _storm(client, logins, concurrency):
+    slots = asyncio.Semaphore(concurrency)
+    statuses = []
+
+    async def one(i):
+        async with slots:
+            response = await client.post(
+                "/auth/login", data={"username": f"staff{i}", "password": "shift-change"}
+            )
+            statuses.append(response.status_code)
+
+    await asyncio.gather(*(one(i) for i in range(logins)))
+    return statuses
+
+
+async def run_mode(mode, args, password_hash):
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = build_engine(f"sqlite+aiosqlite:///{Path(tmp) / 'storm.db'}")
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+        async with factory() as session:
+            session.add_all([
+                User(username=f"staff{i}", hashed_password=password_hash, role="MEDICAL_STAFF")
+                for i in range(args.logins)
+            ])
+            await session.commit()
+
+        async def override_get_db():
+            async with factory() as session:
+                yield session
+
+        # Rebuild the middleware stack so RateLimitMiddleware picks up the setting
+        settings.RATE_LIMIT_ENABLED = False
+        app.middleware_stack = None
+
+        hasher = PasswordHasher(workers=0 if mode == "inline" else args.workers, max_pending=args.logins)
+        auth_api.password_hasher = hasher
+        app.dependency_overrides[get_db] = override_get_db
+        app.dependency_overrides[get_session_factory] = lambda: factory
+        try:
+            async with AsyncClient(app=app, base_url="http://bench") as client:
+                baseline, during = [], []
+                stop = asyncio.Event()
+                probe = asyncio.create_task(_probe(client, stop, baseline, args.probe_interval))
+                await asyncio.sleep(1.0)
+                stop.set()
+                await probe
+
+                stop = asyncio.Event()
+                probe = asyncio.create_task(_probe(client, stop, during, args.probe_interval))
+                start = time.perf_counter()
+                statuses = await _storm(client, args.logins, args.concurrency)
+                storm_seconds = time.perf_counter() - start
+                stop.set()
+                await probe
+        finally:
+            app.dependency_overrides.clear()
+            hasher.shutdown()
+            await engine.dispose()
+
+    baseline_ms = np.array(baseline) * 1000
+    during_ms = np.array(during) * 1000
+    print(f"\n🔐 {mode}: {args.logins} logins in {storm_seconds:.2f}s "
+          f"({statuses.count(200)} ok, {len(statuses) - statuses.count(200)} failed)")
+    print(f"   triage p50/p99 idle:        {np.percentile(baseline_ms, 50):.1f} / {np.percentile(baseline_ms, 99):.1f} ms")
+    print(f"   triage p50/p99 during storm: {np.percentile(during_ms, 50):.1f} / {np.percentile(during_ms, 99):.1f} ms "
+          f"({len(during)} requests)")
+    return {
+        "storm_seconds": storm_seconds,
+        "triage_p50_ms": float(np.percentile(during_ms, 50)),
+        "triage_p99_ms": float(np.percentile(during_ms, 99)),
+        "triage_requests": len(during),
+    }
+
+
+async def run(args):
+    password_hash = pwd_context.hash("shift-change")
+    modes = ["inline", "executor"] if args.mode == "both" else [args.mode]
+    return {mode: await run_mode(mode, args, password_hash) for mode in modes}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--logins", type=int, default=40)
+    parser.add_argument("--concurrency", type=int, default=20, help="Logins in flight at once")
+    parser.add_argument("--workers", type=int, default=2, help="Password-hash threads in executor mode")
+    parser.add_argument("--probe-interval", type=float, default=0.01, help="Seconds between triage probes")
+    parser.add_argument("--mode", choices=["inline", "executor", "both"], default="both")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
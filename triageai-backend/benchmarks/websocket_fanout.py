@@ -0,0 +1,104 @@
+"""WebSocket fan-out load test with thousands of simulated sockets.
+
+Connects healthy, slow and stalled fake sockets to a ConnectionManager,
+publishes a burst of events and reports broadcast cost, delivery latency
+to healthy clients, and slow-consumer drops/evictions.
+
+Usage:
+    python -m benchmarks.websocket_fanout --clients 5000 --events 200
+"""
+import argparse
+import asyncio
+import random
+import time
+
+import numpy as np
+
+from app.services.realtime import ConnectionManager
+
+
+class SimulatedSocket:
+    """Fake socket with configurable per-send latency (None = stalled forever)."""
+
+    def __init__(self, delay):
+        self.delay = delay
+        self.latencies = []
+
+    async def accept(self, subprotocol=None):
+        pass
+
+    async def send_text(self, message):
+        if self.delay is None:
+            await asyncio.Event().wait()
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        sent_at = float(message.split("|", 1)[0])
+        self.latencies.append(time.perf_counter() - sent_at)
+
+    async def close(self):
+        pass
+
+
+async def run(args):
+    manager = ConnectionManager(
+        queue_size=args.queue_size,
+        policy=args.policy,
+        send_timeout=args.send_timeout
+    )
+
+    rng = random.Random(7)
+    sockets = {"healthy": [], "slow": [], "stalled": []}
+    for _ in range(args.clients):
+        roll = rng.random()
+        if roll < args.stalled_fraction:
+            kind, delay = "stalled", None
+        elif roll < args.stalled_fraction + args.slow_fraction:
+            kind, delay = "slow", 0.05
+        else:
+            kind, delay = "healthy", 0.0
+        ws = SimulatedSocket(delay)
+        sockets[kind].append(ws)
+        await manager.connect(ws)
+
+    broadcast_times = []
+    for i in range(args.events):
+        start = time.perf_counter()
+        await manager.broadcast(f"{start}|event-{i}", key=f"patient-{i % 50}")
+        broadcast_times.append(time.perf_counter() - start)
+        await asyncio.sleep(args.interval)
+
+    await asyncio.sleep(args.send_timeout + 0.5)
+
+    healthy_latencies = np.array([lat for ws in sockets["healthy"] for lat in ws.latencies]) * 1000
+    stats = manager.stats()
+    await manager.close_all()
+
+    print(f"\n📡 {args.clients} sockets "
+          f"({len(sockets['healthy'])} healthy, {len(sockets['slow'])} slow, {len(sockets['stalled'])} stalled), "
+          f"{args.events} events, policy={args.policy}")
+    print(f"   broadcast() p50/p99:       {np.percentile(broadcast_times, 50) * 1000:.2f} / "
+          f"{np.percentile(broadcast_times, 99) * 1000:.2f} ms")
+    if len(healthy_latencies):
+        print(f"   healthy delivery p50/p99:  {np.percentile(healthy_latencies, 50):.2f} / "
+              f"{np.percentile(healthy_latencies, 99):.2f} ms")
+    print(f"   messages sent:             {stats['messages_sent']}")
+    print(f"   dropped / coalesced:       {stats['dropped']} / {stats['coalesced']}")
+    print(f"   evictions:                 {stats['evictions']}")
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clients", type=int, default=5000)
+    parser.add_argument("--events", type=int, default=200)
+    parser.add_argument("--interval", type=float, default=0.005, help="Seconds between events")
+    parser.add_argument("--slow-fraction", type=float, default=0.05)
+    parser.add_argument("--stalled-fraction", type=float, default=0.01)
+    parser.add_argument("--queue-size", type=int, default=100)
+    parser.add_argument("--policy", choices=["drop_oldest", "evict"], default="drop_oldest")
+    parser.add_argument("--send-timeout", type=float, default=1.0)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
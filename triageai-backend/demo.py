@@ -1,7 +1,7 @@
 """Simplified demo to test the trained triage ML model."""
 import pickle
-import pandas as pd
 import numpy as np
+from ml.dataset import read_frame
 
 print("=" * 70)
 print("🏥 TriageAI Backend - ML Model Demo")
@@ -20,7 +20,7 @@ print(f"   Risk Classes: {encoder.classes_}")
 
 # Load test data to show predictions
 print("\n📊 Loading test dataset...")
-test_df = pd.read_csv("ml/data/test.csv")
+test_df = read_frame("ml/data", "test")
 print(f"✅ Loaded {len(test_df)} test samples")
 
 # Make predictions on sample patients
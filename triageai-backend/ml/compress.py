@@ -0,0 +1,282 @@
+"""Shrink the trained triage model to fit a per-prediction latency budget.
+
+Post-training step run after ml.train_model. Two kinds of smaller model
+are built from the saved model:
+
+- pruned: the first k boosting rounds of the trained ensemble
+- distilled: shallower students trained on the teacher's class
+  probabilities (each training row is repeated once per class and
+  weighted by the teacher's probability for that class)
+
+Every candidate, including the original model, is scored for size,
+single-row predict_proba latency, accuracy and HIGH-risk recall. Out of
+the candidates that keep validation HIGH recall at or above the floor
+and meet the latency budget, the most accurate one is saved. Ties go to
+the smaller model. A Pareto report (size, latency, accuracy) is written
+next to it. Point MLService at the result with ML_MODEL_FILE.
+
+Usage:
+    python -m ml.compress --latency-budget-ms 0.5 --recall-floor 0.95
+    ML_MODEL_FILE=xgb_model_compact.pkl uvicorn app.main:app
+"""
+import argparse
+import json
+import pickle
+from pathlib import Path
+from typing import List, Optional
+import numpy as np
+import xgboost as xgb
+from ml.dataset import iter_shards, read_split
+from ml.search import LATENCY_REPEATS, load_booster, measure_latency
+from ml.train_model import DATA_DIR, EARLY_STOPPING_ROUNDS, MODEL_DIR, PARAMS, booster_to_classifier, fit_booster, scale
+
+LATENCY_BUDGET_MS = 0.5
+RECALL_FLOOR = 0.95
+OUTPUT_FILE = "xgb_model_compact.pkl"
+PRUNE_FRACTIONS = (0.05, 0.1, 0.25, 0.5, 0.75)
+STUDENT_DEPTHS = (2, 3, 4)
+STUDENT_ROUNDS = (25, 50, 100)
+STUDENT_LEARNING_RATE = 0.3
+DISTILL_ROWS = 200_000
+
+
+def load_artifacts(model_dir=MODEL_DIR):
+    """Returns (model, scaler, encoder) as saved by ml.train_model."""
+    artifacts = []
+    for name in ("xgb_model.pkl", "scaler.pkl", "encoder.pkl"):
+        with open(Path(model_dir) / name, "rb") as f:
+            artifacts.append(pickle.load(f))
+    return tuple(artifacts)
+
+
+def load_scaled_split(split_dir, scaler, max_rows: Optional[int] = None):
+    """Read (and scale) a split, stopping after max_rows rows."""
+    feature_names = list(scaler.feature_names_in_)
+    if max_rows is None:
+        X, y = read_split(split_dir)
+        return scale(scaler, X, feature_names), y
+    parts, labels, taken = [], [], 0
+    for X, y in iter_shards(split_dir):
+        parts.append(scale(scaler, X[: max_rows - taken], feature_names))
+        labels.append(np.asarray(y[: max_rows - taken]))
+        taken += len(parts[-1])
+        if taken >= max_rows:
+            break
+    return np.concatenate(parts), np.concatenate(labels)
+
+
+def _node_depth(node: dict) -> int:
+    children = node.get("children")
+    return 1 + max(_node_depth(child) for child in children) if children else 0
+
+
+def tree_depth(booster: xgb.Booster) -> int:
+    """
+    Deepest tree in the ensemble, read from the trees themselves.
+
+    The training config (tree_train_param.max_depth) is not kept when a
+    booster is reloaded from a pickled model, so it cannot be trusted here.
+    """
+    return max((_node_depth(json.loads(tree)) for tree in booster.get_dump(dump_format="json")), default=0)
+
+
+def prune_rounds(total_rounds: int, fractions=PRUNE_FRACTIONS) -> List[int]:
+    """Round counts to keep for pruned candidates (shortest first)."""
+    return sorted({max(1, int(round(total_rounds * f))) for f in fractions} - {total_rounds})
+
+
+def distill(
+    teacher: xgb.Booster,
+    X_train: np.ndarray,
+    dval: xgb.DMatrix,
+    max_depth: int,
+    num_boost_round: int,
+    early_stopping_rounds: int = EARLY_STOPPING_ROUNDS
+) -> xgb.Booster:
+    """
+    Train a student on the teacher's soft labels.
+
+    Each row appears once per class, labelled with that class and weighted
+    by the teacher's probability for it, so the multi-class log loss the
+    student minimises is the cross-entropy against the teacher.
+    """
+    proba = teacher.predict(xgb.DMatrix(X_train))
+    n_rows, num_class = proba.shape
+    dtrain = xgb.DMatrix(
+        np.repeat(X_train, num_class, axis=0),
+        label=np.tile(np.arange(num_class), n_rows),
+        weight=proba.ravel()
+    )
+    params = {
+        **PARAMS,
+        "max_depth": max_depth,
+        "learning_rate": STUDENT_LEARNING_RATE,
+        "subsample": 1.0,
+        "num_class": num_class,
+    }
+    return fit_booster(params, dtrain, dval, num_boost_round, early_stopping_rounds)
+
+
+def score(booster: xgb.Booster, X: np.ndarray, y: np.ndarray, high_code: int) -> dict:
+    """Accuracy and HIGH-risk recall on one split."""
+    predicted = booster.predict(xgb.DMatrix(X)).argmax(axis=1)
+    high = y == high_code
+    return {
+        "accuracy": float((predicted == y).mean()),
+        "high_recall": float((predicted[high] == high_code).mean()) if high.any() else 1.0,
+    }
+
+
+def describe(name: str, booster: xgb.Booster, max_depth: int, splits: dict, latency_rows, high_code: int,
+             latency_repeats: int = LATENCY_REPEATS) -> dict:
+    """Measure one candidate."""
+    result = {
+        "name": name,
+        "rounds": booster.num_boosted_rounds(),
+        "max_depth": max_depth,
+        "size_kb": round(len(pickle.dumps(booster_to_classifier(booster))) / 1024, 1),
+        **measure_latency(booster, latency_rows, latency_repeats),
+        "model": bytes(booster.save_raw("json")),
+    }
+    for split, (X, y) in splits.items():
+        for metric, value in score(booster, X, y, high_code).items():
+            result[f"{split}_{metric}"] = round(value, 4)
+    return result
+
+
+def pareto_front(results: List[dict]) -> List[dict]:
+    """Candidates no other candidate beats on size, latency and accuracy at once."""
+    def dominates(a, b):
+        no_worse = (
+            a["size_kb"] <= b["size_kb"]
+            and a["latency_p50_ms"] <= b["latency_p50_ms"]
+            and a["val_accuracy"] >= b["val_accuracy"]
+        )
+        better = (
+            a["size_kb"] < b["size_kb"]
+            or a["latency_p50_ms"] < b["latency_p50_ms"]
+            or a["val_accuracy"] > b["val_accuracy"]
+        )
+        return no_worse and better
+
+    return [r for r in results if not any(dominates(other, r) for other in results if other is not r)]
+
+
+def choose(results: List[dict], latency_budget_ms: float, recall_floor: float) -> Optional[dict]:
+    """Most accurate candidate within the latency budget and recall floor, or None."""
+    eligible = [
+        r for r in results
+        if r["latency_p50_ms"] <= latency_budget_ms and r["val_high_recall"] >= recall_floor
+    ]
+    if not eligible:
+        return None
+    return max(eligible, key=lambda r: (r["val_accuracy"], -r["size_kb"]))
+
+
+def compress(
+    data_dir=DATA_DIR,
+    model_dir=MODEL_DIR,
+    student_depths=STUDENT_DEPTHS,
+    student_rounds=STUDENT_ROUNDS,
+    distill_rows: int = DISTILL_ROWS,
+    latency_repeats: int = LATENCY_REPEATS
+) -> List[dict]:
+    """
+    Build and measure pruned and distilled candidates for the saved model.
+
+    Returns:
+        One result per candidate, the original model first
+    """
+    data_dir = Path(data_dir)
+    model, scaler, encoder = load_artifacts(model_dir)
+    high_code = int(encoder.transform(["HIGH"])[0])
+    teacher = model.get_booster()
+    teacher_depth = tree_depth(teacher)
+
+    X_val, y_val = load_scaled_split(data_dir / "val", scaler)
+    X_test, y_test = load_scaled_split(data_dir / "test", scaler)
+    splits = {"val": (X_val, y_val), "test": (X_test, y_test)}
+    latency_rows = X_test[:latency_repeats]
+
+    def measure(name, booster, depth):
+        return describe(name, booster, depth, splits, latency_rows, high_code, latency_repeats)
+
+    total_rounds = teacher.num_boosted_rounds()
+    results = [measure("original", teacher, teacher_depth)]
+    for rounds in prune_rounds(total_rounds):
+        results.append(measure(f"prune-{rounds}", teacher[:rounds], teacher_depth))
+
+    X_train, _ = load_scaled_split(data_dir / "train", scaler, max_rows=distill_rows)
+    dval = xgb.DMatrix(X_val, label=y_val)
+    for depth in student_depths:
+        for rounds in student_rounds:
+            student = distill(teacher, X_train, dval, depth, rounds)
+            results.append(measure(f"distill-d{depth}-r{rounds}", student, depth))
+    return results
+
+
+def report_rows(results: List[dict], selected: Optional[dict] = None) -> List[dict]:
+    """Results without serialized models, fastest first, with Pareto and selection flags."""
+    front = {id(r) for r in pareto_front(results)}
+    rows = []
+    for r in sorted(results, key=lambda r: r["latency_p50_ms"]):
+        row = {key: value for key, value in r.items() if key != "model"}
+        row["pareto"] = id(r) in front
+        row["selected"] = r is selected
+        rows.append(row)
+    return rows
+
+
+def format_report(rows: List[dict]) -> str:
+    lines = [
+        f"{'candidate':<18} {'rounds':>6} {'depth':>5} {'size_kb':>8} {'p50_ms':>7} {'p99_ms':>7} "
+        f"{'val_acc':>7} {'high_rec':>8} {'test_acc':>8}"
+    ]
+    for row in rows:
+        flags = (" ◀ selected" if row["selected"] else "") + (" *" if row["pareto"] else "")
+        lines.append(
+            f"{row['name']:<18} {row['rounds']:>6} {row['max_depth']:>5} {row['size_kb']:>8.1f} "
+            f"{row['latency_p50_ms']:>7.3f} {row['latency_p99_ms']:>7.3f} {row['val_accuracy']:>7.4f} "
+            f"{row['val_high_recall']:>8.4f} {row['test_accuracy']:>8.4f}{flags}"
+        )
+    lines.append("* on the Pareto front (size, latency, accuracy)")
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Prune or distill the triage model to a latency budget.")
+    parser.add_argument("--data-dir", type=Path, default=DATA_DIR)
+    parser.add_argument("--model-dir", type=Path, default=MODEL_DIR)
+    parser.add_argument("--latency-budget-ms", type=float, default=LATENCY_BUDGET_MS, help="Single-row p50 budget")
+    parser.add_argument("--recall-floor", type=float, default=RECALL_FLOOR, help="Minimum validation HIGH-risk recall")
+    parser.add_argument("--distill-rows", type=int, default=DISTILL_ROWS, help="Training rows used for distillation")
+    parser.add_argument("--output", default=OUTPUT_FILE, help="File name for the selected model in --model-dir")
+    args = parser.parse_args()
+
+    print("✂️  Compressing triage model...")
+    results = compress(args.data_dir, args.model_dir, distill_rows=args.distill_rows)
+    selected = choose(results, args.latency_budget_ms, args.recall_floor)
+    rows = report_rows(results, selected)
+    print(format_report(rows))
+
+    with open(args.model_dir / "compression_report.json", "w") as f:
+        json.dump({
+            "latency_budget_ms": args.latency_budget_ms,
+            "recall_floor": args.recall_floor,
+            "selected": selected["name"] if selected else None,
+            "candidates": rows,
+        }, f, indent=2)
+
+    if selected is None:
+        raise SystemExit(
+            f"❌ No candidate meets {args.latency_budget_ms} ms with HIGH recall ≥ {args.recall_floor}"
+        )
+
+    with open(args.model_dir / args.output, "wb") as f:
+        pickle.dump(booster_to_classifier(load_booster(selected["model"])), f)
+    print(f"💾 Saved {selected['name']} to {args.model_dir / args.output}")
+    print(f"   Serve it with ML_MODEL_FILE={args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,200 @@
+"""Sharded NumPy dataset format for triage training data.
+
+Each split lives in its own directory::
+
+    ml/data/train/manifest.json
+    ml/data/train/features-00000.npy    float32, rows x features
+    ml/data/train/labels-00000.npy      int8 codes into label_classes
+
+The manifest records the feature names, label classes and shard sizes.
+Shards are memory-mapped when read, so training can stream a dataset that
+does not fit in RAM straight into XGBoost through ShardIter, without
+parsing CSV.
+
+Convert CSV splits from earlier releases:
+    python -m ml.dataset convert --data-dir ml/data
+"""
+import argparse
+import json
+from pathlib import Path
+from typing import Callable, Iterator, List, Optional, Tuple
+import numpy as np
+import pandas as pd
+import xgboost as xgb
+
+MANIFEST = "manifest.json"
+FORMAT_VERSION = 1
+LABEL_COLUMN = "risk_level"
+LABEL_CLASSES = ["HIGH", "LOW", "MEDIUM"]  # LabelEncoder order
+
+
+class ShardWriter:
+    """Append DataFrame chunks to a split directory as .npy shards."""
+
+    def __init__(self, split_dir, label_classes: List[str] = LABEL_CLASSES):
+        self.split_dir = Path(split_dir)
+        self.split_dir.mkdir(parents=True, exist_ok=True)
+        for old in self.split_dir.glob("*.npy"):
+            old.unlink()
+        self.label_classes = list(label_classes)
+        self.feature_names: Optional[List[str]] = None
+        self.shards = []
+
+    def write(self, df: pd.DataFrame):
+        """Write one chunk (feature columns plus risk_level) as a shard."""
+        if df.empty:
+            return
+        features = df.drop(columns=LABEL_COLUMN)
+        if self.feature_names is None:
+            self.feature_names = list(features.columns)
+        elif list(features.columns) != self.feature_names:
+            raise ValueError("Chunk columns do not match earlier shards")
+
+        index = len(self.shards)
+        feature_file = f"features-{index:05d}.npy"
+        label_file = f"labels-{index:05d}.npy"
+        codes = pd.Categorical(df[LABEL_COLUMN], categories=self.label_classes).codes
+        if (codes < 0).any():
+            raise ValueError(f"Unknown risk level in chunk. Must be one of: {', '.join(self.label_classes)}")
+
+        np.save(self.split_dir / feature_file, features.to_numpy(dtype=np.float32))
+        np.save(self.split_dir / label_file, codes.astype(np.int8))
+        self.shards.append({"features": feature_file, "labels": label_file, "rows": len(df)})
+
+    def close(self) -> dict:
+        """Write the manifest and return it."""
+        manifest = {
+            "version": FORMAT_VERSION,
+            "feature_names": self.feature_names or [],
+            "label_classes": self.label_classes,
+            "dtype": "float32",
+            "rows": sum(shard["rows"] for shard in self.shards),
+            "shards": self.shards,
+        }
+        with open(self.split_dir / MANIFEST, "w") as f:
+            json.dump(manifest, f, indent=2)
+        return manifest
+
+
+def has_manifest(split_dir) -> bool:
+    return (Path(split_dir) / MANIFEST).exists()
+
+
+def load_manifest(split_dir) -> dict:
+    """
+    Read a split's manifest.
+
+    Raises:
+        FileNotFoundError if the split has not been written in this format
+        ValueError for an unsupported format version
+    """
+    with open(Path(split_dir) / MANIFEST) as f:
+        manifest = json.load(f)
+    if manifest.get("version") != FORMAT_VERSION:
+        raise ValueError(f"Unsupported dataset format version: {manifest.get('version')}")
+    return manifest
+
+
+def iter_shards(split_dir, mmap: bool = True) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+    """Yield (features, label codes) per shard, memory-mapped by default."""
+    split_dir = Path(split_dir)
+    mode = "r" if mmap else None
+    for shard in load_manifest(split_dir)["shards"]:
+        yield (
+            np.load(split_dir / shard["features"], mmap_mode=mode),
+            np.load(split_dir / shard["labels"], mmap_mode=mode),
+        )
+
+
+def read_split(split_dir) -> Tuple[np.ndarray, np.ndarray]:
+    """Load a whole split into memory (for small validation/test splits)."""
+    shards = list(iter_shards(split_dir, mmap=False))
+    if not shards:
+        manifest = load_manifest(split_dir)
+        return np.empty((0, len(manifest["feature_names"])), dtype=np.float32), np.empty(0, dtype=np.int8)
+    return np.concatenate([X for X, _ in shards]), np.concatenate([y for _, y in shards])
+
+
+def read_frame(data_dir, split: str) -> pd.DataFrame:
+    """
+    Load a split as a DataFrame with decoded risk_level labels.
+
+    Falls back to <split>.csv for data generated before the shard format.
+    """
+    split_dir = Path(data_dir) / split
+    if not has_manifest(split_dir):
+        return pd.read_csv(Path(data_dir) / f"{split}.csv")
+    manifest = load_manifest(split_dir)
+    X, y = read_split(split_dir)
+    df = pd.DataFrame(X, columns=manifest["feature_names"])
+    df[LABEL_COLUMN] = np.asarray(manifest["label_classes"])[y]
+    return df
+
+
+class ShardIter(xgb.DataIter):
+    """
+    Feeds a split to XGBoost one shard at a time.
+
+    Use with xgb.QuantileDMatrix (shards are quantized as they stream in) or,
+    with a cache_prefix, xgb.DMatrix for external-memory training.
+    """
+
+    def __init__(
+        self,
+        split_dir,
+        transform: Optional[Callable[[np.ndarray], np.ndarray]] = None,
+        cache_prefix: Optional[str] = None
+    ):
+        self.split_dir = Path(split_dir)
+        self.shards = load_manifest(self.split_dir)["shards"]
+        self.transform = transform
+        self._index = 0
+        super().__init__(cache_prefix=cache_prefix)
+
+    def next(self, input_data) -> int:
+        if self._index == len(self.shards):
+            return 0
+        shard = self.shards[self._index]
+        X = np.load(self.split_dir / shard["features"], mmap_mode="r")
+        y = np.load(self.split_dir / shard["labels"], mmap_mode="r")
+        if self.transform is not None:
+            X = self.transform(X)
+        input_data(data=np.ascontiguousarray(X, dtype=np.float32), label=np.asarray(y))
+        self._index += 1
+        return 1
+
+    def reset(self):
+        self._index = 0
+
+
+def convert_csv(data_dir, splits=("train", "val", "test"), chunk_size: int = 250_000) -> dict:
+    """
+    Rewrite <split>.csv files as shard directories, streaming in chunks.
+
+    Returns:
+        Rows converted per split
+    """
+    data_dir = Path(data_dir)
+    rows = {}
+    for split in splits:
+        writer = ShardWriter(data_dir / split)
+        for chunk in pd.read_csv(data_dir / f"{split}.csv", chunksize=chunk_size):
+            writer.write(chunk)
+        rows[split] = writer.close()["rows"]
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Maintain sharded training data.")
+    parser.add_argument("command", choices=["convert"], help="convert: rewrite CSV splits as .npy shards")
+    parser.add_argument("--data-dir", type=Path, default=Path("ml/data"))
+    parser.add_argument("--chunk-size", type=int, default=250_000)
+    args = parser.parse_args()
+
+    rows = convert_csv(args.data_dir, chunk_size=args.chunk_size)
+    for split, count in rows.items():
+        print(f"✅ {split}: {count} rows → {args.data_dir / split}/")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,14 +1,29 @@
-"""Synthetic patient data generator for ML training."""
+"""Synthetic patient data generator for ML training.
+
+Generates rows in fixed-size chunks and streams them to the train/val/test
+splits, so memory use depends on the chunk size rather than the dataset
+size. Splits are written as .npy shards (see ml/dataset.py) or, with
+--format csv, as CSV files. Chunk i is seeded with seed + i, so the
+output does not depend on the number of worker processes.
+
+Usage:
+    python -m ml.generate_data                                  # 5,000 rows
+    python -m ml.generate_data --samples 10000000 --workers 8   # stress-test data
+"""
+import argparse
+import time
+from concurrent.futures import ProcessPoolExecutor
 import pandas as pd
 import numpy as np
 from pathlib import Path
-
-# Set random seed for reproducibility
-np.random.seed(420)
+from ml.dataset import ShardWriter
 
 # Constants
 N_SAMPLES = 5000
+CHUNK_SIZE = 250_000
+SEED = 420
 DATA_DIR = Path("ml/data")
+SPLITS = (("train", 0.70), ("val", 0.15), ("test", 0.15))
 
 # Feature definitions
 SYMPTOMS = [
@@ -23,6 +38,8 @@ CONDITIONS = [
     "copd", "kidney_disease", "cancer", "stroke_history"
 ]
 
+SEVERE_SYMPTOMS = ['chest_pain', 'seizure', 'confusion', 'slurred_speech']
+
 
 def assign_risk_label(row):
     """
@@ -41,8 +58,7 @@ def assign_risk_label(row):
         return 'HIGH'
     
     # Severe symptoms → HIGH
-    severe_symptoms = ['chest_pain', 'seizure', 'confusion', 'slurred_speech']
-    if any(row[f'symptom_{s}'] == 1 for s in severe_symptoms if s in SYMPTOMS):
+    if any(row[f'symptom_{s}'] == 1 for s in SEVERE_SYMPTOMS if s in SYMPTOMS):
         if row['age'] > 50:
             return 'HIGH'
     
@@ -82,22 +98,77 @@ def assign_risk_label(row):
         return 'LOW'
 
 
-def generate_patient_data(n_samples):
-    """Generate synthetic patient dataset."""
+def assign_risk_labels(df):
+    """
+    Vectorized assign_risk_label for a whole DataFrame.
+    
+    Applies the same rules as assign_risk_label, as boolean masks over
+    columns, and must stay in sync with it (see tests/test_generate_data.py).
+    
+    Returns:
+        NumPy array of 'HIGH' / 'MEDIUM' / 'LOW'
+    """
+    age = df['age'].to_numpy()
+    bp_systolic = df['bp_systolic'].to_numpy()
+    bp_diastolic = df['bp_diastolic'].to_numpy()
+    heart_rate = df['heart_rate'].to_numpy()
+    temperature = df['temperature'].to_numpy()
+    spo2 = df['spo2'].to_numpy()
+    
+    # Critical vitals → HIGH
+    critical = (
+        (spo2 < 90)
+        | (bp_systolic > 180) | (bp_diastolic > 110)
+        | (heart_rate < 50) | (heart_rate > 120)
+        | (temperature > 40)
+    )
+    
+    # Severe symptoms over 50 → HIGH
+    severe = np.zeros(len(df), dtype=bool)
+    for s in SEVERE_SYMPTOMS:
+        if s in SYMPTOMS:
+            severe |= df[f'symptom_{s}'].to_numpy() == 1
+    critical |= severe & (age > 50)
+    
+    # Multiple risk factors
+    risk_score = np.where(age > 65, 2, np.where(age > 50, 1, 0))
+    risk_score += (bp_systolic > 140) | (bp_diastolic > 90)
+    risk_score += spo2 < 94
+    risk_score += temperature > 38.5
+    risk_score += 2 * (df['condition_heart_disease'].to_numpy() == 1)
+    risk_score += df['condition_diabetes'].to_numpy() == 1
+    risk_score += df['symptom_count'].to_numpy() >= 3
+    
+    return np.select(
+        [critical | (risk_score >= 4), risk_score >= 2],
+        ['HIGH', 'MEDIUM'],
+        default='LOW'
+    )
+
+
+def generate_patient_data(n_samples, rng=None):
+    """
+    Generate synthetic patient dataset.
+    
+    Args:
+        n_samples: Number of rows
+        rng: np.random.RandomState to draw from (default: the global NumPy state)
+    """
+    rng = rng if rng is not None else np.random
     data = {}
     
     # Demographics
-    data['age'] = np.random.randint(18, 90, n_samples)
-    data['gender_M'] = np.random.randint(0, 2, n_samples)
+    data['age'] = rng.randint(18, 90, n_samples)
+    data['gender_M'] = rng.randint(0, 2, n_samples)
     data['gender_F'] = 1 - data['gender_M']
     data['gender_Other'] = np.zeros(n_samples, dtype=int)
     
     # Vital signs with realistic distributions
-    data['bp_systolic'] = np.random.normal(125, 20, n_samples).clip(90, 200)
-    data['bp_diastolic'] = np.random.normal(80, 15, n_samples).clip(60, 130)
-    data['heart_rate'] = np.random.normal(75, 15, n_samples).clip(40, 150)
-    data['temperature'] = np.random.normal(37.2, 0.8, n_samples).clip(36, 41)
-    data['spo2'] = np.random.normal(97, 3, n_samples).clip(85, 100)
+    data['bp_systolic'] = rng.normal(125, 20, n_samples).clip(90, 200)
+    data['bp_diastolic'] = rng.normal(80, 15, n_samples).clip(60, 130)
+    data['heart_rate'] = rng.normal(75, 15, n_samples).clip(40, 150)
+    data['temperature'] = rng.normal(37.2, 0.8, n_samples).clip(36, 41)
+    data['spo2'] = rng.normal(97, 3, n_samples).clip(85, 100)
     
     # Symptoms (binary, ~20% chance for each)
     for symptom in SYMPTOMS:
@@ -108,7 +179,7 @@ def generate_patient_data(n_samples):
             prob = 0.15
         else:
             prob = 0.10
-        data[f'symptom_{symptom}'] = np.random.binomial(1, prob, n_samples)
+        data[f'symptom_{symptom}'] = rng.binomial(1, prob, n_samples)
     
     # Pre-existing conditions (binary, ~15% chance for each)
     for condition in CONDITIONS:
@@ -116,7 +187,7 @@ def generate_patient_data(n_samples):
             prob = 0.20
         else:
             prob = 0.10
-        data[f'condition_{condition}'] = np.random.binomial(1, prob, n_samples)
+        data[f'condition_{condition}'] = rng.binomial(1, prob, n_samples)
     
     # Derived features
     data['symptom_count'] = sum(data[f'symptom_{s}'] for s in SYMPTOMS)
@@ -126,38 +197,131 @@ def generate_patient_data(n_samples):
     df = pd.DataFrame(data)
     
     # Assign risk labels
-    df['risk_level'] = df.apply(assign_risk_label, axis=1)
+    df['risk_level'] = assign_risk_labels(df)
     
     return df
 
 
-def main():
-    """Generate and save training datasets."""
-    print("🔬 Generating synthetic patient data...")
+def generate_chunk(args):
+    """Generate chunk `index` of `size` rows (ProcessPoolExecutor entry point)."""
+    index, size, seed = args
+    return generate_patient_data(size, np.random.RandomState(seed + index))
+
+
+def iter_chunks(n_samples, chunk_size=CHUNK_SIZE, seed=SEED, workers=1):
+    """
+    Yield (start_row, DataFrame) chunks in order.
+    
+    With workers > 1, chunks are generated in a process pool with at most
+    2 * workers chunks in flight, so memory stays bounded.
+    """
+    tasks = [
+        (index, min(chunk_size, n_samples - start), seed)
+        for index, start in enumerate(range(0, n_samples, chunk_size))
+    ]
+    if workers <= 1:
+        for task in tasks:
+            yield task[0] * chunk_size, generate_chunk(task)
+        return
+    
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        in_flight = []
+        for task in tasks:
+            in_flight.append((task[0], pool.submit(generate_chunk, task)))
+            if len(in_flight) >= 2 * workers:
+                index, future = in_flight.pop(0)
+                yield index * chunk_size, future.result()
+        for index, future in in_flight:
+            yield index * chunk_size, future.result()
+
+
+def split_bounds(n_samples):
+    """Row ranges for the train/val/test splits (70/15/15 by position)."""
+    bounds, start = [], 0
+    for i, (name, fraction) in enumerate(SPLITS):
+        end = n_samples if i == len(SPLITS) - 1 else start + int(fraction * n_samples)
+        bounds.append((name, start, end))
+        start = end
+    return bounds
+
+
+class _CsvSplitWriter:
+    """Append chunks to <split>.csv with a single header row."""
+    
+    def __init__(self, path):
+        self.file = open(path, "w", newline="")
+        self.rows = 0
+    
+    def write(self, df):
+        df.to_csv(self.file, header=self.rows == 0, index=False)
+        self.rows += len(df)
+    
+    def close(self):
+        self.file.close()
+
+
+def write_dataset(n_samples, data_dir=DATA_DIR, chunk_size=CHUNK_SIZE, seed=SEED, workers=1, data_format="npy"):
+    """
+    Generate n_samples rows and stream them into train/val/test splits.
     
-    # Create data directory
-    DATA_DIR.mkdir(parents=True, exist_ok=True)
+    Args:
+        data_format: "npy" for <split>/ shard directories, "csv" for <split>.csv files
     
-    # Generate full dataset
-    df = generate_patient_data(N_SAMPLES)
+    Returns:
+        (rows per split, risk level counts)
+    """
+    data_dir = Path(data_dir)
+    data_dir.mkdir(parents=True, exist_ok=True)
+    bounds = split_bounds(n_samples)
+    if data_format == "csv":
+        writers = {name: _CsvSplitWriter(data_dir / f"{name}.csv") for name, _, _ in bounds}
+    else:
+        writers = {name: ShardWriter(data_dir / name) for name, _, _ in bounds}
+    rows = {name: 0 for name, _, _ in bounds}
+    risk_counts = pd.Series(dtype=int)
     
-    # Split: 70% train, 15% val, 15% test
-    train_df = df.iloc[:int(0.7 * N_SAMPLES)]
-    val_df = df.iloc[int(0.7 * N_SAMPLES):int(0.85 * N_SAMPLES)]
-    test_df = df.iloc[int(0.85 * N_SAMPLES):]
+    try:
+        for chunk_start, df in iter_chunks(n_samples, chunk_size, seed, workers):
+            chunk_end = chunk_start + len(df)
+            for name, start, end in bounds:
+                lo, hi = max(start, chunk_start), min(end, chunk_end)
+                if lo >= hi:
+                    continue
+                writers[name].write(df.iloc[lo - chunk_start:hi - chunk_start])
+                rows[name] += hi - lo
+            risk_counts = risk_counts.add(df['risk_level'].value_counts(), fill_value=0)
+    finally:
+        for writer in writers.values():
+            writer.close()
     
-    # Save to CSV
-    train_df.to_csv(DATA_DIR / "train.csv", index=False)
-    val_df.to_csv(DATA_DIR / "val.csv", index=False)
-    test_df.to_csv(DATA_DIR / "test.csv", index=False)
+    return rows, risk_counts.astype(int)
+
+
+def main():
+    """Generate and save training datasets."""
+    parser = argparse.ArgumentParser(description="Generate synthetic triage training data.")
+    parser.add_argument("--samples", type=int, default=N_SAMPLES, help="Total rows (default 5000)")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE, help="Rows generated per chunk")
+    parser.add_argument("--workers", type=int, default=1, help="Generator processes")
+    parser.add_argument("--seed", type=int, default=SEED)
+    parser.add_argument("--output-dir", type=Path, default=DATA_DIR)
+    parser.add_argument("--format", choices=["npy", "csv"], default="npy", help="npy shards (default) or CSV")
+    args = parser.parse_args()
+    
+    print("🔬 Generating synthetic patient data...")
+    start = time.perf_counter()
+    rows, risk_counts = write_dataset(
+        args.samples, args.output_dir, args.chunk_size, args.seed, args.workers, args.format
+    )
+    elapsed = time.perf_counter() - start
     
-    print(f"✅ Generated {N_SAMPLES} patient records")
-    print(f"   Train: {len(train_df)} samples")
-    print(f"   Val:   {len(val_df)} samples")
-    print(f"   Test:  {len(test_df)} samples")
+    print(f"✅ Generated {args.samples} patient records in {elapsed:.1f}s")
+    print(f"   Train: {rows['train']} samples")
+    print(f"   Val:   {rows['val']} samples")
+    print(f"   Test:  {rows['test']} samples")
     print(f"\n📊 Risk Distribution:")
-    print(df['risk_level'].value_counts())
-    print(f"\n💾 Saved to {DATA_DIR}/")
+    print(risk_counts.sort_values(ascending=False))
+    print(f"\n💾 Saved to {args.output_dir}/")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,187 @@
+"""Hyperparameter search for the triage model.
+
+Trains every candidate configuration from GRID across a process pool, with
+hist trees and early stopping on the validation split, then times
+single-row predict_proba for each trained model (the call MLService makes
+per patient). The report lists accuracy against latency so the fastest
+model meeting the accuracy target can be picked.
+
+Run through train_model, which saves the selected model:
+    python -m ml.train_model --search --workers 4 --target-accuracy 0.9
+"""
+import itertools
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional
+import numpy as np
+import xgboost as xgb
+from ml.dataset import read_split
+from ml.train_model import (
+    EARLY_STOPPING_ROUNDS, PARAMS, booster_to_classifier, fit_booster, prepare, scale
+)
+
+# Searched values; everything else comes from train_model.PARAMS
+GRID = {
+    "max_depth": [3, 4, 6, 8],
+    "learning_rate": [0.1, 0.3],
+    "max_bin": [64, 256],
+}
+MAX_ROUNDS = 500
+LATENCY_REPEATS = 300
+
+# Per-process state for pool workers, keyed by max_bin (the quantized
+# training matrix is built for one bin count)
+_worker_data_dir: Optional[Path] = None
+_worker_nthread = 1
+_worker_data: Dict[int, tuple] = {}
+
+
+def candidate_grid(grid: Dict[str, list] = GRID) -> List[dict]:
+    """Expand a {param: [values]} grid into a list of parameter dicts."""
+    keys = list(grid)
+    return [dict(zip(keys, values)) for values in itertools.product(*(grid[key] for key in keys))]
+
+
+def _init_worker(data_dir, nthread: int):
+    global _worker_data_dir, _worker_nthread
+    _worker_data_dir = Path(data_dir)
+    _worker_nthread = nthread
+    _worker_data.clear()
+
+
+def _data_for(max_bin: int):
+    if max_bin not in _worker_data:
+        dtrain, dval, scaler, encoder, feature_names = prepare(_worker_data_dir, max_bin=max_bin)
+        X_test, y_test = read_split(_worker_data_dir / "test")
+        _worker_data[max_bin] = (dtrain, dval, scale(scaler, X_test, feature_names), y_test, len(encoder.classes_))
+    return _worker_data[max_bin]
+
+
+def _accuracy(booster: xgb.Booster, dmatrix) -> float:
+    predicted = booster.predict(dmatrix).argmax(axis=1)
+    return float((predicted == dmatrix.get_label()).mean())
+
+
+def fit_candidate(candidate: dict, max_rounds: int = MAX_ROUNDS, early_stopping_rounds: int = EARLY_STOPPING_ROUNDS) -> dict:
+    """
+    Train one candidate (ProcessPoolExecutor entry point).
+
+    Returns:
+        Result dict with accuracies, rounds kept and the raw JSON model
+    """
+    max_bin = candidate.get("max_bin", 256)
+    dtrain, dval, X_test, y_test, num_class = _data_for(max_bin)
+    params = {**PARAMS, **candidate, "num_class": num_class, "nthread": _worker_nthread}
+
+    start = time.perf_counter()
+    booster = fit_booster(params, dtrain, dval, max_rounds, early_stopping_rounds)
+    train_seconds = time.perf_counter() - start
+
+    return {
+        "params": candidate,
+        "rounds": booster.num_boosted_rounds(),
+        "val_accuracy": _accuracy(booster, dval),
+        "test_accuracy": _accuracy(booster, xgb.DMatrix(X_test, label=y_test)),
+        "train_seconds": round(train_seconds, 2),
+        "model": bytes(booster.save_raw("json")),
+    }
+
+
+def measure_latency(booster: xgb.Booster, rows: np.ndarray, repeats: int = LATENCY_REPEATS) -> dict:
+    """Time single-row predict_proba through the XGBClassifier MLService uses."""
+    model = booster_to_classifier(booster)
+    model.predict_proba(rows[:1])  # warm-up
+    timings = np.empty(repeats)
+    for i in range(repeats):
+        row = rows[i % len(rows)][None, :]
+        start = time.perf_counter()
+        model.predict_proba(row)
+        timings[i] = time.perf_counter() - start
+    timings *= 1000
+    return {
+        "latency_p50_ms": round(float(np.percentile(timings, 50)), 4),
+        "latency_p99_ms": round(float(np.percentile(timings, 99)), 4),
+    }
+
+
+def load_booster(raw: bytes) -> xgb.Booster:
+    booster = xgb.Booster()
+    booster.load_model(bytearray(raw))
+    return booster
+
+
+def run_search(
+    data_dir,
+    candidates: List[dict],
+    workers: int = 1,
+    max_rounds: int = MAX_ROUNDS,
+    early_stopping_rounds: int = EARLY_STOPPING_ROUNDS,
+    latency_rows: Optional[np.ndarray] = None,
+    latency_repeats: int = LATENCY_REPEATS
+) -> List[dict]:
+    """
+    Train candidates in parallel, then time each model one at a time.
+
+    Latency is measured in this process after the pool has finished, so
+    timings are not skewed by other candidates training alongside.
+
+    Args:
+        data_dir: Directory holding train/, val/ and test/ shard directories
+        candidates: Parameter dicts overriding PARAMS
+        workers: Training processes (CPU threads are split between them)
+        latency_rows: Scaled feature rows to time predictions on
+
+    Returns:
+        One result per candidate, in candidate order
+    """
+    workers = max(1, min(workers, len(candidates)))
+    nthread = max(1, (os.cpu_count() or 1) // workers)
+    with ProcessPoolExecutor(
+        max_workers=workers, initializer=_init_worker, initargs=(data_dir, nthread)
+    ) as pool:
+        results = list(pool.map(
+            fit_candidate, candidates,
+            itertools.repeat(max_rounds), itertools.repeat(early_stopping_rounds)
+        ))
+
+    if latency_rows is not None:
+        for result in results:
+            result.update(measure_latency(load_booster(result["model"]), latency_rows, latency_repeats))
+    return results
+
+
+def select(results: List[dict], target_accuracy: float) -> Optional[dict]:
+    """Fastest result whose validation accuracy meets the target, or None."""
+    eligible = [r for r in results if r["val_accuracy"] >= target_accuracy]
+    if not eligible:
+        return None
+    return min(eligible, key=lambda r: (r.get("latency_p50_ms", 0.0), -r["val_accuracy"]))
+
+
+def report_rows(results: List[dict]) -> List[dict]:
+    """Results without the serialized models, fastest first (for JSON reports)."""
+    rows = [{key: value for key, value in r.items() if key != "model"} for r in results]
+    return sorted(rows, key=lambda r: r.get("latency_p50_ms", 0.0))
+
+
+def format_report(results: List[dict], target_accuracy: float, selected: Optional[dict] = None) -> str:
+    """Plain-text table of accuracy against latency, fastest first."""
+    lines = [
+        f"{'max_depth':>9} {'lr':>5} {'bins':>5} {'rounds':>6} {'val_acc':>8} {'test_acc':>8} "
+        f"{'p50_ms':>8} {'p99_ms':>8}"
+    ]
+    for r in report_rows(results):
+        params = r["params"]
+        marker = " ◀ selected" if selected is not None and r["params"] == selected["params"] else (
+            "" if r["val_accuracy"] >= target_accuracy else " (below target)"
+        )
+        lines.append(
+            f"{params.get('max_depth', PARAMS['max_depth']):>9} "
+            f"{params.get('learning_rate', PARAMS['learning_rate']):>5} "
+            f"{params.get('max_bin', 256):>5} {r['rounds']:>6} "
+            f"{r['val_accuracy']:>8.4f} {r['test_accuracy']:>8.4f} "
+            f"{r.get('latency_p50_ms', float('nan')):>8.3f} {r.get('latency_p99_ms', float('nan')):>8.3f}{marker}"
+        )
+    return "\n".join(lines)
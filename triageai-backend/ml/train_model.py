@@ -1,4 +1,19 @@
-"""XGBoost model training script."""
+"""XGBoost model training script.
+
+Reads the sharded splits written by ml/generate_data.py (see ml/dataset.py)
+and streams the training split into XGBoost one shard at a time, so
+datasets larger than RAM can be trained. CSV splits from earlier releases
+are converted to shards first.
+
+Usage:
+    python -m ml.train_model
+    python -m ml.train_model --external-memory --cache-dir /tmp/xgb-cache
+    python -m ml.train_model --search --workers 4 --target-accuracy 0.9
+"""
+import argparse
+import json
+import os
+import tempfile
 import pandas as pd
 import numpy as np
 import pickle
@@ -6,119 +21,246 @@ from pathlib import Path
 from sklearn.preprocessing import StandardScaler, LabelEncoder
 from sklearn.metrics import classification_report, accuracy_score
 import xgboost as xgb
+from ml.dataset import ShardIter, convert_csv, has_manifest, iter_shards, load_manifest, read_split
 
 # Paths
 DATA_DIR = Path("ml/data")
 MODEL_DIR = Path("ml/models")
 
+# Same hyperparameters as the original XGBClassifier(n_estimators=200, ...).
+# softprob, since MLService reads predict_proba; training stops early once
+# validation mlogloss has not improved for EARLY_STOPPING_ROUNDS rounds.
+NUM_BOOST_ROUND = 200
+EARLY_STOPPING_ROUNDS = 20
+TARGET_ACCURACY = 0.85
+PARAMS = {
+    "max_depth": 6,
+    "learning_rate": 0.1,
+    "subsample": 0.8,
+    "colsample_bytree": 0.8,
+    "objective": "multi:softprob",
+    "eval_metric": "mlogloss",
+    "tree_method": "hist",
+    "seed": 42,
+}
+
+
+def ensure_shards(data_dir=DATA_DIR):
+    """Convert CSV splits to shards if only CSV files exist."""
+    if not has_manifest(Path(data_dir) / "train"):
+        print("📦 Converting CSV splits to .npy shards...")
+        convert_csv(data_dir)
+
+
+def fit_scaler(split_dir, feature_names) -> StandardScaler:
+    """Fit the feature scaler in one streaming pass over the shards."""
+    scaler = StandardScaler()
+    for X, _ in iter_shards(split_dir):
+        # Named columns, as MLService passes a DataFrame to scaler.transform
+        scaler.partial_fit(pd.DataFrame(X, columns=feature_names))
+    return scaler
+
+
+def scale(scaler, X, feature_names) -> np.ndarray:
+    return scaler.transform(pd.DataFrame(X, columns=feature_names)).astype(np.float32)
+
+
+def fit_preprocessing(data_dir=DATA_DIR):
+    """Returns (scaler, encoder, feature_names) for the training split."""
+    manifest = load_manifest(Path(data_dir) / "train")
+    encoder = LabelEncoder().fit(manifest["label_classes"])
+    feature_names = manifest["feature_names"]
+    return fit_scaler(Path(data_dir) / "train", feature_names), encoder, feature_names
+
+
+def booster_to_classifier(booster: xgb.Booster) -> xgb.XGBClassifier:
+    """Wrap a trained Booster in XGBClassifier (the type MLService unpickles)."""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "model.json")
+        booster.save_model(path)
+        model = xgb.XGBClassifier()
+        model.load_model(path)
+    return model
+
+
+def prepare(data_dir=DATA_DIR, external_memory: bool = False, cache_dir=None, max_bin: int = 256):
+    """
+    Fit the scaler and build the training and validation matrices.
+
+    Args:
+        data_dir: Directory holding train/, val/ and test/ shard directories
+        external_memory: Page quantized data through cache_dir instead of RAM
+        cache_dir: Directory for external-memory cache files
+        max_bin: Histogram bins per feature (fixed when the training matrix is quantized)
+
+    Returns:
+        (dtrain, dval, scaler, encoder, feature_names)
+    """
+    data_dir = Path(data_dir)
+    scaler, encoder, feature_names = fit_preprocessing(data_dir)
+    transform = lambda X: scale(scaler, X, feature_names)
+
+    if external_memory:
+        cache_prefix = os.path.join(cache_dir or tempfile.mkdtemp(), "train")
+        dtrain = xgb.DMatrix(ShardIter(data_dir / "train", transform, cache_prefix=cache_prefix))
+    else:
+        dtrain = xgb.QuantileDMatrix(ShardIter(data_dir / "train", transform), max_bin=max_bin)
+
+    X_val, y_val = read_split(data_dir / "val")
+    dval = xgb.DMatrix(transform(X_val), label=y_val)
+    return dtrain, dval, scaler, encoder, feature_names
+
+
+def fit_booster(
+    params: dict,
+    dtrain,
+    dval,
+    num_boost_round: int = NUM_BOOST_ROUND,
+    early_stopping_rounds: int = EARLY_STOPPING_ROUNDS
+) -> xgb.Booster:
+    """Train with early stopping on dval; returns the booster cut at its best round."""
+    booster = xgb.train(
+        params,
+        dtrain,
+        num_boost_round=num_boost_round,
+        evals=[(dval, "val")],
+        early_stopping_rounds=early_stopping_rounds,
+        verbose_eval=False
+    )
+    return booster[: booster.best_iteration + 1]
+
+
+def train(data_dir=DATA_DIR, external_memory: bool = False, cache_dir=None):
+    """
+    Train the default configuration on the sharded splits.
+
+    Returns:
+        (model, scaler, encoder, feature_names)
+    """
+    dtrain, dval, scaler, encoder, feature_names = prepare(data_dir, external_memory, cache_dir)
+    booster = fit_booster({**PARAMS, "num_class": len(encoder.classes_)}, dtrain, dval)
+    return booster_to_classifier(booster), scaler, encoder, feature_names
+
 
-def load_data():
-    """Load training, validation, and test datasets."""
-    train_df = pd.read_csv(DATA_DIR / "train.csv")
-    val_df = pd.read_csv(DATA_DIR / "val.csv")
-    test_df = pd.read_csv(DATA_DIR / "test.csv")
-    
-    return train_df, val_df, test_df
+def search(data_dir=DATA_DIR, model_dir=MODEL_DIR, workers: int = 1, target_accuracy: float = TARGET_ACCURACY):
+    """
+    Run the hyperparameter search (see ml/search.py) and pick a model.
 
+    Writes search_report.json to model_dir.
 
-def prepare_features(df):
-    """Separate features and labels."""
-    X = df.drop('risk_level', axis=1)
-    y = df['risk_level']
-    return X, y
+    Returns:
+        (model, scaler, encoder, feature_names)
+
+    Raises:
+        SystemExit if no candidate reaches target_accuracy
+    """
+    from ml.search import LATENCY_REPEATS, candidate_grid, format_report, load_booster, report_rows, run_search, select
+
+    data_dir = Path(data_dir)
+    scaler, encoder, feature_names = fit_preprocessing(data_dir)
+    X_test, _ = read_split(data_dir / "test")
+    latency_rows = scale(scaler, X_test[:LATENCY_REPEATS], feature_names)
+
+    candidates = candidate_grid()
+    print(f"🔎 Searching {len(candidates)} configurations on {workers} worker(s)...")
+    results = run_search(data_dir, candidates, workers=workers, latency_rows=latency_rows)
+    selected = select(results, target_accuracy)
+
+    print(format_report(results, target_accuracy, selected))
+    with open(Path(model_dir) / "search_report.json", "w") as f:
+        json.dump({
+            "target_accuracy": target_accuracy,
+            "selected": selected["params"] if selected else None,
+            "candidates": report_rows(results),
+        }, f, indent=2)
+
+    if selected is None:
+        raise SystemExit(f"❌ No configuration reached validation accuracy {target_accuracy}")
+    print(f"🏁 Selected {selected['params']} ({selected['latency_p50_ms']:.3f} ms p50)")
+    return booster_to_classifier(load_booster(selected["model"])), scaler, encoder, feature_names
+
+
+def evaluate(model, scaler, split_dir):
+    """Predict a split shard by shard; returns (true codes, predicted codes)."""
+    feature_names = load_manifest(split_dir)["feature_names"]
+    y_true, y_pred = [], []
+    for X, y in iter_shards(split_dir):
+        y_true.append(np.asarray(y))
+        y_pred.append(model.predict(scale(scaler, X, feature_names)))
+    return np.concatenate(y_true), np.concatenate(y_pred)
 
 
 def main():
     """Train and save XGBoost model."""
+    parser = argparse.ArgumentParser(description="Train the triage XGBoost model.")
+    parser.add_argument("--data-dir", type=Path, default=DATA_DIR)
+    parser.add_argument("--model-dir", type=Path, default=MODEL_DIR)
+    parser.add_argument("--external-memory", action="store_true", help="Page training data from disk")
+    parser.add_argument("--cache-dir", help="Cache directory for --external-memory")
+    parser.add_argument("--search", action="store_true", help="Search hyperparameters and keep the fastest model meeting the target")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Processes for --search")
+    parser.add_argument("--target-accuracy", type=float, default=TARGET_ACCURACY, help="Validation accuracy --search must reach")
+    args = parser.parse_args()
+
     print("🚂 Training XGBoost model...")
-    
+
     # Create model directory
-    MODEL_DIR.mkdir(parents=True, exist_ok=True)
-    
+    args.model_dir.mkdir(parents=True, exist_ok=True)
+
     # Load data
-    train_df, val_df, test_df = load_data()
-    print(f"✅ Loaded datasets: {len(train_df)} train, {len(val_df)} val, {len(test_df)} test")
-    
-    # Prepare features
-    X_train, y_train = prepare_features(train_df)
-    X_val, y_val = prepare_features(val_df)
-    X_test, y_test = prepare_features(test_df)
-    
-    # Encode labels
-    encoder = LabelEncoder()
-    y_train_encoded = encoder.fit_transform(y_train)
-    y_val_encoded = encoder.transform(y_val)
-    y_test_encoded = encoder.transform(y_test)
-    
-    print(f"📊 Classes: {encoder.classes_}")
-    
-    # Scale features
-    scaler = StandardScaler()
-    X_train_scaled = scaler.fit_transform(X_train)
-    X_val_scaled = scaler.transform(X_val)
-    X_test_scaled = scaler.transform(X_test)
-    
+    ensure_shards(args.data_dir)
+    rows = {split: load_manifest(args.data_dir / split)["rows"] for split in ("train", "val", "test")}
+    print(f"✅ Loaded datasets: {rows['train']} train, {rows['val']} val, {rows['test']} test")
+
     # Train XGBoost classifier
     print("🔧 Training XGBoost...")
-    model = xgb.XGBClassifier(
-        n_estimators=200,
-        max_depth=6,
-        learning_rate=0.1,
-        subsample=0.8,
-        colsample_bytree=0.8,
-        objective='multi:softmax',
-        num_class=len(encoder.classes_),
-        random_state=42,
-        eval_metric='mlogloss'
-    )
-    
-    model.fit(
-        X_train_scaled,
-        y_train_encoded,
-        eval_set=[(X_val_scaled, y_val_encoded)],
-        verbose=False
-    )
-    
+    if args.search:
+        model, scaler, encoder, feature_names = search(args.data_dir, args.model_dir, args.workers, args.target_accuracy)
+    else:
+        model, scaler, encoder, feature_names = train(args.data_dir, args.external_memory, args.cache_dir)
+    print(f"📊 Classes: {encoder.classes_}")
+
     # Evaluate on test set
-    y_pred = model.predict(X_test_scaled)
+    y_test_encoded, y_pred = evaluate(model, scaler, args.data_dir / "test")
     accuracy = accuracy_score(y_test_encoded, y_pred)
-    
+
     print(f"\n✅ Training complete!")
     print(f"🎯 Test Accuracy: {accuracy:.4f}")
-    
-    if accuracy < 0.85:
-        print("⚠️  WARNING: Accuracy below 0.85 target!")
-    
+
+    if accuracy < TARGET_ACCURACY:
+        print(f"⚠️  WARNING: Accuracy below {TARGET_ACCURACY} target!")
+
     print(f"\n📈 Classification Report:")
     print(classification_report(
         y_test_encoded,
         y_pred,
+        labels=range(len(encoder.classes_)),
         target_names=encoder.classes_,
         digits=3
     ))
-    
+
     # Save models
-    with open(MODEL_DIR / "xgb_model.pkl", "wb") as f:
+    with open(args.model_dir / "xgb_model.pkl", "wb") as f:
         pickle.dump(model, f)
-    
-    with open(MODEL_DIR / "scaler.pkl", "wb") as f:
+
+    with open(args.model_dir / "scaler.pkl", "wb") as f:
         pickle.dump(scaler, f)
-    
-    with open(MODEL_DIR / "encoder.pkl", "wb") as f:
+
+    with open(args.model_dir / "encoder.pkl", "wb") as f:
         pickle.dump(encoder, f)
-    
-    print(f"💾 Models saved to {MODEL_DIR}/")
+
+    print(f"💾 Models saved to {args.model_dir}/")
     print("   - xgb_model.pkl")
     print("   - scaler.pkl")
     print("   - encoder.pkl")
-    
+
     # Feature importance
     print(f"\n🔍 Top 10 Feature Importances:")
     feature_importance = pd.DataFrame({
-        'feature': X_train.columns,
+        'feature': feature_names,
         'importance': model.feature_importances_
     }).sort_values('importance', ascending=False)
-    
+
     print(feature_importance.head(10).to_string(index=False))
 
 
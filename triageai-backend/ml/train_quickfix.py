@@ -1,16 +1,25 @@
+"""Quick Fix disease-prediction model training.
 
-import pandas as pd
-import numpy as np
+Generates synthetic multi-hot symptom samples from KNOWLEDGE_BASE straight
+into NumPy arrays and trains a random forest on all cores. The saved
+artifact keeps the format app/services/quickfix_service.py loads.
+
+Usage:
+    python ml/train_quickfix.py
+    python ml/train_quickfix.py --samples-per-disease 5000 --seed 7 --output /tmp/quickfix_model.pkl
+"""
+import argparse
 import pickle
-import os
+import time
+import numpy as np
+from pathlib import Path
 from sklearn.ensemble import RandomForestClassifier
 from sklearn.preprocessing import LabelEncoder
-from sklearn.model_selection import train_test_split
 
 # --- Configuration ---
-MODEL_DIR = "app/models"
-if not os.path.exists(MODEL_DIR):
-    os.makedirs(MODEL_DIR)
+MODEL_DIR = Path("app/models")
+SAMPLES_PER_DISEASE = 500
+SEED = 42
 
 # --- Expanded Knowledge Base ---
 # Format: Disease -> { "symptoms": [LIST], "history": [LIST], "medicine": "Drug" }
@@ -108,79 +117,99 @@ ALL_HISTORY = sorted(list(set([h for d in KNOWLEDGE_BASE.values() for h in d["hi
 ALL_DISEASES = sorted(list(KNOWLEDGE_BASE.keys()))
 ALL_MEDICINES = sorted(list(set([d["medicine"] for d in KNOWLEDGE_BASE.values()])))
 
-print(f"Stats: {len(ALL_SYMPTOMS)} Symptoms, {len(ALL_HISTORY)} Conditions, {len(ALL_DISEASES)} Diseases")
-
-# --- Generate Synthetic Data ---
-SAMPLES_PER_DISEASE = 500
-data = []
 
-for disease, info in KNOWLEDGE_BASE.items():
-    possible_symptoms = info["symptoms"]
-    possible_history = info["history"]
-    medicine = info["medicine"]
+def generate_training_data(samples_per_disease=SAMPLES_PER_DISEASE, seed=SEED):
+    """
+    Sample synthetic patients for every disease in KNOWLEDGE_BASE.
     
-    for _ in range(SAMPLES_PER_DISEASE):
-        # Weighted random selection of symptoms (2 to 5 symptoms)
-        num_symptoms = np.random.randint(2, min(6, len(possible_symptoms) + 1))
-        chosen_symptoms = np.random.choice(possible_symptoms, num_symptoms, replace=False)
-        
-        # Random history
-        chosen_history = np.random.choice(possible_history)
+    Each sample has 2 to 5 distinct symptoms of its disease (fewer if the
+    disease lists fewer) and one of its histories, drawn for all samples of
+    a disease at once.
+    
+    Returns:
+        X: float32 matrix, one multi-hot column per ALL_SYMPTOMS entry followed
+           by the LabelEncoder code of the history (index in ALL_HISTORY)
+        y: disease codes (index in ALL_DISEASES)
+    """
+    rng = np.random.default_rng(seed)
+    symptom_index = {s: i for i, s in enumerate(ALL_SYMPTOMS)}
+    history_index = {h: i for i, h in enumerate(ALL_HISTORY)}
+    
+    n = samples_per_disease
+    X = np.zeros((n * len(ALL_DISEASES), len(ALL_SYMPTOMS) + 1), dtype=np.float32)
+    y = np.repeat(np.arange(len(ALL_DISEASES)), n)
+    
+    for d, disease in enumerate(ALL_DISEASES):
+        info = KNOWLEDGE_BASE[disease]
+        rows = slice(d * n, (d + 1) * n)
+        columns = np.array([symptom_index[s] for s in info["symptoms"]])
         
-        row = {
-            "disease": disease,
-            "medicine": medicine,
-            "history": chosen_history
-        }
+        # Random rank of each symptom per sample; the lowest num_symptoms ranks are chosen
+        k = len(columns)
+        num_symptoms = rng.integers(min(2, k), min(5, k) + 1, size=n)
+        ranks = rng.random((n, k)).argsort(axis=1).argsort(axis=1)
+        X[rows, columns] = ranks < num_symptoms[:, None]
         
-        # One-hot encode symptoms for the row
-        for sym in ALL_SYMPTOMS:
-            row[sym] = 1 if sym in chosen_symptoms else 0
-            
-        data.append(row)
-
-df = pd.DataFrame(data)
-
-# --- Encoding ---
-le_history = LabelEncoder()
-df['history_encoded'] = le_history.fit_transform(df['history'])
+        histories = np.array([history_index[h] for h in info["history"]])
+        X[rows, -1] = histories[rng.integers(0, len(histories), size=n)]
+    
+    return X, y
 
-le_disease = LabelEncoder()
-df['disease_encoded'] = le_disease.fit_transform(df['disease'])
 
-le_medicine = LabelEncoder()
-df['medicine_encoded'] = le_medicine.fit_transform(df['medicine'])
+def train_model(X, y, n_estimators=100, n_jobs=-1, seed=SEED):
+    """Fit the disease classifier (n_jobs=-1 uses every core)."""
+    model = RandomForestClassifier(n_estimators=n_estimators, random_state=seed, n_jobs=n_jobs)
+    model.fit(X, y)
+    return model
 
-# --- Training Data ---
-X = df[ALL_SYMPTOMS + ['history_encoded']]
-y_disease = df['disease_encoded']
-y_medicine = df['medicine_encoded'] # Note: In real life, medicine depends on disease + patient specifics. Here we simplify.
 
-# --- Model Training ---
-print("Training Disease Prediction Model...")
-rf_disease = RandomForestClassifier(n_estimators=100, random_state=42)
-rf_disease.fit(X, y_disease)
-print(f"Disease Model Accuracy: {rf_disease.score(X, y_disease):.4f}")
+def build_artifacts(model):
+    """Bundle the model with the encoders and vocabularies the API needs."""
+    le_history = LabelEncoder().fit(ALL_HISTORY)
+    le_disease = LabelEncoder().fit(ALL_DISEASES)
+    
+    # Medicine is 1:1 with disease in the knowledge base, so a lookup is exact
+    disease_to_medicine = {d: KNOWLEDGE_BASE[d]["medicine"] for d in KNOWLEDGE_BASE}
+    
+    return {
+        "model_disease": model,
+        "le_history": le_history,
+        "le_disease": le_disease,
+        "disease_to_medicine": disease_to_medicine,
+        "all_symptoms": ALL_SYMPTOMS,
+        "all_history": ALL_HISTORY
+    }
 
-# Map disease to medicine (Deterministic for this simple lookup, or train a second model)
-# For this task, we will train a second model to predict medicine directly from symptoms + history + predicted_disease
-# But actually, looking at our data, medicine is 1:1 mapped to disease in our KB. 
-# So we can just use a dictionary lookup for Disease -> Medicine to be 100% accurate to our KB.
-disease_to_medicine = {d: KNOWLEDGE_BASE[d]["medicine"] for d in KNOWLEDGE_BASE}
 
-# --- Saving ---
-artifacts = {
-    "model_disease": rf_disease,
-    "le_history": le_history,
-    "le_disease": le_disease,
-    "disease_to_medicine": disease_to_medicine,
-    "all_symptoms": ALL_SYMPTOMS,
-    "all_history": ALL_HISTORY
-}
+def main():
+    """Generate data, train and save the Quick Fix model."""
+    parser = argparse.ArgumentParser(description="Train the Quick Fix disease prediction model.")
+    parser.add_argument("--samples-per-disease", type=int, default=SAMPLES_PER_DISEASE)
+    parser.add_argument("--seed", type=int, default=SEED)
+    parser.add_argument("--n-estimators", type=int, default=100)
+    parser.add_argument("--n-jobs", type=int, default=-1, help="Training processes (-1 = all cores)")
+    parser.add_argument("--output", type=Path, default=MODEL_DIR / "quickfix_model.pkl")
+    args = parser.parse_args()
+    
+    print(f"Stats: {len(ALL_SYMPTOMS)} Symptoms, {len(ALL_HISTORY)} Conditions, {len(ALL_DISEASES)} Diseases")
+    
+    start = time.perf_counter()
+    X, y = generate_training_data(args.samples_per_disease, args.seed)
+    print(f"Generated {len(y)} samples in {time.perf_counter() - start:.2f}s")
+    
+    print("Training Disease Prediction Model...")
+    start = time.perf_counter()
+    model = train_model(X, y, args.n_estimators, args.n_jobs, args.seed)
+    print(f"Trained in {time.perf_counter() - start:.2f}s")
+    print(f"Disease Model Accuracy: {model.score(X, y):.4f}")
+    
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    with open(args.output, "wb") as f:
+        pickle.dump(build_artifacts(model), f)
+    
+    print(f"✅ Model and artifacts saved to {args.output}")
+    print("Symptoms List Sample:", ALL_SYMPTOMS[:5])
 
-output_path = os.path.join(MODEL_DIR, "quickfix_model.pkl")
-with open(output_path, "wb") as f:
-    pickle.dump(artifacts, f)
 
-print(f"✅ Model and artifacts saved to {output_path}")
-print("Symptoms List Sample:", ALL_SYMPTOMS[:5])
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,15 @@
 """Pytest configuration and fixtures."""
 import pytest
 import asyncio
+import uuid
+from datetime import datetime, timedelta
 from httpx import AsyncClient
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
 from app.main import app
-from app.database import Base, get_db
+from app.database import Base, build_engine, get_db
+from app.models.patient import Patient
 from app.schemas.patient import PatientInput, GenderEnum
+from app.services.auth import create_access_token
 
 
 # Test database URL
@@ -37,6 +41,44 @@ async def test_db():
         await conn.run_sync(Base.metadata.drop_all)
 
 
+@pytest.fixture
+async def file_session_factory(tmp_path):
+    """Empty file-backed database for code that opens its own sessions."""
+    engine = build_engine(f"sqlite+aiosqlite:///{tmp_path / 'test.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    yield async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    await engine.dispose()
+
+
+def make_patient(**overrides) -> Patient:
+    """Triaged Patient row with a client-side ID and timestamp; any column can be overridden."""
+    defaults = dict(
+        id=str(uuid.uuid4()),
+        created_at=datetime.utcnow(),
+        age=40,
+        gender="F",
+        symptoms=["headache"],
+        pre_existing=[],
+        risk_level="LOW",
+        confidence=0.9,
+        department="Outpatient / General Practice"
+    )
+    return Patient(**{**defaults, **overrides})
+
+
+def bearer(username, role):
+    """Authorization header with a short-lived token for the given user."""
+    token = create_access_token({"sub": username, "role": role}, timedelta(minutes=5))
+    return {"Authorization": f"Bearer {token}"}
+
+
+async def settle(rounds=5):
+    """Let background tasks (send loops, datagram readers) run for a few ticks."""
+    for _ in range(rounds):
+        await asyncio.sleep(0.01)
+
+
 @pytest.fixture
 async def client(test_db):
     """Create test client with test database."""
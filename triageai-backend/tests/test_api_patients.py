@@ -0,0 +1,74 @@
+"""Patient listing API tests."""
+import uuid
+from datetime import datetime, timedelta
+import pytest
+from httpx import AsyncClient
+from app.models.patient import Patient
+
+
+async def seed_patients(db, count, base_time=None):
+    """Insert patients, some sharing a timestamp to exercise the id tie-breaker."""
+    base_time = base_time or datetime(2026, 1, 1, 12, 0, 0)
+    for i in range(count):
+        db.add(Patient(
+            id=str(uuid.uuid4()),
+            created_at=base_time + timedelta(seconds=i // 2),
+            age=30 + i,
+            gender="M",
+            symptoms=["cough"],
+            pre_existing=[],
+            risk_level="HIGH" if i % 3 == 0 else "LOW",
+            confidence=0.8,
+            department="General Medicine",
+            shap_factors=[{"feature": "Age", "contribution": 0.2, "direction": "increases"}],
+            explanation="Long explanation " * 20
+        ))
+    await db.commit()
+
+
+@pytest.mark.asyncio
+async def test_keyset_pagination_visits_every_row_once(client: AsyncClient, test_db):
+    """Test following X-Next-Cursor returns each patient exactly once, newest first."""
+    await seed_patients(test_db, 11)
+
+    seen, cursor = [], None
+    while True:
+        params = {"limit": 4}
+        if cursor:
+            params["cursor"] = cursor
+        response = await client.get('/api/patients', params=params)
+        assert response.status_code == 200
+        seen.extend(response.json())
+        cursor = response.headers.get("x-next-cursor")
+        if not cursor:
+            break
+
+    assert len(seen) == 11
+    assert len({p['id'] for p in seen}) == 11
+    keys = [(p['created_at'], p['id']) for p in seen]
+    assert keys == sorted(keys, reverse=True)
+
+
+@pytest.mark.asyncio
+async def test_list_returns_slim_projection(client: AsyncClient, test_db):
+    """Test list view omits heavy columns kept on the detail endpoint."""
+    await seed_patients(test_db, 3)
+
+    response = await client.get('/api/patients', params={"risk_level": "high"})
+    data = response.json()
+
+    assert len(data) == 1
+    assert 'explanation' not in data[0]
+    assert 'shap_factors' not in data[0]
+    assert 'x-next-cursor' not in response.headers
+
+    detail = await client.get(f"/api/patients/{data[0]['id']}")
+    assert detail.json()['explanation'].startswith("Long explanation")
+
+
+@pytest.mark.asyncio
+async def test_invalid_cursor_rejected(client: AsyncClient):
+    """Test malformed cursors return 400."""
+    response = await client.get('/api/patients', params={"cursor": "not-a-cursor"})
+
+    assert response.status_code == 400
@@ -75,8 +75,13 @@ async def test_stats_empty_database(client: AsyncClient):
 
 
 @pytest.mark.asyncio
-async def test_health_check(client: AsyncClient):
-    """Test health check endpoint."""
+async def test_health_check(client: AsyncClient, monkeypatch):
+    """Test health check endpoint reports the background database probe."""
+    from app.services.health import health_prober
+    from tests.conftest import test_engine
+    monkeypatch.setattr(health_prober, "engine", test_engine)
+    await health_prober.probe()
+    
     response = await client.get('/api/health')
     
     assert response.status_code == 200
@@ -0,0 +1,130 @@
+"""Authentication API tests."""
+import pytest
+from fastapi import Depends, FastAPI
+from httpx import AsyncClient
+from passlib.context import CryptContext
+from sqlalchemy import select
+from app.api.deps import require_role
+from app.database import get_db
+from app.models.user import User
+from app.services.auth import (
+    PasswordHasher, PasswordHashBusy, token_cache, user_cache,
+    ROLE_MEDICAL_STAFF
+)
+from app.config import settings
+from app.utils.cache import TTLCache
+from tests.conftest import bearer
+
+
+@pytest.fixture(autouse=True)
+def empty_auth_caches():
+    """Start each test with cold token and user caches."""
+    token_cache.clear()
+    user_cache.clear()
+
+
+async def login(client, username, password):
+    return await client.post('/auth/login', data={"username": username, "password": password})
+
+
+@pytest.mark.asyncio
+async def test_signup_then_login(client: AsyncClient):
+    """Test passwords hashed on the executor verify on login."""
+    response = await client.post('/auth/signup', json={
+        "username": "nurse1", "password": "s3cret", "role": "MEDICAL_STAFF"
+    })
+    assert response.status_code == 200
+
+    assert (await login(client, "nurse1", "s3cret")).status_code == 200
+    assert (await login(client, "nurse1", "wrong")).status_code == 401
+    assert (await login(client, "nobody", "s3cret")).status_code == 401
+
+
+@pytest.mark.asyncio
+async def test_login_upgrades_hash_cost(client: AsyncClient, test_db):
+    """Test a hash made with a different bcrypt cost is replaced on successful login."""
+    old_hash = CryptContext(schemes=["bcrypt"], bcrypt__rounds=4).hash("s3cret")
+    test_db.add(User(username="legacy", hashed_password=old_hash, role="PATIENT"))
+    await test_db.commit()
+
+    assert (await login(client, "legacy", "s3cret")).status_code == 200
+
+    stored = (await test_db.execute(
+        select(User.hashed_password).where(User.username == "legacy").execution_options(populate_existing=True)
+    )).scalar()
+    assert stored != old_hash
+    assert stored.startswith(f"$2b${settings.BCRYPT_ROUNDS:02d}$")
+
+
+@pytest.mark.asyncio
+async def test_hasher_rejects_when_backlog_full():
+    """Test hashing beyond the pending limit fails fast instead of queueing."""
+    hasher = PasswordHasher(workers=1, max_pending=0)
+    try:
+        with pytest.raises(PasswordHashBusy):
+            await hasher.hash("s3cret")
+        assert hasher.stats()["rejected"] == 1
+    finally:
+        hasher.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_current_user_served_from_caches(client: AsyncClient, test_db):
+    """Test repeat requests with one token skip decoding and the users query."""
+    test_db.add(User(username="dr_who", hashed_password="x", role="MEDICAL_STAFF", is_doctor=True))
+    await test_db.commit()
+    headers = bearer("dr_who", "MEDICAL_STAFF")
+
+    for _ in range(3):
+        response = await client.get('/auth/me', headers=headers)
+        assert response.status_code == 200
+        assert response.json()["is_doctor"] is True
+
+    assert token_cache.stats()["hits"] == 2
+    assert user_cache.stats()["misses"] == 1
+
+
+@pytest.mark.asyncio
+async def test_invalid_or_unknown_tokens_rejected(client: AsyncClient):
+    """Test tampered tokens and deleted users get 401."""
+    assert (await client.get('/auth/me')).status_code == 401
+    assert (await client.get('/auth/me', headers={"Authorization": "Bearer nonsense"})).status_code == 401
+    assert (await client.get('/auth/me', headers=bearer("ghost", "PATIENT"))).status_code == 401
+
+
+@pytest.mark.asyncio
+async def test_require_role(test_db):
+    """Test role checks use the cached user without extra queries."""
+    test_db.add(User(username="pat", hashed_password="x", role="PATIENT"))
+    test_db.add(User(username="nurse", hashed_password="x", role="MEDICAL_STAFF"))
+    await test_db.commit()
+
+    staff_app = FastAPI()
+
+    @staff_app.get("/ward", dependencies=[Depends(require_role(ROLE_MEDICAL_STAFF))])
+    async def ward():
+        return {"ok": True}
+
+    async def override_get_db():
+        yield test_db
+
+    staff_app.dependency_overrides[get_db] = override_get_db
+    async with AsyncClient(app=staff_app, base_url="http://test") as ac:
+        assert (await ac.get("/ward", headers=bearer("nurse", "MEDICAL_STAFF"))).status_code == 200
+        assert (await ac.get("/ward", headers=bearer("pat", "PATIENT"))).status_code == 403
+
+
+def test_ttl_cache_expiry_and_lru_bound():
+    """Test entries expire on the cache clock and the oldest is evicted when full."""
+    now = [0.0]
+    cache = TTLCache(max_size=2, ttl=10, clock=lambda: now[0])
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    now[0] = 11
+    assert cache.get("a") is None
+    assert cache.stats()["evictions"] == 1
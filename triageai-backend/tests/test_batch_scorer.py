@@ -0,0 +1,123 @@
+"""Tests for offline batch scoring."""
+import io
+import json
+import pickle
+import subprocess
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.config import settings
+from app.schemas.patient import GenderEnum, PatientInput
+from app.services import batch_scorer
+from app.services.ml_service import MLService
+from app.utils.feature_engineering import build_feature_frame, build_features
+from ml.generate_data import write_dataset
+from ml.train_model import train
+
+COLUMNS = ["id", "age", "gender", "symptoms", "bp_systolic", "bp_diastolic", "heart_rate", "temperature", "spo2", "pre_existing"]
+ROWS = [
+    # BP_CRITICAL
+    ["a", 67, "M", '["chest pain", "fever"]', 188, 112, 98, 37.8, 94.0, "diabetes;hypertension"],
+    # No rule: scored by the model
+    ["b", 30, "F", "cough;fever", 118, 76, 80, 38.2, 98.0, ""],
+    ["c", 45, "Other", '["headache"]', None, None, None, None, None, "asthma"],
+    # Invalid age
+    ["d", 140, "M", "fever", 120, 80, 70, 37.0, 98.0, ""],
+]
+
+
+@pytest.fixture(scope="module")
+def model_dir(tmp_path_factory):
+    root = tmp_path_factory.mktemp("batch")
+    write_dataset(3000, root / "data", chunk_size=1000)
+    model, scaler, encoder, _ = train(root / "data")
+    for name, artifact in (("xgb_model.pkl", model), ("scaler.pkl", scaler), ("encoder.pkl", encoder)):
+        with open(root / name, "wb") as f:
+            pickle.dump(artifact, f)
+    return root
+
+
+@pytest.fixture
+def loaded_service(model_dir, monkeypatch):
+    monkeypatch.setattr(settings, "MODEL_DIR", str(model_dir))
+    monkeypatch.setattr(settings, "ML_MODEL_FILE", "xgb_model.pkl")
+    service = MLService()
+    assert service.load_models()
+    monkeypatch.setattr(batch_scorer, "ml_service", service)
+    return service
+
+
+def _patients():
+    return [
+        PatientInput(age=50, gender=GenderEnum.MALE, symptoms=["chest pain", "fever"], bp_systolic=140,
+                     bp_diastolic=90, heart_rate=85, temperature=38.5, spo2=96.0, pre_existing=["diabetes"]),
+        PatientInput(age=22, gender=GenderEnum.FEMALE, symptoms=["Shortness of Breath"], pre_existing=[]),
+    ]
+
+
+def test_build_feature_frame_matches_build_features():
+    patients = _patients()
+    frame = build_feature_frame(patients)
+    expected = pd.concat([build_features(p) for p in patients], ignore_index=True)
+    pd.testing.assert_frame_equal(frame, expected)
+    assert frame["symptom_shortness_of_breath"].tolist() == [0, 1]
+    assert frame["bp_systolic"].tolist() == [140, 120]
+
+
+def test_parse_row_accepts_json_and_separated_lists():
+    record = dict(zip(COLUMNS, ROWS[0]))
+    patient = batch_scorer.parse_row(record)
+    assert patient.symptoms == ["chest pain", "fever"]
+    assert patient.pre_existing == ["diabetes", "hypertension"]
+
+    record = dict(zip(COLUMNS, ROWS[2]))
+    record["bp_systolic"] = float("nan")
+    assert batch_scorer.parse_row(record).bp_systolic is None
+
+
+def test_predict_batch_matches_single_prediction(loaded_service):
+    patients = _patients()
+    risk_levels, confidences, top_factors = loaded_service.predict_batch(build_feature_frame(patients))
+    for patient, risk_level, confidence, factors in zip(patients, risk_levels, confidences, top_factors):
+        single_risk, single_confidence, _ = loaded_service.predict_with_shap(patient)
+        assert risk_level == single_risk
+        assert np.isclose(confidence, single_confidence)
+        assert len(factors) == 3
+        assert factors[0].contribution >= factors[-1].contribution
+
+
+@pytest.mark.parametrize("approx_factors", [False, True])
+def test_score_file_writes_rules_model_and_errors(loaded_service, tmp_path, approx_factors):
+    source = tmp_path / "patients.csv"
+    pd.DataFrame(ROWS, columns=COLUMNS).to_csv(source, index=False)
+    output = io.StringIO()
+
+    counts = batch_scorer.score_file(source, output, chunk_size=2, approx_factors=approx_factors)
+
+    assert counts == {"rows": 4, "rules": 1, "errors": 1}
+    result = pd.read_csv(io.StringIO(output.getvalue()), dtype={"id": str})
+    assert result["row"].tolist() == [0, 1, 2, 3]
+    assert result["id"].tolist() == ["a", "b", "c", "d"]
+
+    assert result.loc[0, "rule_triggered"] == "BP_CRITICAL"
+    assert result.loc[0, "confidence"] == 1.0
+    for i in (1, 2):
+        assert result.loc[i, "risk_level"] in ("HIGH", "MEDIUM", "LOW")
+        assert pd.isna(result.loc[i, "rule_triggered"])
+        assert len(json.loads(result.loc[i, "top_factors"])) == 3
+    assert "age" in result.loc[3, "error"]
+    assert pd.isna(result.loc[3, "risk_level"])
+
+
+def test_import_does_not_load_app_services():
+    """Test worker processes import the scorer without the database or live services."""
+    loaded = subprocess.run(
+        [sys.executable, "-c", "import sys, app.services.batch_scorer; print(' '.join(sys.modules))"],
+        capture_output=True, text=True, check=True
+    ).stdout.split()
+
+    for module in ("app.database", "app.services.triage_service", "app.services.realtime", "app.services.gemini_service"):
+        assert module not in loaded
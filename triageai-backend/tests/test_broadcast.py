@@ -0,0 +1,106 @@
+"""Cross-worker broadcast backend tests."""
+import socket
+import pytest
+from app.services.broadcast import UnixSocketBackend, create_backend
+from tests.conftest import settle
+
+
+class Worker:
+    """Records events delivered to one simulated worker's manager."""
+
+    def __init__(self, socket_dir, worker_id, clients=True, on_gap=None):
+        self.events = []
+        self.backend = UnixSocketBackend(
+            deliver=lambda *event: self.events.append(event),
+            has_local_clients=lambda: clients,
+            socket_dir=str(socket_dir),
+            worker_id=worker_id,
+            on_gap=on_gap
+        )
+
+
+@pytest.mark.asyncio
+async def test_unix_backend_fans_out_to_peer_workers(tmp_path):
+    """Test an event published in one worker is delivered locally and by every peer."""
+    workers = [Worker(tmp_path, str(i)) for i in range(3)]
+    for worker in workers:
+        await worker.backend.start()
+    await settle()  # Earlier workers learn of later ones from their hello
+    try:
+        workers[0].backend.publish('{"type": "triage"}', "Cardiology", "HIGH", "patient:1")
+        await settle()
+
+        for worker in workers:
+            assert worker.events == [('{"type": "triage"}', "Cardiology", "HIGH", "patient:1")]
+        assert workers[0].backend.sent == 2
+    finally:
+        for worker in workers:
+            await worker.backend.stop()
+
+    assert not list(tmp_path.glob("*.sock"))
+
+
+@pytest.mark.asyncio
+async def test_unix_backend_removes_stale_peer_sockets(tmp_path):
+    """Test sockets left behind by crashed workers are removed when a send to them fails."""
+    stale = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+    stale.bind(str(tmp_path / "worker-dead.sock"))
+    stale.close()
+
+    worker = Worker(tmp_path, "live", clients=False)
+    await worker.backend.start()
+    try:
+        # The hello announced on start already hit the dead socket
+        assert worker.backend.stale_peers_removed == 1
+        assert not worker.backend.has_subscribers()
+        worker.backend.publish("{}", "General", "LOW")
+        assert worker.backend.sent == 0
+    finally:
+        await worker.backend.stop()
+
+
+@pytest.mark.asyncio
+async def test_unix_backend_reports_sequence_gaps(tmp_path):
+    """Test a receiver notices a lost datagram from the sender's sequence numbers."""
+    gaps = []
+    sender = Worker(tmp_path, "a")
+    receiver = Worker(tmp_path, "b", on_gap=lambda: gaps.append(1))
+    await sender.backend.start()
+    await receiver.backend.start()
+    await settle()
+    try:
+        sender.backend.publish("one", "General", "LOW", "queue:1")
+        await settle()
+        sender.backend._seq += 1  # As if the next datagram was dropped
+        sender.backend.publish("three", "General", "LOW", "queue:3")
+        await settle()
+
+        assert [event[0] for event in receiver.events] == ["one", "three"]
+        assert gaps == [1]
+        assert receiver.backend.stats()["gaps"] == 1
+    finally:
+        await sender.backend.stop()
+        await receiver.backend.stop()
+
+
+@pytest.mark.asyncio
+async def test_unix_backend_caches_peer_list(tmp_path, monkeypatch):
+    """Test publishing does not list the socket directory every time."""
+    worker = Worker(tmp_path, "a", clients=False)
+    await worker.backend.start()
+    listings = []
+    original_glob = type(tmp_path).glob
+    monkeypatch.setattr(type(tmp_path), "glob", lambda self, pattern: listings.append(1) or original_glob(self, pattern))
+    try:
+        for _ in range(10):
+            worker.backend.has_subscribers()
+            worker.backend.publish("{}", "General", "LOW")
+        assert listings == []
+    finally:
+        await worker.backend.stop()
+
+
+def test_unknown_backend_rejected():
+    """Test a misconfigured backend name fails loudly."""
+    with pytest.raises(ValueError):
+        create_backend("redis", deliver=lambda *event: None, has_local_clients=lambda: False)
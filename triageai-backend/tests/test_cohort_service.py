@@ -0,0 +1,74 @@
+"""Cohort query tests."""
+import uuid
+from datetime import datetime
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import select
+from app.models.patient import Patient
+from app.services.cohort_service import backfill_masks
+
+
+def make_patient(symptoms, conditions, risk_level="HIGH", masks=True):
+    """Helper to build a patient row, optionally without masks (pre-upgrade row)."""
+    from app.utils.feature_engineering import symptom_mask, condition_mask
+    
+    return Patient(
+        id=str(uuid.uuid4()),
+        created_at=datetime.utcnow(),
+        age=60,
+        gender="M",
+        symptoms=symptoms,
+        pre_existing=conditions,
+        symptom_mask=symptom_mask(symptoms) if masks else None,
+        condition_mask=condition_mask(conditions) if masks else None,
+        risk_level=risk_level,
+        confidence=0.9,
+        department="Emergency"
+    )
+
+
+@pytest.mark.asyncio
+async def test_cohort_counts_use_bitmasks(client: AsyncClient, test_db):
+    """Test all/any matching and risk filtering."""
+    test_db.add_all([
+        make_patient(["chest pain", "fever"], ["diabetes"]),
+        make_patient(["chest pain"], ["diabetes", "hypertension"]),
+        make_patient(["chest pain"], ["hypertension"]),
+        make_patient(["cough"], ["diabetes"], risk_level="LOW"),
+    ])
+    await test_db.commit()
+
+    both = await client.get('/api/stats/cohort', params={
+        'symptoms': 'chest_pain', 'conditions': 'diabetes', 'risk_level': 'HIGH'
+    })
+    either = await client.get('/api/stats/cohort', params={
+        'symptoms': ['fever', 'cough'], 'match': 'any'
+    })
+
+    assert both.status_code == 200
+    assert both.json()['count'] == 2
+    assert either.json()['count'] == 2
+
+
+@pytest.mark.asyncio
+async def test_cohort_rejects_unknown_symptom(client: AsyncClient):
+    """Test names outside the canonical vocabulary return 400."""
+    response = await client.get('/api/stats/cohort', params={'symptoms': 'sneezing'})
+
+    assert response.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_backfill_fills_missing_masks(test_db):
+    """Test rows written before the mask columns get masks computed."""
+    from app.utils.feature_engineering import symptom_mask
+
+    test_db.add(make_patient(["seizure"], ["stroke history"], masks=False))
+    await test_db.commit()
+
+    assert await backfill_masks(test_db) == 1
+    assert await backfill_masks(test_db) == 0
+
+    stored = (await test_db.execute(select(Patient.symptom_mask, Patient.condition_mask))).one()
+    assert stored.symptom_mask == symptom_mask(["seizure"])
+    assert stored.condition_mask != 0
@@ -0,0 +1,97 @@
+"""Tests for pruning and distilling the triage model to a latency budget."""
+import pickle
+
+import numpy as np
+import xgboost as xgb
+
+from app.config import settings
+from app.schemas.patient import GenderEnum, PatientInput
+from app.services.ml_service import MLService
+from ml.compress import choose, compress, pareto_front, prune_rounds, report_rows, tree_depth
+from ml.generate_data import write_dataset
+from ml.search import load_booster
+from ml.train_model import booster_to_classifier, train
+
+
+def _candidate(name, size_kb, latency, accuracy, high_recall=0.99):
+    return {
+        "name": name, "size_kb": size_kb, "latency_p50_ms": latency,
+        "val_accuracy": accuracy, "val_high_recall": high_recall,
+    }
+
+
+def test_prune_rounds_excludes_full_model():
+    assert prune_rounds(200) == [10, 20, 50, 100, 150]
+    assert prune_rounds(4) == [1, 2, 3]
+
+
+def test_tree_depth_survives_pickled_model():
+    """Test depth comes from the trees, not the training config lost on reload."""
+    rng = np.random.RandomState(0)
+    X = rng.rand(300, 5)
+    y = (X[:, 0] + X[:, 1] > 1).astype(int)
+    booster = xgb.train({"max_depth": 3, "objective": "binary:logistic"}, xgb.DMatrix(X, label=y), num_boost_round=5)
+
+    reloaded = pickle.loads(pickle.dumps(booster_to_classifier(booster))).get_booster()
+
+    assert tree_depth(booster) == 3
+    assert tree_depth(reloaded) == 3
+
+
+def test_pareto_front_drops_dominated_candidates():
+    results = [
+        _candidate("big", 900, 0.30, 0.99),
+        _candidate("small", 100, 0.10, 0.95),
+        _candidate("worse", 200, 0.20, 0.94),
+    ]
+    assert [r["name"] for r in pareto_front(results)] == ["big", "small"]
+
+
+def test_choose_respects_budget_and_recall_floor():
+    results = [
+        _candidate("big", 900, 0.30, 0.99),
+        _candidate("fast-but-misses-high", 100, 0.10, 0.97, high_recall=0.90),
+        _candidate("fast", 200, 0.12, 0.96),
+    ]
+    assert choose(results, 0.2, 0.95)["name"] == "fast"
+    assert choose(results, 1.0, 0.95)["name"] == "big"
+    assert choose(results, 0.05, 0.95) is None
+
+
+def test_compress_builds_candidates_mlservice_can_load(tmp_path, monkeypatch):
+    """Test end to end: train, compress, save the choice, load it in MLService."""
+    data_dir, model_dir = tmp_path / "data", tmp_path / "models"
+    model_dir.mkdir()
+    write_dataset(3000, data_dir, chunk_size=1000)
+    model, scaler, encoder, _ = train(data_dir)
+    for name, artifact in (("xgb_model.pkl", model), ("scaler.pkl", scaler), ("encoder.pkl", encoder)):
+        with open(model_dir / name, "wb") as f:
+            pickle.dump(artifact, f)
+
+    results = compress(data_dir, model_dir, student_depths=(2,), student_rounds=(20,), latency_repeats=20)
+
+    names = [r["name"] for r in results]
+    assert names[0] == "original"
+    assert "distill-d2-r20" in names
+    assert any(name.startswith("prune-") for name in names)
+    original = results[0]
+    assert all(r["size_kb"] < original["size_kb"] for r in results[1:])
+
+    selected = choose(results, latency_budget_ms=float("inf"), recall_floor=0.0)
+    rows = report_rows(results, selected)
+    assert sum(row["selected"] for row in rows) == 1
+    assert all("model" not in row for row in rows)
+
+    with open(model_dir / "compact.pkl", "wb") as f:
+        pickle.dump(booster_to_classifier(load_booster(selected["model"])), f)
+    monkeypatch.setattr(settings, "MODEL_DIR", str(model_dir))
+    monkeypatch.setattr(settings, "ML_MODEL_FILE", "compact.pkl")
+    service = MLService()
+    assert service.load_models()
+
+    risk_level, confidence, _ = service.predict_with_shap(PatientInput(
+        age=67, gender=GenderEnum.MALE, symptoms=["chest pain"], bp_systolic=188, bp_diastolic=112,
+        heart_rate=98, temperature=37.8, spo2=94.0, pre_existing=["diabetes"]
+    ))
+    assert risk_level in ("HIGH", "MEDIUM", "LOW")
+    assert 0 < confidence <= 1
@@ -0,0 +1,134 @@
+"""Database tuning profile tests."""
+import pytest
+from sqlalchemy import text
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from app.database import build_engine
+
+
+@pytest.mark.asyncio
+async def test_sqlite_pragmas_applied(tmp_path):
+    """Test every new connection gets the tuning profile."""
+    engine = build_engine(f"sqlite+aiosqlite:///{tmp_path / 'tuned.db'}")
+    try:
+        async with engine.connect() as conn:
+            journal_mode = (await conn.execute(text("PRAGMA journal_mode"))).scalar()
+            synchronous = (await conn.execute(text("PRAGMA synchronous"))).scalar()
+            busy_timeout = (await conn.execute(text("PRAGMA busy_timeout"))).scalar()
+
+        assert journal_mode == "wal"
+        assert synchronous == 1  # NORMAL
+        assert busy_timeout == 5000
+        assert isinstance(engine.pool, AsyncAdaptedQueuePool)
+    finally:
+        await engine.dispose()
+
+
+def test_memory_database_keeps_static_pool():
+    """Test in-memory databases are not given a connection pool."""
+    engine = build_engine("sqlite+aiosqlite:///:memory:")
+
+    assert not isinstance(engine.pool, AsyncAdaptedQueuePool)
+
+
+@pytest.mark.asyncio
+async def test_missing_columns_added_to_existing_tables(tmp_path):
+    """Test databases from earlier releases gain newly added columns."""
+    from app.database import _add_missing_columns
+    from app.models.patient import Patient  # noqa: F401 - registers the table
+
+    engine = build_engine(f"sqlite+aiosqlite:///{tmp_path / 'legacy.db'}")
+    try:
+        async with engine.begin() as conn:
+            await conn.execute(text("CREATE TABLE patients (id VARCHAR PRIMARY KEY, age INTEGER)"))
+            await conn.run_sync(_add_missing_columns)
+            columns = {row[1] for row in (await conn.execute(text("PRAGMA table_info(patients)"))).all()}
+
+        assert {"symptom_mask", "condition_mask", "risk_level"} <= columns
+    finally:
+        await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_new_status_column_discharges_existing_patients(tmp_path):
+    """Test patients triaged before the queue existed are not loaded into it on upgrade."""
+    from app.database import _add_missing_columns
+    from app.models.patient import Patient  # noqa: F401 - registers the table
+
+    engine = build_engine(f"sqlite+aiosqlite:///{tmp_path / 'legacy.db'}")
+    try:
+        async with engine.begin() as conn:
+            await conn.execute(text("CREATE TABLE patients (id VARCHAR PRIMARY KEY, age INTEGER)"))
+            await conn.execute(text("INSERT INTO patients (id, age) VALUES ('old', 40)"))
+            await conn.run_sync(_add_missing_columns)
+            await conn.execute(text("INSERT INTO patients (id, age) VALUES ('new', 50)"))
+            rows = dict((await conn.execute(text("SELECT id, status FROM patients"))).all())
+
+        assert rows == {"old": "DISCHARGED", "new": "WAITING"}
+    finally:
+        await engine.dispose()
+
+
+def test_upsert_insert_follows_session_dialect():
+    """Test counter upserts use the dialect's INSERT and unsupported databases are refused."""
+    from types import SimpleNamespace
+    from sqlalchemy.dialects import postgresql
+    from app.database import check_upsert_support, upsert_insert
+    from app.models.stats import TriageCounter
+
+    def session_for(name):
+        return SimpleNamespace(get_bind=lambda: SimpleNamespace(dialect=SimpleNamespace(name=name)))
+
+    stmt = upsert_insert(session_for("postgresql"), TriageCounter).values(dimension="total", key="total", count=1)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[TriageCounter.dimension, TriageCounter.key],
+        set_={"count": TriageCounter.count + stmt.excluded.count}
+    )
+    assert "ON CONFLICT (dimension, key) DO UPDATE" in str(stmt.compile(dialect=postgresql.dialect()))
+
+    with pytest.raises(RuntimeError):
+        check_upsert_support("mysql")
+
+
+@pytest.mark.asyncio
+async def test_keyset_pages_span_legacy_and_new_timestamps(tmp_path):
+    """Test second-precision timestamps from the old server default page in order with new rows."""
+    from datetime import datetime
+    from sqlalchemy import select
+    from sqlalchemy.ext.asyncio import async_sessionmaker
+    from app.database import Base, _normalize_sqlite_timestamps
+    from app.models.patient import Patient
+    from app.utils.pagination import apply_keyset, encode_cursor
+    from tests.conftest import make_patient
+
+    engine = build_engine(f"sqlite+aiosqlite:///{tmp_path / 'legacy.db'}")
+    try:
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+            for patient_id in ("old-a", "old-b"):
+                await conn.execute(text(
+                    "INSERT INTO patients (id, age, gender, symptoms, pre_existing, risk_level, confidence, department, created_at) "
+                    "VALUES (:id, 40, 'Male', '[]', '[]', 'LOW', 0.9, 'General Medicine', '2024-01-01 10:00:00')"
+                ), {"id": patient_id})
+        async with async_sessionmaker(engine)() as session:
+            session.add_all([
+                make_patient(id="new-a", created_at=datetime(2024, 1, 1, 10, 0, 0)),
+                make_patient(id="new-b", created_at=datetime(2024, 1, 1, 10, 0, 0, 500)),
+            ])
+            await session.commit()
+        async with engine.begin() as conn:
+            await conn.run_sync(_normalize_sqlite_timestamps)
+
+        async with async_sessionmaker(engine)() as session:
+            for descending in (True, False):
+                seen, cursor = [], None
+                while True:
+                    query = apply_keyset(select(Patient.id, Patient.created_at), cursor, descending).limit(1)
+                    row = (await session.execute(query)).first()
+                    if row is None:
+                        break
+                    seen.append(row.id)
+                    cursor = encode_cursor(row.created_at, row.id)
+                expected = ["new-a", "old-a", "old-b", "new-b"]
+                assert seen == (expected[::-1] if descending else expected)
+    finally:
+        await engine.dispose()
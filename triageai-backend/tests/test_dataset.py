@@ -0,0 +1,75 @@
+"""Tests for the sharded training data format and streaming trainer."""
+import numpy as np
+import pandas as pd
+import pytest
+import xgboost as xgb
+
+from ml.dataset import ShardIter, ShardWriter, convert_csv, iter_shards, load_manifest, read_frame
+from ml.generate_data import generate_patient_data, write_dataset
+from ml.train_model import evaluate, train
+
+
+def test_shard_round_trip(tmp_path):
+    """Test chunks written as shards read back as the same frame."""
+    df = generate_patient_data(500, rng=np.random.RandomState(1))
+    writer = ShardWriter(tmp_path / "train")
+    writer.write(df.iloc[:200])
+    writer.write(df.iloc[200:])
+    manifest = writer.close()
+
+    assert manifest["rows"] == 500
+    assert [shard["rows"] for shard in manifest["shards"]] == [200, 300]
+    assert [X.shape[0] for X, _ in iter_shards(tmp_path / "train")] == [200, 300]
+
+    frame = read_frame(tmp_path, "train")
+    assert list(frame.columns) == list(df.columns)
+    assert (frame["risk_level"].values == df["risk_level"].values).all()
+    np.testing.assert_allclose(frame["age"], df["age"])
+
+
+def test_writer_rejects_unknown_label(tmp_path):
+    df = generate_patient_data(10, rng=np.random.RandomState(1))
+    df.loc[0, "risk_level"] = "CRITICAL"
+    with pytest.raises(ValueError):
+        ShardWriter(tmp_path / "train").write(df)
+
+
+def test_convert_csv_matches_direct_write(tmp_path):
+    """Test CSV splits convert to the shards generate_data would have written."""
+    write_dataset(600, tmp_path / "csv", chunk_size=250, data_format="csv")
+    write_dataset(600, tmp_path / "npy", chunk_size=250)
+
+    rows = convert_csv(tmp_path / "csv", chunk_size=100)
+
+    assert rows == {"train": 420, "val": 90, "test": 90}
+    for split in rows:
+        pd.testing.assert_frame_equal(read_frame(tmp_path / "csv", split), read_frame(tmp_path / "npy", split))
+
+
+def test_read_frame_falls_back_to_csv(tmp_path):
+    write_dataset(200, tmp_path, data_format="csv")
+    assert len(read_frame(tmp_path, "test")) == 30
+
+
+def test_shard_iter_feeds_quantile_dmatrix(tmp_path):
+    write_dataset(900, tmp_path, chunk_size=200)
+    dtrain = xgb.QuantileDMatrix(ShardIter(tmp_path / "train"))
+    assert dtrain.num_row() == 630
+    assert dtrain.num_col() == len(load_manifest(tmp_path / "train")["feature_names"])
+
+
+@pytest.mark.parametrize("external_memory", [False, True])
+def test_train_streams_shards(tmp_path, external_memory):
+    """Test the trainer returns the XGBClassifier/scaler pair MLService loads."""
+    write_dataset(3000, tmp_path / "data", chunk_size=700)
+
+    model, scaler, encoder, feature_names = train(
+        tmp_path / "data", external_memory=external_memory, cache_dir=str(tmp_path)
+    )
+
+    assert list(encoder.classes_) == ["HIGH", "LOW", "MEDIUM"]
+    test = read_frame(tmp_path / "data", "test")
+    proba = model.predict_proba(scaler.transform(test[feature_names]))
+    assert proba.shape == (len(test), 3)
+    y_true, y_pred = evaluate(model, scaler, tmp_path / "data" / "test")
+    assert (y_true == y_pred).mean() > 0.85
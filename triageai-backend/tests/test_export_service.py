@@ -0,0 +1,94 @@
+"""Bulk export tests."""
+import csv
+import io
+import json
+from datetime import datetime, timedelta
+import pytest
+from httpx import AsyncClient
+from app.database import get_session_factory
+from app.main import app
+from app.services.export_service import EXPORT_COLUMNS, export_patients
+from tests.conftest import make_patient
+
+
+@pytest.fixture
+async def session_factory(file_session_factory):
+    """File-backed database seeded with 25 patients."""
+    base_time = datetime(2026, 3, 1, 8, 0, 0)
+    async with file_session_factory() as session:
+        session.add_all([
+            make_patient(
+                created_at=base_time + timedelta(minutes=i),
+                age=20 + i,
+                symptoms=["fever", "cough"],
+                pre_existing=["asthma"] if i % 2 else [],
+                risk_level="HIGH" if i % 5 == 0 else "LOW",
+                confidence=0.75,
+                department="Internal Medicine",
+                shap_factors=[{"feature": "Fever", "contribution": 0.3, "direction": "increases"}],
+                explanation="Explanation"
+            )
+            for i in range(25)
+        ])
+        await session.commit()
+    return file_session_factory
+
+
+async def collect(export_format, factory, **kwargs):
+    return b"".join([chunk async for chunk in export_patients(export_format, factory, batch_size=10, **kwargs)])
+
+
+@pytest.mark.asyncio
+async def test_ndjson_export_is_complete_and_ordered(session_factory):
+    """Test every row is exported once, oldest first, across batches."""
+    lines = (await collect("ndjson", session_factory)).decode().splitlines()
+    rows = [json.loads(line) for line in lines]
+
+    assert len(rows) == 25
+    assert [r["age"] for r in rows] == list(range(20, 45))
+    assert rows[0]["symptoms"] == ["fever", "cough"]
+
+
+@pytest.mark.asyncio
+async def test_csv_export_filters(session_factory):
+    """Test date range and risk level filters."""
+    data = await collect(
+        "csv", session_factory,
+        start=datetime(2026, 3, 1, 8, 5), end=datetime(2026, 3, 1, 8, 20), risk_level="HIGH"
+    )
+    rows = list(csv.DictReader(io.StringIO(data.decode())))
+
+    assert [int(r["age"]) for r in rows] == [25, 30, 35]
+    assert json.loads(rows[0]["shap_factors"])[0]["feature"] == "Fever"
+
+
+@pytest.mark.asyncio
+async def test_parquet_export_round_trips(session_factory):
+    """Test Parquet output is readable with one row group per batch."""
+    pq = pytest.importorskip("pyarrow.parquet")
+
+    data = await collect("parquet", session_factory)
+    parquet_file = pq.ParquetFile(io.BytesIO(data))
+
+    assert parquet_file.metadata.num_rows == 25
+    assert parquet_file.metadata.num_row_groups == 3
+    assert parquet_file.read().column("age").to_pylist() == list(range(20, 45))
+    assert parquet_file.schema_arrow.names == EXPORT_COLUMNS
+    assert json.loads(parquet_file.read().column("shap_factors")[0].as_py())[0]["feature"] == "Fever"
+
+
+@pytest.mark.asyncio
+async def test_export_endpoint_streams(session_factory):
+    """Test the HTTP endpoint streams with an attachment filename."""
+    app.dependency_overrides[get_session_factory] = lambda: session_factory
+    try:
+        async with AsyncClient(app=app, base_url="http://test") as client:
+            response = await client.get('/api/patients/export', params={'format': 'ndjson', 'risk_level': 'high'})
+            bad = await client.get('/api/patients/export', params={'format': 'xml'})
+    finally:
+        app.dependency_overrides.clear()
+
+    assert response.status_code == 200
+    assert 'patients.ndjson' in response.headers['content-disposition']
+    assert len(response.text.splitlines()) == 5
+    assert bad.status_code == 400
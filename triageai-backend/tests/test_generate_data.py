@@ -0,0 +1,50 @@
+"""Synthetic data generator tests."""
+import numpy as np
+import pandas as pd
+from ml.generate_data import (
+    assign_risk_label, assign_risk_labels, generate_patient_data, iter_chunks, write_dataset
+)
+
+
+def test_vectorized_labels_match_row_rules():
+    """Test assign_risk_labels agrees with assign_risk_label on random data."""
+    df = generate_patient_data(20000, np.random.RandomState(7))
+
+    expected = df.apply(assign_risk_label, axis=1).to_numpy()
+
+    np.testing.assert_array_equal(assign_risk_labels(df), expected)
+
+
+def test_vectorized_labels_match_at_thresholds():
+    """Test rule boundaries (strict vs inclusive comparisons) are identical."""
+    df = generate_patient_data(16, np.random.RandomState(0))
+    df['age'] = [50, 51, 65, 66] * 4
+    df['spo2'] = [90, 89.9, 94, 93.9] * 4
+    df['bp_systolic'] = [180, 181, 140, 141] * 4
+    df['heart_rate'] = [50, 49, 120, 121] * 4
+    df['temperature'] = [40, 40.1, 38.5, 38.6] * 4
+    df['symptom_count'] = [2, 3] * 8
+
+    expected = df.apply(assign_risk_label, axis=1).to_numpy()
+
+    np.testing.assert_array_equal(assign_risk_labels(df), expected)
+
+
+def test_chunks_independent_of_worker_count():
+    """Test parallel generation yields the same rows in the same order."""
+    serial = pd.concat(df for _, df in iter_chunks(2500, chunk_size=1000, workers=1))
+    parallel = pd.concat(df for _, df in iter_chunks(2500, chunk_size=1000, workers=2))
+
+    assert len(serial) == 2500
+    pd.testing.assert_frame_equal(serial, parallel)
+
+
+def test_write_dataset_streams_splits(tmp_path):
+    """Test chunked writing produces 70/15/15 CSV splits with one header each."""
+    rows, risk_counts = write_dataset(1000, tmp_path, chunk_size=300, data_format="csv")
+
+    assert rows == {"train": 700, "val": 150, "test": 150}
+    assert risk_counts.sum() == 1000
+    train = pd.read_csv(tmp_path / "train.csv")
+    assert len(train) == 700
+    assert "risk_level" in train.columns
@@ -0,0 +1,202 @@
+"""Health probe, ML warm-up and Gemini circuit breaker tests."""
+import asyncio
+import time
+
+import pytest
+from httpx import AsyncClient
+
+from app.services.gemini_service import GeminiService
+from app.services.health import HealthProber, health_prober
+from app.services.ml_service import MLService, ml_service
+from app.utils.circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker
+from tests.conftest import test_engine
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_breaker_opens_then_half_opens_for_one_trial():
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=30, clock=clock)
+
+    breaker.record_failure()
+    assert breaker.state == CLOSED and breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == OPEN and not breaker.allow()
+
+    clock.now = 30.0
+    assert breaker.state == HALF_OPEN
+    assert breaker.allow()
+    assert not breaker.allow()  # Only one trial at a time
+    breaker.record_failure()
+    assert breaker.state == OPEN
+
+    clock.now = 60.0
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == CLOSED
+    assert breaker.stats() == {"state": CLOSED, "consecutive_failures": 0, "opens": 2, "rejected": 2}
+
+
+def test_breaker_expires_unfinished_trial():
+    """Test a trial call whose outcome is never recorded does not wedge the circuit half-open."""
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10, clock=clock)
+    breaker.record_failure()
+    clock.now = 10.0
+    assert breaker.allow()
+    assert not breaker.allow()
+    clock.now = 20.0
+    assert breaker.allow()
+
+
+def test_warm_up_gates_ml_readiness():
+    service = MLService()
+    assert not service.warm_up()
+
+    service.model = object()
+    service.predict_with_shap = lambda patient: (_ for _ in ()).throw(ValueError("feature mismatch"))
+    assert not service.warm_up() and not service.is_ready()
+
+    service.predict_with_shap = lambda patient: ("LOW", 0.9, [])
+    assert service.warm_up() and service.is_ready()
+
+
+@pytest.mark.asyncio
+async def test_background_warm_up_is_awaited_on_shutdown(capsys):
+    """Test startup warm-up runs off the loop, shutdown waits for it and failures are logged."""
+    service = MLService()
+    service.model = object()
+
+    def slow_predict(patient):
+        time.sleep(0.05)
+        return ("LOW", 0.9, [])
+
+    service.predict_with_shap = slow_predict
+    service.start_warm_up()
+    assert not service.is_ready()
+    await service.stop_warm_up()
+    assert service.is_ready()
+
+    service.warm_up = lambda: (_ for _ in ()).throw(RuntimeError("boom"))
+    await asyncio.wait([service.start_warm_up()])
+    assert "ML warm-up crashed: RuntimeError('boom')" in capsys.readouterr().out
+
+
+class FailingModel:
+    def __init__(self):
+        self.calls = 0
+
+    async def generate_content_async(self, prompt):
+        self.calls += 1
+        raise TimeoutError("deadline exceeded")
+
+
+@pytest.mark.asyncio
+async def test_open_gemini_circuit_skips_calls(sample_patient_normal):
+    """Test repeated Gemini failures stop further calls and still return the fallback text."""
+    service = GeminiService()
+    service.model = FailingModel()
+    service.available = True
+    service.breaker = CircuitBreaker(failure_threshold=2, reset_timeout=60)
+
+    for _ in range(4):
+        explanation = await service.generate_explanation(sample_patient_normal, "LOW", "General Medicine", [])
+        assert "LOW RISK" in explanation
+
+    assert service.model.calls == 2
+    assert service.circuit_state() == OPEN
+
+
+class HangingModel:
+    async def generate_content_async(self, prompt):
+        await asyncio.sleep(60)
+
+
+@pytest.mark.asyncio
+async def test_gemini_timeouts_trip_the_circuit(sample_patient_normal, monkeypatch):
+    """Test a hanging Gemini call times out, counts as a failure and falls back."""
+    from app.config import settings
+    monkeypatch.setattr(settings, "GEMINI_TIMEOUT_SECONDS", 0.01)
+    service = GeminiService()
+    service.model = HangingModel()
+    service.available = True
+    service.breaker = CircuitBreaker(failure_threshold=1, reset_timeout=60)
+
+    explanation = await service.generate_explanation(sample_patient_normal, "LOW", "General Medicine", [])
+
+    assert "LOW RISK" in explanation
+    assert service.circuit_state() == OPEN
+
+
+@pytest.mark.asyncio
+async def test_ehr_parse_timeout_is_unavailable(monkeypatch):
+    """Test a hanging vision call raises GeminiUnavailable (503) and counts against the circuit."""
+    from app.config import settings
+    from app.services import ehr_parser
+    from app.services.gemini_service import GeminiUnavailable, gemini_service
+    monkeypatch.setattr(settings, "GEMINI_API_KEY", "test-key")
+    monkeypatch.setattr(settings, "GEMINI_TIMEOUT_SECONDS", 0.01)
+    monkeypatch.setattr(ehr_parser.genai, "configure", lambda **kwargs: None)
+    monkeypatch.setattr(ehr_parser.genai, "GenerativeModel", lambda name: HangingModel())
+    monkeypatch.setattr(gemini_service, "breaker", CircuitBreaker(failure_threshold=5, reset_timeout=60))
+
+    with pytest.raises(GeminiUnavailable):
+        await ehr_parser.parse_ehr_document(b"%PDF", "application/pdf")
+    assert gemini_service.breaker.failures == 1
+
+
+@pytest.mark.asyncio
+async def test_prober_caches_database_state():
+    clock = FakeClock()
+    prober = HealthProber(engine=test_engine, interval=10, timeout=1, clock=clock)
+    assert prober.database_status() == "unknown"
+
+    await prober.probe()
+    clock.now = 25.0
+    assert prober.database_status() == "connected"
+    clock.now = 31.0
+    assert prober.database_status() == "stale"
+
+    broken = HealthProber(engine=test_engine, interval=10, timeout=1, clock=clock)
+    broken._select_one = _raise
+    await broken.probe()
+    assert broken.database_status() == "error"
+    assert broken.last_error == "database is down"
+
+
+async def _raise():
+    raise OSError("database is down")
+
+
+@pytest.mark.asyncio
+async def test_readiness_waits_for_warm_model(client: AsyncClient, monkeypatch):
+    """Test /ready is 503 until the model is warmed up while /live always answers, without DB queries."""
+    monkeypatch.setattr(health_prober, "engine", test_engine)
+    await health_prober.probe()
+    monkeypatch.setattr(ml_service, "model", object())
+    monkeypatch.setattr(ml_service, "warmed_up", False)
+
+    async def no_queries():
+        raise AssertionError("probe endpoints must not touch the database")
+
+    monkeypatch.setattr(health_prober, "_select_one", no_queries)
+
+    live = await client.get("/api/health/live")
+    warming = await client.get("/api/health/ready")
+    monkeypatch.setattr(ml_service, "warmed_up", True)
+    ready = await client.get("/api/health/ready")
+
+    assert live.status_code == 200 and live.json() == {"status": "alive"}
+    assert warming.status_code == 503
+    assert warming.json()["status"] == "not_ready"
+    assert warming.json()["model_loaded"] is True
+    assert ready.status_code == 200
+    assert ready.json()["ready"] is True
+    assert ready.json()["database"] == "connected"
+    assert ready.json()["gemini_circuit"] == CLOSED
@@ -0,0 +1,38 @@
+"""Benchmark baseline comparison tests."""
+from benchmarks.hot_paths import compare, make_patients, measure, threshold_for
+
+
+def _document(**p50s):
+    return {"results": {key.replace("_at_", "@"): {"p50_ms": value} for key, value in p50s.items()}}
+
+
+def test_compare_flags_regressions_beyond_threshold():
+    baseline = _document(evaluate_rules_at_1=1.0, db_insert_at_16=10.0, quick_fix_predict_at_1=4.0)
+    current = _document(evaluate_rules_at_1=1.5, db_insert_at_16=5.0, predict_batch_at_1=8.0)
+
+    rows = {row["case"]: row for row in compare(current, baseline, threshold=0.2)}
+
+    assert rows["evaluate_rules@1"]["status"] == "regressed"
+    assert rows["evaluate_rules@1"]["change"] == 0.5
+    assert rows["db_insert@16"]["status"] == "improved"
+    assert rows["predict_batch@1"]["status"] == "new"
+    assert rows["quick_fix_predict@1"]["status"] == "missing"
+
+
+def test_case_thresholds_override_default():
+    assert threshold_for("db_insert@16", 0.2, {"db_insert": 0.5}) == 0.5
+    assert threshold_for("db_insert@16", 0.2, {"db_insert": 0.5, "db_insert@16": 1.0}) == 1.0
+    assert threshold_for("evaluate_rules@1", 0.2, {"db_insert": 0.5}) == 0.2
+
+    baseline = _document(db_insert_at_16=10.0)
+    current = _document(db_insert_at_16=14.0)
+    assert compare(current, baseline, threshold=0.2, overrides={"db_insert": 0.5})[0]["status"] == "ok"
+
+
+def test_measure_reports_distribution_and_throughput():
+    result = measure(lambda: sum(range(100)), batch_size=8, min_calls=10, max_calls=50, max_seconds=0.0, warmup=1)
+
+    assert result["calls"] == 10
+    assert result["p50_ms"] <= result["p99_ms"] <= result["max_ms"]
+    assert result["throughput_per_s"] > 0
+    assert len(make_patients(4)) == 4
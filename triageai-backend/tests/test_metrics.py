@@ -0,0 +1,61 @@
+"""Metrics recording and /metrics endpoint tests."""
+import pytest
+from httpx import AsyncClient
+
+from app.main import app
+from app.utils.metrics import Histogram, Registry, time_stage
+
+
+def test_histogram_buckets_are_cumulative_and_inclusive():
+    histogram = Histogram("demo_seconds", "Demo.", ("stage",), buckets=(0.1, 1.0))
+    child = histogram.labels("rules")
+    for value in (0.05, 0.1, 0.5, 3.0):
+        child.observe(value)
+
+    lines = histogram.render()
+
+    assert 'demo_seconds_bucket{stage="rules",le="0.1"} 2' in lines
+    assert 'demo_seconds_bucket{stage="rules",le="1.0"} 3' in lines
+    assert 'demo_seconds_bucket{stage="rules",le="+Inf"} 4' in lines
+    assert 'demo_seconds_count{stage="rules"} 4' in lines
+    assert 'demo_seconds_sum{stage="rules"} 3.65' in lines
+    assert histogram.labels("rules") is child
+    with pytest.raises(ValueError):
+        histogram.labels("triage", "rules")
+
+
+def test_registry_renders_collectors_and_escapes_labels():
+    registry = Registry()
+    timed = registry.histogram("demo_seconds", "Demo.", ("stage",))
+    with timed.labels("commit").time():
+        pass
+    registry.add_collector(lambda: [("demo_depth", "gauge", "Depth.", [({"name": 'a"b'}, 3)])])
+
+    text = registry.render()
+
+    assert "# TYPE demo_seconds histogram" in text
+    assert 'demo_seconds_count{stage="commit"} 1' in text
+    assert "# TYPE demo_depth gauge" in text
+    assert 'demo_depth{name="a\\"b"} 3' in text
+
+
+@pytest.mark.asyncio
+async def test_metrics_endpoint_exposes_stages_and_runtime_gauges(client: AsyncClient, sample_patient_high_risk):
+    response = await client.post("/api/triage", json=sample_patient_high_risk.model_dump(mode="json"))
+    assert response.status_code == 201
+    with time_stage("quick_fix", "predict"):
+        pass
+
+    response = await client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    text = response.text
+    assert 'triageai_stage_duration_seconds_count{pipeline="triage",stage="rules"}' in text
+    assert 'triageai_stage_duration_seconds_count{pipeline="triage",stage="commit"}' in text
+    assert 'pipeline="quick_fix",stage="predict"' in text
+    for name in (
+        "triageai_writer_queue_depth", "triageai_cache_hits_total", "triageai_websocket_connections",
+        "triageai_password_hash_pending", "triageai_db_pool_checked_out",
+    ):
+        assert f"# TYPE {name} " in text
@@ -51,3 +51,15 @@ def test_build_features():
     assert features_df['condition_diabetes'].iloc[0] == 1
     assert features_df['symptom_count'].iloc[0] == 2
     assert features_df['condition_count'].iloc[0] == 1
+
+
+def test_symptom_and_condition_masks():
+    """Test bitmask encoding follows the canonical feature order."""
+    from app.utils.feature_engineering import symptom_mask, condition_mask
+    from app.config import settings
+    
+    mask = symptom_mask(['Chest Pain', 'fever', 'not a symptom'])
+    
+    assert mask == (1 << settings.SYMPTOM_FEATURES.index('chest_pain')) | (1 << settings.SYMPTOM_FEATURES.index('fever'))
+    assert condition_mask([]) == 0
+    assert condition_mask(['diabetes']) == 1 << settings.CONDITION_FEATURES.index('diabetes')
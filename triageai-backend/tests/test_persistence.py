@@ -0,0 +1,45 @@
+"""Group-commit persistence tests."""
+import asyncio
+import uuid
+import pytest
+from sqlalchemy import select, func
+from app.models.patient import Patient
+from app.services.persistence import PatientWriter
+from tests.conftest import make_patient
+
+
+@pytest.mark.asyncio
+async def test_concurrent_submits_share_commits(file_session_factory):
+    """Test concurrent records are flushed in fewer transactions than rows."""
+    writer = PatientWriter(file_session_factory, max_batch=16, flush_interval_ms=20)
+    await writer.start()
+
+    await asyncio.gather(*(writer.submit(make_patient()) for _ in range(40)))
+    await writer.stop()
+
+    async with file_session_factory() as session:
+        count = (await session.execute(select(func.count(Patient.id)))).scalar()
+
+    assert count == 40
+    assert writer.rows_flushed == 40
+    assert writer.batches_flushed < 40
+
+
+@pytest.mark.asyncio
+async def test_failed_row_does_not_reject_batch(file_session_factory):
+    """Test a bad row fails only its own caller."""
+    writer = PatientWriter(file_session_factory, max_batch=16, flush_interval_ms=20)
+    await writer.start()
+
+    duplicate_id = str(uuid.uuid4())
+    await writer.submit(make_patient(id=duplicate_id))
+
+    results = await asyncio.gather(
+        writer.submit(make_patient(id=duplicate_id)),
+        writer.submit(make_patient()),
+        return_exceptions=True
+    )
+    await writer.stop()
+
+    assert isinstance(results[0], Exception)
+    assert results[1] is None
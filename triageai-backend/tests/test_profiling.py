@@ -0,0 +1,166 @@
+"""Request profiler tests."""
+import time
+from collections import Counter
+
+import pytest
+from fastapi import FastAPI
+from httpx import AsyncClient
+
+from app.api import profiling
+from app.database import get_db
+from app.middleware.profiling import ProfilingMiddleware
+from app.models.user import User
+from app.services.profiler import ProfileStore, RequestProfiler, request_profiler
+from tests.conftest import bearer
+
+
+def busy_handler_work(seconds):
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        pass
+
+
+def profiled_app(profiler):
+    app = FastAPI()
+
+    @app.get("/slow")
+    async def slow():
+        busy_handler_work(0.05)
+        return {"ok": True}
+
+    app.add_middleware(ProfilingMiddleware, profiler=profiler)
+    return app
+
+
+@pytest.mark.asyncio
+async def test_header_profiles_request_into_folded_stacks(tmp_path):
+    """Test the token header yields a stored flamegraph of the handler and an X-Profile-Id."""
+    store = ProfileStore(str(tmp_path), max_profiles=10)
+    profiler = RequestProfiler(store, token="let-me-in", sample_rate=0.0, interval_ms=1)
+
+    async with AsyncClient(app=profiled_app(profiler), base_url="http://test") as ac:
+        plain = await ac.get("/slow")
+        wrong = await ac.get("/slow", headers={"X-Profile": "guess"})
+        profiled = await ac.get("/slow", headers={"X-Profile": "let-me-in"})
+
+    assert "x-profile-id" not in plain.headers
+    assert "x-profile-id" not in wrong.headers
+    profile_id = profiled.headers["x-profile-id"]
+    assert [p["id"] for p in store.list()] == [profile_id]
+
+    meta = store.list()[0]
+    assert (meta["method"], meta["path"], meta["status"], meta["reason"]) == ("GET", "/slow", 200, "header")
+    assert meta["samples"] > 0
+
+    lines = store.path(profile_id).read_text().splitlines()
+    assert any("busy_handler_work (tests/test_profiling.py" in line for line in lines)
+    stack, count = lines[0].rsplit(" ", 1)
+    assert int(count) > 0 and ";" in stack
+    assert profiler.active == 0
+
+
+@pytest.mark.asyncio
+async def test_sampling_and_concurrency_cap(tmp_path):
+    """Test random sampling follows the rate and a full profiler lets requests through unprofiled."""
+    store = ProfileStore(str(tmp_path))
+    draws = iter([0.5, 0.05, 0.0])
+    profiler = RequestProfiler(store, token="", sample_rate=0.1, interval_ms=1, rng=lambda: next(draws))
+
+    async with AsyncClient(app=profiled_app(profiler), base_url="http://test") as ac:
+        skipped = await ac.get("/slow", headers={"X-Profile": ""})
+        sampled = await ac.get("/slow")
+        profiler.sample_rate = 1.0
+        profiler.active = profiler.max_concurrent
+        capped = await ac.get("/slow")
+
+    assert "x-profile-id" not in skipped.headers
+    assert store.list()[0]["reason"] == "sampled"
+    assert sampled.headers["x-profile-id"] == store.list()[0]["id"]
+    assert capped.status_code == 200 and "x-profile-id" not in capped.headers
+    assert profiler.skipped == 1
+
+
+def test_store_prunes_oldest_and_rejects_unknown_ids(tmp_path):
+    store = ProfileStore(str(tmp_path), max_profiles=2)
+    ids = [f"2026010{i}T000000-0000000{i}" for i in range(1, 4)]
+    for profile_id in ids:
+        store.save(profile_id, Counter({"main;work": 3}), {"samples": 3})
+
+    assert [p["id"] for p in store.list()] == ids[:0:-1]
+    assert store.path(ids[0]) is None
+    assert store.path(ids[2]).read_text() == "main;work 3\n"
+    assert store.path("../../etc/passwd") is None
+
+
+@pytest.mark.asyncio
+async def test_admin_endpoints_require_staff(test_db, tmp_path, monkeypatch):
+    """Test staff can toggle sampling and download profiles; patients cannot."""
+    test_db.add(User(username="nurse", hashed_password="x", role="MEDICAL_STAFF"))
+    test_db.add(User(username="pat", hashed_password="x", role="PATIENT"))
+    await test_db.commit()
+    store = ProfileStore(str(tmp_path))
+    meta = {"method": "POST", "path": "/api/triage", "status": 201, "reason": "header",
+            "duration_ms": 12.5, "samples": 2, "created_at": 1767225600.0}
+    store.save("20260101T000000-0000abcd", Counter({"main;work": 2}), meta)
+    monkeypatch.setattr(request_profiler, "store", store)
+    monkeypatch.setattr(request_profiler, "sample_rate", 0.0)
+
+    admin_app = FastAPI()
+    admin_app.include_router(profiling.router)
+
+    async def override_get_db():
+        yield test_db
+
+    admin_app.dependency_overrides[get_db] = override_get_db
+    staff = bearer("nurse", "MEDICAL_STAFF")
+    async with AsyncClient(app=admin_app, base_url="http://test") as ac:
+        assert (await ac.get("/api/admin/profiling", headers=bearer("pat", "PATIENT"))).status_code == 403
+        assert (await ac.put("/api/admin/profiling", json={"sample_rate": 2}, headers=staff)).status_code == 422
+
+        updated = await ac.put("/api/admin/profiling", json={"sample_rate": 0.25}, headers=staff)
+        listed = await ac.get("/api/admin/profiling/profiles", headers=staff)
+        folded = await ac.get("/api/admin/profiling/profiles/20260101T000000-0000abcd", headers=staff)
+        missing = await ac.get("/api/admin/profiling/profiles/nope", headers=staff)
+
+    assert updated.json()["sample_rate"] == 0.25
+    assert request_profiler.sample_rate == 0.25
+    assert listed.json()["profiles"] == [{"id": "20260101T000000-0000abcd", **meta}]
+    assert folded.text == "main;work 2\n"
+    assert missing.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_failing_requests_release_their_profiling_slot(tmp_path):
+    """Test a handler error or failed sampler start never leaks the concurrency count."""
+    profiler = RequestProfiler(ProfileStore(str(tmp_path)), token="t", sample_rate=0.0, interval_ms=1, max_concurrent=1)
+    app = FastAPI()
+
+    @app.get("/boom")
+    async def boom():
+        raise RuntimeError("handler failed")
+
+    app.add_middleware(ProfilingMiddleware, profiler=profiler)
+
+    async with AsyncClient(app=app, base_url="http://test") as ac:
+        for _ in range(3):
+            with pytest.raises(RuntimeError):
+                await ac.get("/boom", headers={"X-Profile": "t"})
+    assert profiler.active == 0
+    assert [p["status"] for p in profiler.store.list()] == [500, 500, 500]
+
+    class BrokenSampler:
+        def __init__(self, *args):
+            pass
+
+        def start(self):
+            raise RuntimeError("can't start new thread")
+
+    import app.services.profiler as profiler_module
+    original = profiler_module.StackSampler
+    profiler_module.StackSampler = BrokenSampler
+    try:
+        with pytest.raises(RuntimeError):
+            profiler.begin()
+    finally:
+        profiler_module.StackSampler = original
+    assert profiler.active == 0
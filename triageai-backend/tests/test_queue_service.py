@@ -0,0 +1,126 @@
+"""Live patient queue tests."""
+import uuid
+from datetime import datetime, timedelta
+import pytest
+from httpx import AsyncClient
+from app.models.patient import Patient
+from app.services.queue_service import PatientQueue, patient_queue
+
+
+def make_entry(priority, confidence, minutes, patient_id=None):
+    """Helper to build a queue entry."""
+    return {
+        "id": patient_id or str(uuid.uuid4()),
+        "priority": priority,
+        "risk_level": priority,
+        "confidence": confidence,
+        "department": "General Medicine",
+        "created_at": (datetime(2026, 3, 1, 8, 0) + timedelta(minutes=minutes)).isoformat(),
+    }
+
+
+def test_queue_orders_by_priority_confidence_then_arrival():
+    """Test treatment order: priority, then confidence, then earliest arrival."""
+    queue = PatientQueue()
+    late_high = make_entry("HIGH", 0.9, 10, "late-high")
+    early_high = make_entry("HIGH", 0.9, 0, "early-high")
+    sure_high = make_entry("HIGH", 0.99, 20, "sure-high")
+    low = make_entry("LOW", 0.99, -30, "low")
+    for entry in (low, late_high, early_high, sure_high):
+        queue.upsert(entry)
+
+    assert [e["id"] for e in queue.snapshot()] == ["sure-high", "early-high", "late-high", "low"]
+    assert queue.peek()["id"] == "sure-high"
+    assert [e["id"] for e in queue.snapshot(limit=2)] == ["sure-high", "early-high"]
+
+
+def test_reprioritize_and_discharge_update_order():
+    """Test moved and discharged patients leave their old position."""
+    queue = PatientQueue()
+    first = make_entry("HIGH", 0.9, 0, "first")
+    second = make_entry("MEDIUM", 0.9, 1, "second")
+    queue.upsert(first)
+    queue.upsert(second)
+
+    queue.upsert({**first, "priority": "LOW"})
+    assert queue.peek()["id"] == "second"
+
+    queue.remove("second")
+    assert queue.peek()["id"] == "first"
+    assert len(queue) == 1
+
+
+def test_order_holds_one_item_per_patient_after_many_updates():
+    """Test repeated re-prioritizing never leaves old positions behind."""
+    queue = PatientQueue()
+    entry = make_entry("LOW", 0.5, 0, "churn")
+    queue.upsert(make_entry("MEDIUM", 0.5, 1, "other"))
+    for i in range(500):
+        queue.upsert({**entry, "confidence": i / 1000})
+
+    assert len(queue._order) == len(queue) == 2
+    assert [e["id"] for e in queue.snapshot(priority="LOW")] == ["churn"]
+    assert queue.snapshot(priority="LOW")[0]["confidence"] == 0.499
+
+
+@pytest.fixture
+def fresh_queue():
+    """Force the global queue to reload from the test database."""
+    patient_queue.loaded = False
+    yield patient_queue
+    patient_queue.loaded = False
+
+
+async def seed_waiting(db):
+    """Insert one discharged and three waiting patients."""
+    ids = {}
+    for name, risk, confidence, status in (
+        ("medium", "MEDIUM", 0.7, "WAITING"),
+        ("high", "HIGH", 0.8, "WAITING"),
+        ("low", "LOW", 0.9, "WAITING"),
+        ("gone", "HIGH", 0.99, "DISCHARGED"),
+    ):
+        ids[name] = str(uuid.uuid4())
+        db.add(Patient(
+            id=ids[name],
+            created_at=datetime(2026, 3, 1, 8, 0),
+            age=50,
+            gender="M",
+            symptoms=["cough"],
+            pre_existing=[],
+            risk_level=risk,
+            confidence=confidence,
+            department="General Medicine",
+            status=status
+        ))
+    await db.commit()
+    return ids
+
+
+@pytest.mark.asyncio
+async def test_queue_api_reprioritize_and_discharge(client: AsyncClient, test_db, fresh_queue):
+    """Test the queue endpoint reflects overrides and discharges without a re-sort."""
+    ids = await seed_waiting(test_db)
+
+    response = await client.get("/api/queue")
+    assert response.status_code == 200
+    data = response.json()
+    assert data["total_waiting"] == 3
+    assert [p["id"] for p in data["patients"]] == [ids["high"], ids["medium"], ids["low"]]
+
+    response = await client.patch(f"/api/queue/{ids['low']}", json={"priority": "HIGH"})
+    assert response.status_code == 200
+    assert response.json()["risk_level"] == "LOW"
+    assert response.json()["priority"] == "HIGH"
+
+    response = await client.post(f"/api/queue/{ids['high']}/discharge")
+    assert response.status_code == 200
+
+    data = (await client.get("/api/queue")).json()
+    assert [p["id"] for p in data["patients"]] == [ids["low"], ids["medium"]]
+
+    response = await client.post(f"/api/queue/{ids['high']}/discharge")
+    assert response.status_code == 409
+
+    await fresh_queue.rebuild(test_db)
+    assert [p["id"] for p in fresh_queue.snapshot()] == [ids["low"], ids["medium"]]
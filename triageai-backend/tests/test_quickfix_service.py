@@ -0,0 +1,47 @@
+"""Quick Fix service tests."""
+import pickle
+
+import pytest
+
+from app.services.quickfix_service import QuickFixService
+from ml.train_quickfix import KNOWLEDGE_BASE, build_artifacts, generate_training_data, train_model
+
+
+@pytest.fixture(scope="module")
+def artifact_path(tmp_path_factory):
+    X, y = generate_training_data(100, seed=0)
+    path = tmp_path_factory.mktemp("quickfix") / "quickfix_model.pkl"
+    with open(path, "wb") as f:
+        pickle.dump(build_artifacts(train_model(X, y, n_estimators=20, n_jobs=1)), f)
+    return path
+
+
+def test_predict_returns_disease_and_medicine(artifact_path):
+    service = QuickFixService()
+    assert service.load_models(artifact_path)
+
+    result = service.predict(KNOWLEDGE_BASE["Migraine"]["symptoms"][:4] + ["Not A Symptom"], "Unknown History")
+
+    assert result["disease"] == "Migraine"
+    assert result["medicine"] == KNOWLEDGE_BASE["Migraine"]["medicine"]
+    assert 0 < result["confidence"] <= 1
+
+
+def test_encode_matches_training_layout(artifact_path):
+    service = QuickFixService()
+    service.load_models(artifact_path)
+
+    row = service.encode(["Cough"], "Asthma")
+
+    assert row.shape == (1, len(service.symptoms) + 1)
+    assert row[0, service.symptoms.index("Cough")] == 1
+    assert row[0, :-1].sum() == 1
+    assert row[0, -1] == service.le_history.transform(["Asthma"])[0]
+
+
+def test_missing_artifact_leaves_service_unloaded(tmp_path):
+    service = QuickFixService()
+    assert not service.load_models(tmp_path / "missing.pkl")
+    assert not service.is_loaded()
+    with pytest.raises(RuntimeError):
+        service.predict(["Cough"], "None")
@@ -0,0 +1,93 @@
+"""Rate limiting middleware tests."""
+from datetime import timedelta
+import pytest
+from fastapi import FastAPI
+from httpx import AsyncClient
+from app.middleware.rate_limit import RateLimitMiddleware, RateLimitRule, TokenBucketStore
+from app.services.auth import create_access_token
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_bucket_bursts_then_refills():
+    """Test a client may burst to capacity and then gets one token per refill interval."""
+    clock = FakeClock()
+    store = TokenBucketStore(clock=clock)
+    rule = RateLimitRule.parse("POST /api/triage", "3/minute")
+
+    assert [store.consume(rule, "ip:a") for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert store.consume(rule, "ip:a") == pytest.approx(20.0)
+    assert store.consume(rule, "ip:b") == 0.0
+
+    clock.now = 20.0
+    assert store.consume(rule, "ip:a") == 0.0
+    assert store.rejected == 1
+
+
+def test_store_drops_refilled_and_least_recent_buckets():
+    """Test idle buckets expire and the store never exceeds max_keys."""
+    clock = FakeClock()
+    store = TokenBucketStore(max_keys=3, clock=clock)
+    rule = RateLimitRule.parse("POST /x", "1/second")
+
+    for i in range(5):
+        store.consume(rule, f"ip:{i}")
+    assert len(store) == 3
+
+    clock.now = 5.0
+    store.consume(rule, "ip:new")
+    assert len(store) == 1
+
+
+def test_invalid_rule_rejected():
+    """Test malformed budgets fail at startup."""
+    with pytest.raises(ValueError):
+        RateLimitRule.parse("POST /x", "10/fortnight")
+
+
+@pytest.mark.asyncio
+async def test_middleware_rejects_before_handler_runs():
+    """Test over-budget requests get 429 + Retry-After without reaching the route."""
+    calls = []
+    limited = FastAPI()
+
+    @limited.post("/api/triage")
+    async def triage():
+        calls.append(1)
+        return {"ok": True}
+
+    @limited.get("/api/stats")
+    async def stats():
+        return {"ok": True}
+
+    limited.add_middleware(RateLimitMiddleware, rules={"POST /api/triage": "2/minute"}, enabled=True)
+
+    async with AsyncClient(app=limited, base_url="http://test") as ac:
+        statuses = [(await ac.post("/api/triage")).status_code for _ in range(3)]
+        rejected = await ac.post("/api/triage")
+        token = create_access_token({"sub": "kiosk-7"}, timedelta(minutes=5))
+        authenticated = await ac.post("/api/triage", headers={"Authorization": f"Bearer {token}"})
+        unlimited = [(await ac.get("/api/stats")).status_code for _ in range(5)]
+
+    assert statuses == [200, 200, 429]
+    assert rejected.headers["retry-after"] == "30"
+    assert authenticated.status_code == 200
+    assert unlimited == [200] * 5
+    assert len(calls) == 3
+
+
+def test_middleware_reads_settings_when_constructed(monkeypatch):
+    """Test the limiter can be switched off after import (benchmarks, tests)."""
+    from app.config import settings
+
+    monkeypatch.setattr(settings, "RATE_LIMIT_ENABLED", False)
+    assert not RateLimitMiddleware(FastAPI()).enabled
+
+    monkeypatch.setattr(settings, "RATE_LIMIT_ENABLED", True)
+    assert RateLimitMiddleware(FastAPI()).enabled
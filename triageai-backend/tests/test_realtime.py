@@ -0,0 +1,162 @@
+"""Live triage event stream tests."""
+import asyncio
+import json
+from datetime import datetime, timedelta
+import pytest
+from app.services.realtime import (
+    ConnectionManager, Subscription, handle_client_message, publish_triage_event
+)
+from app.services import realtime
+from app.utils.ws_framing import msgpack_available
+from tests.conftest import make_patient, settle
+from tests.test_websocket import FakeWebSocket
+
+
+def make_record(risk_level, department, minutes=0):
+    """Helper to build a triaged patient row."""
+    return make_patient(
+        created_at=datetime(2026, 5, 1, 9, 0) + timedelta(minutes=minutes),
+        age=55,
+        symptoms=["chest pain"],
+        risk_level=risk_level,
+        confidence=0.95,
+        department=department,
+        explanation="Not sent over the wire"
+    )
+
+
+@pytest.fixture
+async def session_factory(file_session_factory):
+    """File-backed database with three existing patients."""
+    async with file_session_factory() as session:
+        session.add_all([
+            make_record("HIGH", "Cardiology / Emergency", 0),
+            make_record("LOW", "Outpatient / General Practice", 1),
+            make_record("HIGH", "Neurology / Emergency", 2),
+        ])
+        await session.commit()
+    return file_session_factory
+
+
+@pytest.fixture
+def live_manager(monkeypatch):
+    """Isolated connection manager for publish_triage_event."""
+    manager = ConnectionManager()
+    monkeypatch.setattr(realtime, "manager", manager)
+    return manager
+
+
+def test_subscription_matches_department_parts():
+    """Test department filters match any part of a combined department."""
+    subscription = Subscription(departments=["cardiology"], risk_levels=["high"])
+
+    assert subscription.matches("Cardiology / Emergency", "HIGH")
+    assert not subscription.matches("Cardiology / Emergency", "LOW")
+    assert not subscription.matches("Neurology / Emergency", "HIGH")
+    assert Subscription().matches("Anything", "LOW")
+
+
+@pytest.mark.asyncio
+async def test_subscribe_sends_snapshot_then_matching_deltas(session_factory, live_manager):
+    """Test a subscriber gets a filtered snapshot followed only by matching deltas."""
+    ws = FakeWebSocket()
+    client = await live_manager.connect(ws)
+
+    await handle_client_message(
+        client, json.dumps({"action": "subscribe", "risk_levels": ["HIGH"], "departments": ["Emergency"]}),
+        session_factory
+    )
+    publish_triage_event(make_record("HIGH", "Respiratory / Emergency", 5))
+    publish_triage_event(make_record("LOW", "Outpatient / General Practice", 6))
+    await settle()
+
+    messages = [json.loads(m) for m in ws.received]
+    assert [m["type"] for m in messages] == ["snapshot", "triage"]
+    assert [p["department"] for p in messages[0]["patients"]] == [
+        "Neurology / Emergency", "Cardiology / Emergency"
+    ]
+    assert messages[1]["patient"]["department"] == "Respiratory / Emergency"
+    assert "explanation" not in messages[1]["patient"]
+    await live_manager.close_all()
+
+
+@pytest.mark.asyncio
+async def test_unsubscribed_client_receives_all_events(live_manager):
+    """Test clients without a subscription get every triage event."""
+    ws = FakeWebSocket()
+    await live_manager.connect(ws)
+
+    publish_triage_event(make_record("LOW", "Outpatient / General Practice"))
+    await settle()
+
+    assert json.loads(ws.received[0])["patient"]["risk_level"] == "LOW"
+    await live_manager.close_all()
+
+
+@pytest.mark.asyncio
+async def test_invalid_message_returns_error(session_factory, live_manager):
+    """Test malformed client messages get an error reply instead of closing."""
+    ws = FakeWebSocket()
+    client = await live_manager.connect(ws)
+
+    await handle_client_message(client, "not json", session_factory)
+    await settle()
+
+    assert json.loads(ws.received[0])["type"] == "error"
+    await live_manager.close_all()
+
+
+@pytest.mark.asyncio
+async def test_queue_resync_reloads_after_gap(session_factory, monkeypatch):
+    """Test a broadcast gap reloads the queue, with gaps during a reload causing one more."""
+    from app.services.queue_service import PatientQueue
+    queue = PatientQueue()
+    monkeypatch.setattr(realtime, "patient_queue", queue)
+    resync = realtime.QueueResync(session_factory)
+
+    resync.request()
+    resync.request()  # Before the reload started: covered by it
+    await asyncio.sleep(0)
+    resync.request()  # During the reload: one more afterwards
+    await resync.task
+
+    assert resync.rebuilds == 2
+    assert len(queue) == 3
+
+
+@pytest.mark.asyncio
+async def test_subscribe_failure_returns_error(live_manager):
+    """Test a database error while loading the snapshot is reported, not raised."""
+    ws = FakeWebSocket()
+    client = await live_manager.connect(ws)
+
+    def broken_factory():
+        raise OSError("database is locked")
+
+    await handle_client_message(client, json.dumps({"action": "subscribe"}), broken_factory)
+    await settle()
+
+    assert json.loads(ws.received[0]) == {"type": "error", "detail": "Subscription failed. Try again."}
+    assert client in live_manager.active_connections
+    await live_manager.close_all()
+
+
+@pytest.mark.asyncio
+@pytest.mark.skipif(not msgpack_available(), reason="msgpack not installed")
+async def test_msgpack_client_subscribes_with_binary_frame(session_factory, live_manager):
+    """Test msgpack clients can send their subscribe message as MessagePack."""
+    import msgpack
+    ws = FakeWebSocket(subprotocols=["triage.msgpack"])
+    client = await live_manager.connect(ws)
+
+    await handle_client_message(
+        client, msgpack.packb({"action": "subscribe", "risk_levels": ["LOW"]}), session_factory
+    )
+    await handle_client_message(client, b"\xc1", session_factory)
+    await settle()
+
+    messages = [message for frame in ws.received for message in msgpack.unpackb(frame)]
+    assert messages[0]["type"] == "snapshot"
+    assert [p["risk_level"] for p in messages[0]["patients"]] == ["LOW"]
+    assert messages[1]["type"] == "error"
+    await live_manager.close_all()
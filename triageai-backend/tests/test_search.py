@@ -0,0 +1,51 @@
+"""Tests for the triage model hyperparameter search."""
+import numpy as np
+
+from ml.dataset import read_split
+from ml.generate_data import write_dataset
+from ml.search import candidate_grid, format_report, load_booster, report_rows, run_search, select
+from ml.train_model import booster_to_classifier, fit_preprocessing, scale
+
+
+def test_candidate_grid_expands_product():
+    candidates = candidate_grid({"max_depth": [3, 6], "learning_rate": [0.1, 0.3], "max_bin": [64]})
+    assert len(candidates) == 4
+    assert {"max_depth": 6, "learning_rate": 0.3, "max_bin": 64} in candidates
+
+
+def test_select_prefers_fastest_meeting_target():
+    results = [
+        {"params": {"max_depth": 8}, "val_accuracy": 0.95, "latency_p50_ms": 0.9},
+        {"params": {"max_depth": 4}, "val_accuracy": 0.91, "latency_p50_ms": 0.3},
+        {"params": {"max_depth": 2}, "val_accuracy": 0.80, "latency_p50_ms": 0.1},
+    ]
+    assert select(results, 0.9)["params"] == {"max_depth": 4}
+    assert select(results, 0.99) is None
+
+
+def test_run_search_trains_candidates_in_pool(tmp_path):
+    """Test candidates train in worker processes and report accuracy and latency."""
+    write_dataset(2000, tmp_path, chunk_size=500)
+    scaler, _, feature_names = fit_preprocessing(tmp_path)
+    X_test, y_test = read_split(tmp_path / "test")
+    rows = scale(scaler, X_test, feature_names)
+    candidates = [{"max_depth": 3, "learning_rate": 0.3, "max_bin": 64}, {"max_depth": 6, "learning_rate": 0.3}]
+
+    results = run_search(
+        tmp_path, candidates, workers=2, max_rounds=40, early_stopping_rounds=5,
+        latency_rows=rows, latency_repeats=20
+    )
+
+    assert [r["params"] for r in results] == candidates
+    for result in results:
+        assert 0 < result["rounds"] <= 40
+        assert result["val_accuracy"] > 0.85
+        assert result["latency_p50_ms"] <= result["latency_p99_ms"]
+        model = booster_to_classifier(load_booster(result["model"]))
+        assert model.predict_proba(rows[:5]).shape == (5, 3)
+        assert np.isclose(
+            (model.predict(rows) == y_test).mean(), result["test_accuracy"]
+        )
+
+    assert all("model" not in row for row in report_rows(results))
+    assert "selected" in format_report(results, 0.85, select(results, 0.85))
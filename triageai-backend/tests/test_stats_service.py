@@ -0,0 +1,108 @@
+"""Incremental statistics tests."""
+from datetime import datetime
+import pytest
+from httpx import AsyncClient
+from app.services.stats_service import read_counters, rebuild_counters
+from app.services.trends_service import MinuteRollupPruner, get_trends, rebuild_rollups
+
+
+@pytest.mark.asyncio
+async def test_stats_follow_triage_inserts(client: AsyncClient, test_db):
+    """Test counters are updated in the same transaction as the patient insert."""
+    response = await client.post('/api/triage', json={
+        'age': 45,
+        'gender': 'M',
+        'symptoms': ['headache'],
+        'spo2': 85.0
+    })
+    assert response.status_code == 201
+
+    stats = (await client.get('/api/stats')).json()
+
+    assert stats['total_patients'] == 1
+    assert stats['risk_distribution'] == {'HIGH': 1, 'MEDIUM': 0, 'LOW': 0}
+    assert stats['department_load'] == {'Emergency / Respiratory': 1}
+
+
+@pytest.mark.asyncio
+async def test_rebuild_matches_incremental_counters(client: AsyncClient, test_db):
+    """Test reconciliation produces the same counters as incremental maintenance."""
+    for spo2 in (85.0, 86.0):
+        await client.post('/api/triage', json={
+            'age': 45, 'gender': 'F', 'symptoms': ['cough'], 'spo2': spo2
+        })
+
+    incremental = await read_counters(test_db)
+    rebuilt = await rebuild_counters(test_db)
+
+    assert rebuilt == incremental
+
+
+@pytest.mark.asyncio
+async def test_trends_read_rollups(client: AsyncClient, test_db):
+    """Test inserted patients appear in minute and hour trend buckets."""
+    for symptoms in (['headache'], ['cough']):
+        await client.post('/api/triage', json={
+            'age': 45, 'gender': 'M', 'symptoms': symptoms, 'spo2': 85.0
+        })
+
+    for bucket, window, points in (('minute', '30m', 30), ('hour', '24h', 24), ('day', '7d', 7)):
+        response = await client.get('/api/stats/trends', params={'window': window, 'bucket': bucket})
+        assert response.status_code == 200
+        data = response.json()
+
+        assert len(data['points']) == points
+        assert sum(p['total'] for p in data['points']) == 2
+        assert data['points'][-1]['rules_triggered'] == {'SPO2_CRITICAL': 2}
+
+
+@pytest.mark.asyncio
+async def test_rebuild_rollups_matches_incremental(client: AsyncClient, test_db):
+    """Test rollup reconciliation reproduces the incrementally maintained series."""
+    await client.post('/api/triage', json={'age': 70, 'gender': 'F', 'symptoms': ['fever'], 'spo2': 85.0})
+    now = datetime.utcnow()
+    before = await get_trends(test_db, '2h', 'minute', now=now)
+
+    await rebuild_rollups(test_db)
+    after = await get_trends(test_db, '2h', 'minute', now=now)
+
+    assert after == before
+    assert sum(p.total for p in after.points) == 1
+
+
+@pytest.mark.asyncio
+async def test_trends_invalid_parameters(client: AsyncClient):
+    """Test malformed windows and buckets return 400."""
+    assert (await client.get('/api/stats/trends', params={'window': 'abc'})).status_code == 400
+    assert (await client.get('/api/stats/trends', params={'bucket': 'week'})).status_code == 400
+    assert (await client.get('/api/stats/trends', params={'window': '30d', 'bucket': 'minute'})).status_code == 400
+    assert (await client.get('/api/stats/trends', params={'window': '9999999999d'})).status_code == 400
+    assert (await client.get('/api/stats/trends', params={'window': '3651d', 'bucket': 'day'})).status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_pruner_deletes_expired_minute_buckets(file_session_factory):
+    """Test the background pruner keeps minute buckets bounded and stops cleanly."""
+    import asyncio
+    from datetime import timedelta
+    from sqlalchemy import select
+    from app.models.stats import TriageRollup
+
+    old = datetime.utcnow() - timedelta(hours=72)
+    async with file_session_factory() as session:
+        session.add_all([
+            TriageRollup(bucket="minute", bucket_start=old, dimension="total", key="total", count=1),
+            TriageRollup(bucket="hour", bucket_start=old, dimension="total", key="total", count=1),
+        ])
+        await session.commit()
+
+    pruner = MinuteRollupPruner(file_session_factory, interval=0.01)
+    pruner.start()
+    await asyncio.sleep(0.1)
+    task = pruner._task
+    await pruner.stop()
+
+    assert task.done()
+    async with file_session_factory() as session:
+        buckets = (await session.execute(select(TriageRollup.bucket))).scalars().all()
+    assert buckets == ["hour"]
@@ -0,0 +1,45 @@
+"""Quick Fix training data tests."""
+import numpy as np
+from ml.train_quickfix import (
+    KNOWLEDGE_BASE, ALL_DISEASES, ALL_HISTORY, ALL_SYMPTOMS,
+    generate_training_data, train_model, build_artifacts
+)
+
+
+def test_samples_only_use_their_disease_symptoms_and_history():
+    """Test every sample has 2-5 distinct symptoms and a history from its disease."""
+    X, y = generate_training_data(samples_per_disease=200, seed=1)
+
+    assert X.shape == (200 * len(ALL_DISEASES), len(ALL_SYMPTOMS) + 1)
+    counts = X[:, :-1].sum(axis=1)
+    assert counts.min() >= 2 and counts.max() <= 5
+
+    for d, disease in enumerate(ALL_DISEASES):
+        rows = X[y == d]
+        allowed = [ALL_SYMPTOMS.index(s) for s in KNOWLEDGE_BASE[disease]["symptoms"]]
+        outside = np.delete(rows[:, :-1], allowed, axis=1)
+        assert not outside.any()
+        histories = {ALL_HISTORY[int(h)] for h in rows[:, -1]}
+        assert histories <= set(KNOWLEDGE_BASE[disease]["history"])
+
+
+def test_same_seed_same_data():
+    """Test generation is reproducible."""
+    X1, y1 = generate_training_data(50, seed=3)
+    X2, y2 = generate_training_data(50, seed=3)
+
+    np.testing.assert_array_equal(X1, X2)
+    np.testing.assert_array_equal(y1, y2)
+
+
+def test_artifacts_predict_with_api_encoding():
+    """Test the artifact works with the multi-hot + history encoding used by /api/quick-fix."""
+    X, y = generate_training_data(100, seed=0)
+    artifacts = build_artifacts(train_model(X, y, n_estimators=20, n_jobs=1))
+
+    symptoms = KNOWLEDGE_BASE["Migraine"]["symptoms"][:4]
+    vector = [1 if s in symptoms else 0 for s in artifacts["all_symptoms"]]
+    history = artifacts["le_history"].transform(["None"])[0]
+    prediction = artifacts["model_disease"].predict([vector + [history]])[0]
+
+    assert artifacts["le_disease"].inverse_transform([prediction])[0] == "Migraine"
@@ -0,0 +1,185 @@
+"""WebSocket fan-out tests."""
+import asyncio
+import json
+import pytest
+from app.services.realtime import ConnectionManager
+from app.utils.ws_framing import msgpack_available
+from tests.conftest import settle
+
+
+class FakeWebSocket:
+    """Minimal stand-in for a Starlette WebSocket."""
+
+    def __init__(self, delay=0.0, fail=False, stall=False, subprotocols=()):
+        self.scope = {"subprotocols": list(subprotocols)}
+        self.subprotocol = None
+        self.delay = delay
+        self.fail = fail
+        self.stall = stall
+        self.received = []
+        self.closed = False
+
+    async def accept(self, subprotocol=None):
+        self.subprotocol = subprotocol
+
+    async def send_text(self, message):
+        if self.fail:
+            raise RuntimeError("socket reset")
+        if self.stall:
+            await asyncio.Event().wait()
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        self.received.append(message)
+
+    async def send_bytes(self, message):
+        await self.send_text(message)
+
+    async def close(self):
+        self.closed = True
+
+
+@pytest.mark.asyncio
+async def test_stalled_client_does_not_block_others():
+    """Test a stalled socket is evicted while healthy sockets keep receiving."""
+    manager = ConnectionManager(queue_size=10, send_timeout=0.05)
+    healthy = FakeWebSocket()
+    stalled = FakeWebSocket(stall=True)
+    await manager.connect(healthy)
+    await manager.connect(stalled)
+
+    for i in range(3):
+        await manager.broadcast(f"event-{i}")
+    await asyncio.sleep(0.15)
+
+    assert healthy.received == ["event-0", "event-1", "event-2"]
+    assert manager.evictions == 1
+    assert stalled.closed
+    assert manager.stats()["connections"] == 1
+    await manager.close_all()
+
+
+@pytest.mark.asyncio
+async def test_failing_socket_evicted_without_aborting_broadcast():
+    """Test an exception on one socket does not affect delivery to others."""
+    manager = ConnectionManager()
+    broken = FakeWebSocket(fail=True)
+    clients = [FakeWebSocket() for _ in range(3)]
+    await manager.connect(broken)
+    for ws in clients:
+        await manager.connect(ws)
+
+    await manager.broadcast("hello")
+    await settle()
+
+    assert all(ws.received == ["hello"] for ws in clients)
+    assert manager.evictions == 1
+    await manager.close_all()
+
+
+@pytest.mark.asyncio
+async def test_slow_client_drops_oldest_and_coalesces():
+    """Test bounded queues drop the oldest message and merge same-key updates."""
+    manager = ConnectionManager(queue_size=3, send_timeout=5)
+    slow = FakeWebSocket(delay=0.05)
+    client = await manager.connect(slow)
+
+    await manager.broadcast("first")
+    await asyncio.sleep(0)  # sender picks up "first" and blocks on the slow socket
+    for i in range(5):
+        await manager.broadcast(f"update-{i}")
+    await manager.broadcast("patient-1 v1", key="patient-1")
+    await manager.broadcast("patient-1 v2", key="patient-1")
+
+    assert len(client.pending) == 3
+    assert manager.dropped == 3
+    assert manager.coalesced == 1
+    assert list(client.pending.values())[-1].text == "patient-1 v2"
+    await manager.close_all()
+
+
+@pytest.mark.asyncio
+async def test_evict_policy_disconnects_full_queue():
+    """Test the evict policy drops a client whose queue overflows."""
+    manager = ConnectionManager(queue_size=2, policy="evict", send_timeout=5)
+    await manager.connect(FakeWebSocket(stall=True))
+
+    for i in range(4):
+        await manager.broadcast(f"event-{i}")
+    await settle()
+
+    assert manager.evictions == 1
+    assert manager.stats()["connections"] == 0
+    await manager.close_all()
+
+
+@pytest.mark.asyncio
+async def test_json_batch_subprotocol_sends_one_frame_per_tick():
+    """Test a burst of events reaches a triage.json client as one array frame."""
+    manager = ConnectionManager(batch_interval=0.02)
+    batched = FakeWebSocket(subprotocols=["triage.json"])
+    legacy = FakeWebSocket()
+    await manager.connect(batched)
+    await manager.connect(legacy)
+
+    for i in range(5):
+        await manager.broadcast(json.dumps({"n": i}))
+    await settle()
+
+    assert batched.subprotocol == "triage.json"
+    assert [json.loads(frame) for frame in batched.received] == [[{"n": i} for i in range(5)]]
+    assert len(legacy.received) == 5
+    assert manager.stats()["formats"] == {"triage.json": 1, "json": 1}
+    await manager.close_all()
+
+
+@pytest.mark.asyncio
+@pytest.mark.skipif(not msgpack_available(), reason="msgpack not installed")
+async def test_msgpack_subprotocol_sends_binary_batches():
+    """Test msgpack clients get binary frames decoding to the same events."""
+    import msgpack
+
+    manager = ConnectionManager(batch_interval=0.02)
+    ws = FakeWebSocket(subprotocols=["triage.msgpack", "triage.json"])
+    await manager.connect(ws)
+
+    events = [{"type": "triage", "patient": {"id": str(i), "confidence": 0.5}} for i in range(20)]
+    for event in events:
+        await manager.broadcast(json.dumps(event))
+    await settle()
+
+    assert ws.subprotocol == "triage.msgpack"
+    assert len(ws.received) == 1
+    assert msgpack.unpackb(ws.received[0]) == events
+    await manager.close_all()
+
+
+@pytest.mark.asyncio
+async def test_heartbeat_only_sent_to_idle_clients():
+    """Test the shared heartbeat skips clients that were recently sent data."""
+    manager = ConnectionManager(heartbeat_interval=0.05)
+    idle = FakeWebSocket()
+    busy = FakeWebSocket()
+    await manager.connect(idle)
+    busy_client = await manager.connect(busy)
+    manager.start_heartbeat()
+
+    for i in range(8):
+        busy_client.enqueue(f"event-{i}")
+        await asyncio.sleep(0.01)
+
+    heartbeats = [m for m in idle.received if json.loads(m)["type"] == "heartbeat"]
+    assert len(heartbeats) == 1
+    assert all(m.startswith("event-") for m in busy.received)
+    await manager.close_all()
+
+
+@pytest.mark.skipif(not msgpack_available(), reason="msgpack not installed")
+def test_endpoint_accepts_binary_frames():
+    """Test the /ws endpoint reads binary frames from msgpack clients instead of failing."""
+    import msgpack
+    from fastapi.testclient import TestClient
+    from app.main import app
+
+    with TestClient(app).websocket_connect("/ws", subprotocols=["triage.msgpack"]) as ws:
+        ws.send_bytes(msgpack.packb({"action": "unsubscribe"}))
+        assert msgpack.unpackb(ws.receive_bytes())[0]["type"] == "error"